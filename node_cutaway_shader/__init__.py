@@ -30,10 +30,15 @@ bl_info = {
     
 import bpy
 from bpy.types import NodeTree, Node, NodeSocket
+from bpy.app.handlers import persistent
 import string
 import bmesh
 import mathutils
 import os
+import uuid
+import numpy
+import hashlib
+import time
 from bpy_extras.image_utils import load_image
 
 
@@ -136,26 +141,100 @@ class casBtnOpenImageDialog(bpy.types.Operator):
 # < !Shows the Load image file dialog and returns the filepath to the selection or "">
 
 
+# < Chunked child jobs >
+# Adding/removing child nodes to/from thousands of objects can take a while. When the buttons are pressed the work is done
+# a chunk per timer tick, with the progress shown in the header, so Blender doesn't appear to have hung. 
+# job_iter is a generator (e.g. add_child_nodes_to_objects_iter) that yields (done_int, total_int) between pieces of work.
+# ESC stops the job between pieces of work. The operator still FINISHES - so the work done so far is one undo step.
+cas_chunked_child_job_seconds_per_tick_float = 0.05
+
+def cas_start_chunked_child_job(operator, context, job_iter):
+    # Material edits made in edit mode are lost when edit mode is left
+    if (context.object != None and context.object.mode != 'OBJECT'):
+        bpy.ops.object.mode_set(mode='OBJECT')
+    operator._job_iter = job_iter
+    wm = context.window_manager
+    operator._timer = wm.event_timer_add(0.01, context.window)
+    wm.modal_handler_add(operator)
+    wm.progress_begin(0, 100)
+    return {'RUNNING_MODAL'}
+
+def cas_chunked_child_job_modal(operator, context, event, label_str):
+    if event.type == 'ESC':
+        cas_end_chunked_child_job(operator, context)    # stops the job between pieces of work
+        operator.report({'INFO'}, label_str + ": cancelled")
+        return {'FINISHED'}
+    
+    if event.type != 'TIMER':
+        # Block everything else until the job is done - the objects and materials must not change underneath it
+        return {'RUNNING_MODAL'}
+    
+    stop_time_float = time.time() + cas_chunked_child_job_seconds_per_tick_float
+    done_int, total_int = 0, 0
+    try:
+        while time.time() < stop_time_float:
+            done_int, total_int = next(operator._job_iter)
+    except StopIteration:
+        cas_end_chunked_child_job(operator, context)
+        return {'FINISHED'}
+    
+    context.window_manager.progress_update(100 * done_int // max(total_int, 1))
+    if (context.area != None):
+        context.area.header_text_set("%s: %d / %d  (ESC to cancel)" % (label_str, done_int, total_int))
+    return {'RUNNING_MODAL'}
+
+# Called when the job is done, ESC is pressed, or the operator is cancelled (e.g. the window is closed or a file is loaded).
+# Closing the job generator runs its finally block now - the remove job updates the parent's child list there - 
+# rather than when it is garbage collected, by which time the parent pynode may have gone.
+def cas_end_chunked_child_job(operator, context):
+    if (operator._job_iter != None):
+        operator._job_iter.close()
+        operator._job_iter = None
+    wm = context.window_manager
+    if (operator._timer != None):
+        wm.event_timer_remove(operator._timer)
+        operator._timer = None
+    wm.progress_end()
+    if (context.area != None):
+        context.area.header_text_set()
+# < !Chunked child jobs >
+
+
 # < Add ChildNodes to Selected Objects>
 # select all objects in the scene that are a child of the parent node
 class casBtnAddChildNodesToSelected(bpy.types.Operator):
     bl_idname = "cas_btn.add_child_nodes_to_selected"
     bl_label = "Add ChildNodes to Selected"
     bl_description = "Add 'child' cutaway shaders to selected objects materials. Child shaders inherit all the settings from this parent shader (e.g.  Effect Mix, Cutaway Plane Selection etc ...)"
+    bl_options = {'REGISTER', 'UNDO'}                               # all the changes are one undo step
     
     # A link back to the setup node that this button sits in (there may be more that 1 setup node in the tree)
     setupnode_namestr_asts = bpy.props.StringProperty(name="")      # passed to us as a keyword argument on creation
+    
+    _timer = None
+    _job_iter = None
       
-    # The add cutaway plane button has been pressed
+    # Called from a script: add the child nodes in one go
     def execute(self, context):
         # Get a reference to the parent node where the button whas pressed  
         node_tree = context.space_data.edit_tree
         nodes = node_tree.nodes
         py_node = nodes[self.setupnode_namestr_asts]
           
-        # tell the parent node to select all ChildNodes in the scene
+        # tell the parent node to add child nodes to the selected objects
         py_node.add_child_nodes_to_selected()
         return{'FINISHED'} 
+    
+    # The button has been pressed: add the child nodes a chunk at a time (see cas_start_chunked_child_job)
+    def invoke(self, context, event):
+        py_node = context.space_data.edit_tree.nodes[self.setupnode_namestr_asts]
+        return cas_start_chunked_child_job(self, context, py_node.add_child_nodes_to_objects_iter(list(context.selected_objects)))
+    
+    def modal(self, context, event):
+        return cas_chunked_child_job_modal(self, context, event, "Adding child cutaway shaders")
+    
+    def cancel(self, context):
+        cas_end_chunked_child_job(self, context)
      
     # Check to see if we should be displayed
     @classmethod
@@ -170,20 +249,35 @@ class casBtnRemoveChildNodesFromSelected(bpy.types.Operator):
     bl_idname = "cas_btn.remove_child_nodes_from_selected"
     bl_label = "Remove ChildNodes from Selected"
     bl_description = "Remove this parents child shaders from the materials of the selected objects."
+    bl_options = {'REGISTER', 'UNDO'}                               # all the changes are one undo step
     
     # A link back to the setup node that this button sits in (there may be more that 1 setup node in the tree)
     setupnode_namestr_rsfs = bpy.props.StringProperty(name="")      # passed to us as a keyword argument on creation
+    
+    _timer = None
+    _job_iter = None
       
-    # The add cutaway plane button has been pressed
+    # Called from a script: remove the child nodes in one go
     def execute(self, context):
         # Get a reference to the parent node where the button whas pressed  
         node_tree = context.space_data.edit_tree
         nodes = node_tree.nodes
         py_node = nodes[self.setupnode_namestr_rsfs]
           
-        # tell the parent node to select all ChildNodes in the scene
+        # tell the parent node to remove its child nodes from the selected objects
         py_node.remove_child_nodes_from_selected()
         return{'FINISHED'} 
+    
+    # The button has been pressed: remove the child nodes a chunk at a time (see cas_start_chunked_child_job)
+    def invoke(self, context, event):
+        py_node = context.space_data.edit_tree.nodes[self.setupnode_namestr_rsfs]
+        return cas_start_chunked_child_job(self, context, py_node.remove_child_nodes_from_objects_iter(list(context.selected_objects), set()))
+    
+    def modal(self, context, event):
+        return cas_chunked_child_job_modal(self, context, event, "Removing child cutaway shaders")
+    
+    def cancel(self, context):
+        cas_end_chunked_child_job(self, context)
      
     # Check to see if we should be displayed
     @classmethod
@@ -486,6 +580,211 @@ class cas_btn_auto_refresh_child_nodes_after_frame_change(bpy.types.Operator):
         return True
 # < !Auto Refresh Child nodes with parents keyframed data (if any) (after key frame change )  Button >
 
+# < Drive Child nodes with the parents keyframed data (instead of python frame change callbacks) Button >
+class cas_btn_drive_child_nodes_with_drivers(bpy.types.Operator):
+    bl_idname = "cas_btn.drive_child_nodes_with_drivers"
+    bl_label = "Use Drivers"
+    bl_description = "Child shader nodes follow their parent's Effect Mix, Rim Effect Mix and Edge Fade settings through drivers, instead of being updated by python when the frame changes. Faster in big scenes and for final renders."
+    # A link back to the setup node that this button sits in (there may be more that 1 setup node in the tree)
+    setupnode_namestr_dcnwd = bpy.props.StringProperty(name="")      # passed to us as a keyword argument on creation
+      
+    # Buttons execute method. 
+    def execute(self, context):
+        # get a reference to this buttons pynode
+        node_tree = context.space_data.edit_tree
+        nodes = node_tree.nodes
+        py_node = nodes[self.setupnode_namestr_dcnwd]
+        
+        # The drivers would override the frozen key frames 
+        if (py_node.get_global_frozen_for_render_bool()):
+            self.report({'WARNING'}, "Unfreeze before using drivers")
+            return{'CANCELLED'}
+        
+        # invert the drivers status, add or remove the drivers for all parent and child nodes, and add or remove the frame change callbacks.
+        drive_bool = py_node.get_global_drive_child_nodes_with_drivers_bool_create_if_neccessary()
+        drive_bool = not drive_bool
+        py_node.set_global_drive_child_nodes_with_drivers_bool_create_if_neccessary(drive_bool)
+        py_node.update_keyed_value_drivers_for_all_parent_nodes(drive_bool)
+        cas_update_keyed_value_frame_handler_registration()
+        return{'FINISHED'} 
+     
+    # Check to see if we should be displayed
+    @classmethod
+    def poll(self, context):
+        return True
+# < !Drive Child nodes with the parents keyframed data (instead of python frame change callbacks) Button >
+
+# < Check Parent/Child Links Button >
+# Reconcile the parent/child links of all the cutaway shader nodes in the file (see cas_reconcile_parent_child_links)
+class casBtnReconcileParentChildLinks(bpy.types.Operator):
+    bl_idname = "cas_btn.reconcile_parent_child_links"
+    bl_label = "Check Parent/Child Links"
+    bl_description = "Check the parent/child links of all the cutaway shader nodes in the file. Removes references to deleted child nodes, and flags child nodes whose parent has been deleted"
+    
+    # A link back to the setup node that this button sits in (there may be more that 1 setup node in the tree)
+    setupnode_namestr_rpcl = bpy.props.StringProperty(name="")      # passed to us as a keyword argument on creation
+      
+    def execute(self, context):
+        count_dict = cas_reconcile_parent_child_links()
+        self.report({'INFO'}, cas_reconcile_report_str(count_dict))
+        return{'FINISHED'} 
+     
+    # Check to see if we should be displayed
+    @classmethod
+    def poll(self, context):
+        return True
+# < !Check Parent/Child Links Button >
+
+# < Freeze for Render Button >
+# Copy the key framed parent settings onto the child (and parent) OSL node inputs as key frames, so the file renders
+# without the frame change callbacks (even with python scripts disabled). Press again to unfreeze for live editing.
+class cas_btn_freeze_keyed_values_for_render(bpy.types.Operator):
+    bl_idname = "cas_btn.freeze_keyed_values_for_render"
+    bl_label = "Freeze for Render"
+    bl_description = "Copy the key framed Effect Mix, Rim Effect Mix and Edge Fade values of all parent nodes onto their child shader nodes as key frames. Renders without any python per frame. Unfreeze before editing the key frames."
+    # A link back to the setup node that this button sits in (there may be more that 1 setup node in the tree)
+    setupnode_namestr_fkvfr = bpy.props.StringProperty(name="")      # passed to us as a keyword argument on creation
+      
+    def execute(self, context):
+        # get a reference to this buttons pynode
+        node_tree = context.space_data.edit_tree
+        nodes = node_tree.nodes
+        py_node = nodes[self.setupnode_namestr_fkvfr]
+        
+        if (py_node.get_global_frozen_for_render_bool()):
+            # Unfreeze: remove the frozen key frames, and copy the current parent values over
+            cas_remove_frozen_fcurves()
+            py_node.set_global_frozen_for_render_bool(False)
+            cas_reset_propagation_frame_key()
+            py_node.manual_refresh_child_nodes_after_frame_change()
+        else:
+            # The drivers would override the frozen key frames 
+            if (py_node.get_global_drive_child_nodes_with_drivers_bool_create_if_neccessary()):
+                self.report({'WARNING'}, "Turn off 'Use Drivers' before freezing")
+                return{'CANCELLED'}
+            
+            cas_remove_frozen_fcurves()
+            for mat in bpy.data.materials:
+                if mat.use_nodes:
+                    for node in mat.node_tree.nodes:
+                        if "Cutaway Shader" in node.name:
+                            if node.node_is_parent == True:
+                                node.freeze_keyed_values_for_this_parent_and_child_nodes()
+            py_node.set_global_frozen_for_render_bool(True)
+        
+        cas_update_keyed_value_frame_handler_registration()
+        return{'FINISHED'} 
+     
+    # Check to see if we should be displayed
+    @classmethod
+    def poll(self, context):
+        return True
+# < !Freeze for Render Button >
+
+# < Bake Key Frames Button >
+# Evaluate the key framed parent settings for every frame in the scene's frame range and store them in the parent nodes.
+# Useful before rendering an animation (e.g. on a render farm) - the frame change callbacks just look up the values for each frame.
+class casBtnBakeKeyedValues(bpy.types.Operator):
+    bl_idname = "cas_btn.bake_keyed_values"
+    bl_label = "Bake Key Frames"
+    bl_description = "Store the key framed Effect Mix, Rim Effect Mix and Edge Fade values of all parent nodes for every frame in the scene's frame range. Bake again after changing the key frames."
+    
+    # A link back to the setup node that this button sits in (there may be more that 1 setup node in the tree)
+    setupnode_namestr_bkv = bpy.props.StringProperty(name="")      # passed to us as a keyword argument on creation
+      
+    def execute(self, context):
+        scene = context.scene
+        baked_count_int = 0
+        for mat in bpy.data.materials:
+            if mat.use_nodes:
+                for node in mat.node_tree.nodes:
+                    if "Cutaway Shader" in node.name:
+                        if node.node_is_parent == True:
+                            if node.bake_keyed_values(scene.frame_start, scene.frame_end):
+                                baked_count_int += 1
+        cas_rebuild_baked_parent_refs()
+        self.report({'INFO'}, "Baked " + str(baked_count_int) + " key framed parent node(s), frames " + str(scene.frame_start) + "-" + str(scene.frame_end))
+        return{'FINISHED'} 
+     
+    # Check to see if we should be displayed
+    @classmethod
+    def poll(self, context):
+        return True
+# < !Bake Key Frames Button >
+
+# < Clear Baked Key Frames Button >
+class casBtnClearBakedKeyedValues(bpy.types.Operator):
+    bl_idname = "cas_btn.clear_baked_keyed_values"
+    bl_label = "Clear Bake"
+    bl_description = "Remove the baked key frame values from all parent nodes"
+    
+    # A link back to the setup node that this button sits in (there may be more that 1 setup node in the tree)
+    setupnode_namestr_cbkv = bpy.props.StringProperty(name="")      # passed to us as a keyword argument on creation
+      
+    def execute(self, context):
+        for mat in bpy.data.materials:
+            if mat.use_nodes:
+                for node in mat.node_tree.nodes:
+                    if "Cutaway Shader" in node.name:
+                        if node.node_is_parent == True:
+                            node.clear_baked_keyed_values()
+        cas_rebuild_baked_parent_refs()
+        cas_reset_propagation_frame_key()
+        return{'FINISHED'} 
+     
+    # Check to see if we should be displayed
+    @classmethod
+    def poll(self, context):
+        return True
+# < !Clear Baked Key Frames Button >
+
+# < Deferred Child Sync timer >
+# Started by a parent pynode when one of its sliders is changed and 'Deferred Child Sync' is checked.
+# The parent's OSL node is updated straight away, the child nodes are updated by this timer (at most once every interval_float seconds).
+# All the slider changes made during an interval are coalesced into a single update of the child nodes.
+# The timer stops itself once the sliders have not changed for a couple of ticks.
+class casDeferredChildSyncTimer(bpy.types.Operator):
+    bl_idname = "cas_btn.deferred_child_sync_timer"
+    bl_label = "Deferred Child Sync"
+    bl_description = "Copy changed parent settings to the child nodes at a fixed rate"
+    
+    interval_float = bpy.props.FloatProperty(name="", default = 0.1)  # passed to us as a keyword argument on creation
+    
+    _timer = None
+    _idle_ticks_int = 0
+    
+    def invoke(self, context, event):
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(self.interval_float, context.window)
+        wm.modal_handler_add(self)
+        cas_deferred_child_sync_state_dict['timer_running'] = True
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'TIMER':
+            if (cas_flush_deferred_child_sync() == 0):
+                self._idle_ticks_int += 1
+            else:
+                self._idle_ticks_int = 0
+            if (self._idle_ticks_int >= 2):
+                self.stop_timer(context)
+                return {'FINISHED'}
+        elif event.type == 'LEFTMOUSE' and event.value == 'RELEASE':
+            # The slider has been released: final flush
+            cas_flush_deferred_child_sync()
+        
+        # Let the events through to the sliders
+        return {'PASS_THROUGH'}
+    
+    def cancel(self, context):
+        self.stop_timer(context)
+        cas_flush_deferred_child_sync()
+    
+    def stop_timer(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        cas_deferred_child_sync_state_dict['timer_running'] = False
+# < !Deferred Child Sync timer >
+
 # < Refresh Cutaway plane (after key frame change )  Button >
 # some times the change is not picked up by the pre-frame change routine
 # needs further investigation.
@@ -976,6 +1275,1014 @@ class casWarningDialogOperator(bpy.types.Operator):
 
 
 
+# *************************************************************************************
+# *************************************************************************************
+#
+# Key frame propagation helpers (used by the frame change and render callbacks)
+#
+# *************************************************************************************
+# *************************************************************************************
+
+# Every write to an OSL node input makes Cycles re-sync the material's shader - even if the value has not changed.
+# So, OSL inputs and child pynode properties are written through cas_set_if_changed(), which skips writes that would not change anything.
+# The applied and elided (skipped) write counts are shown in the parent pynode's debug display.
+cas_write_stats_dict = {'applied': 0, 'elided': 0}
+
+# Floats are compared with a small tolerance (the values have been through float32 storage)
+def cas_values_are_equal(old_value, new_value):
+    if isinstance(new_value, float) or isinstance(old_value, float):
+        return abs(old_value - new_value) <= 1e-6 * max(1.0, abs(old_value), abs(new_value))
+    if isinstance(new_value, (str, bool, int)):
+        return old_value == new_value
+    
+    # vectors, colours (bpy_prop_array, mathutils.Vector, tuples, ...)
+    if len(old_value) != len(new_value):
+        return False
+    for i in range(len(new_value)):
+        if not cas_values_are_equal(old_value[i], new_value[i]):
+            return False
+    return True
+
+# Set owner.attr_name_str = value, unless it already has that value. Returns True if the write was applied.
+# Note: Writing a pynode property calls its update callback - so an elided write does not call the update callback either.
+def cas_set_if_changed(owner, attr_name_str, value):
+    if cas_values_are_equal(getattr(owner, attr_name_str), value):
+        cas_write_stats_dict['elided'] += 1
+        return False
+    setattr(owner, attr_name_str, value)
+    cas_write_stats_dict['applied'] += 1
+    return True
+
+# Set an OSL node input's default_value, unless it already has that value.
+def cas_set_osl_input_if_changed(osl_node, input_name_str, value):
+    return cas_set_if_changed(osl_node.inputs[input_name_str], 'default_value', value)
+
+
+# The parent pynode values that were last pushed to the child nodes.
+# Keyed by the parent pynode unique id str. Each entry is a dict of {property name : last pushed value}.
+# This lets the frame change callbacks skip parents whose (possibly key framed) values have not changed since the previous frame.
+# The dict is in memory only - it is cleared when a .blend file is loaded, so the first frame after a load pushes everything once.
+# Parents without a unique id (yet) are not kept here - they would all share the one entry
+cas_keyed_value_snapshot_dict = {}
+
+
+# There was an issue where key framed values on a parent pynode were not being copied to the child nodes
+# when the time line was moved, or when an animation was being rendered.
+# The callback allows the master pynode to copy the appropriate parameters to all its child nodes.
+# Note: If there are *alot* of child nodes - then it can take some time to update all the parameters, so there is
+# a check box to turn off the automatic update during render previews, and a 'drivers' mode (see below) that
+# lets Blender's driver system copy the key framed values to the child OSL nodes instead.
+# The callbacks are persistent, so they survive loading another .blend file. cas_load_post_callback re-checks
+# whether they are wanted for the newly loaded file.
+@persistent
+def cas_frame_change_callback_update_child_nodes_with_keyed_values(scene):
+    # Check if global_auto_update_child_nodes_on_frame_change_bool has been defined
+    if 'global_auto_update_child_nodes_on_frame_change_bool' not in bpy.context.scene.keys():
+        bpy.context.scene['global_auto_update_child_nodes_on_frame_change_bool'] = True
+        
+    if bpy.context.scene['global_auto_update_child_nodes_on_frame_change_bool'] == False:
+        return
+    
+    cas_propagate_keyed_values_once_per_frame(scene)
+
+
+@persistent
+def cas_render_pre_callback_update_child_nodes_with_keyed_values(scene):
+    cas_propagate_keyed_values_once_per_frame(scene)
+
+
+# During an animation render both frame_change_pre and render_pre are called for every frame.
+# The propagation is keyed by (scene name, frame, subframe) so the work is only done once per frame - the second call is a no-op.
+# Editing key frames forgets the key (see cas_scene_update_post_callback), so setting the same frame again pushes the edited values.
+# 'skipped' counts the calls that were no-ops. The counts are printed when a render finishes (handy for checking render farm logs).
+cas_propagation_stats_dict = {'last_frame_key': None, 'ran': 0, 'skipped': 0}
+
+# The shared propagation engine for the frame change and render callbacks.
+def cas_propagate_keyed_values_once_per_frame(scene):
+    # Drivers (or frozen fcurves) are doing the work for us
+    if scene.get('global_drive_child_nodes_with_drivers_bool', False) or scene.get('global_frozen_for_render_bool', False):
+        return
+    
+    frame_key = (scene.name, scene.frame_current, scene.frame_subframe)
+    if (frame_key == cas_propagation_stats_dict['last_frame_key']):
+        cas_propagation_stats_dict['skipped'] += 1
+        return
+    cas_propagation_stats_dict['last_frame_key'] = frame_key
+    cas_propagation_stats_dict['ran'] += 1
+    
+    # Baked parents just look up the values for this frame. If all the animated parents are baked, we are done.
+    if cas_push_baked_keyed_values(scene):
+        return
+    
+    #print("frame change: frame" + str(scene.frame_current))
+    # iterate over the scene's materials. For parent pynodes - copy any key framed data that changed since the last frame to the parent osl shader and child osl shaders
+    for mat in cas_get_scene_materials(scene):
+        if mat.use_nodes:
+            for node in mat.node_tree.nodes:
+                if "Cutaway Shader" in node.name:
+                    if node.node_is_parent == True:
+                        if node.get_baked_keyed_values_for_frame(scene) != None:
+                            continue                                    # already done by cas_push_baked_keyed_values
+                        node.push_keyed_values_to_child_nodes_if_changed()
+
+
+# The materials used by the objects in a scene (including the objects in dupli groups).
+# bpy.data.materials holds the materials of every scene, linked libraries and fake user materials - most of which are never rendered
+# by the scene being evaluated. So, the propagation only looks at the materials that the scene can reach.
+# Scene name => (signature, list of material names). The list is rebuilt when the signature changes (objects/materials added or removed),
+# or when cas_invalidate_scene_material_cache() is called: when an object's material slots change (see cas_scene_update_post_callback,
+# which uses the object index's slot signatures to tell), and on file load, child nodes added, render start and manual refresh.
+cas_scene_material_cache_dict = {}
+
+def cas_get_scene_material_cache_signature(scene):
+    return (len(scene.objects), len(bpy.data.materials), len(bpy.data.objects), len(bpy.data.groups))
+
+# Add the materials used by the given objects (and any dupli group objects) to the material name set
+def cas_add_object_materials_to_set(objects, mat_name_set, visited_group_name_set):
+    for obj in objects:
+        for matslot in obj.material_slots:
+            if (matslot.material != None):
+                mat_name_set.add(matslot.material.name)
+        if (obj.dupli_type == 'GROUP' and obj.dupli_group != None and obj.dupli_group.name not in visited_group_name_set):
+            visited_group_name_set.add(obj.dupli_group.name)                     # groups can contain each other - only visit each group once
+            cas_add_object_materials_to_set(obj.dupli_group.objects, mat_name_set, visited_group_name_set)
+
+# Return a list of the materials that the scene's objects use
+def cas_get_scene_materials(scene):
+    cas_refresh_object_index(scene)                                 # (slot changes are spotted by comparing with the object index)
+    signature = cas_get_scene_material_cache_signature(scene)
+    cache_entry = cas_scene_material_cache_dict.get(scene.name)
+    if (cache_entry == None or cache_entry[0] != signature):
+        mat_name_set = set()
+        cas_add_object_materials_to_set(scene.objects, mat_name_set, set())
+        cache_entry = (signature, list(mat_name_set))
+        cas_scene_material_cache_dict[scene.name] = cache_entry
+    
+    scene_material_list = []
+    for mat_name_str in cache_entry[1]:
+        mat = bpy.data.materials.get(mat_name_str)
+        if (mat != None):
+            scene_material_list.append(mat)
+    return scene_material_list
+
+def cas_invalidate_scene_material_cache():
+    cas_scene_material_cache_dict.clear()
+
+
+# Pynode registry: unique_pynode_id_str => (material name, pynode name) for every cutaway shader pynode.
+# Finding a parent or child pynode used to mean looping over all materials and nodes for every look up.
+# The registry is built on file load. Each look up checks that the node still exists and still has the id
+# (nodes can be deleted, renamed or copied). On a miss the registry is rebuilt, and the look up tried again.
+# 'rebuild_count' lets callers doing many look ups limit themselves to one rebuild (see carry_out_action_on_this_parents_child_nodes_b).
+# 'parent_id_set' holds the ids of the parent pynodes - so the few parents can be visited without going through all the child nodes.
+cas_pynode_registry_dict = {'id_to_ref_dict': {}, 'parent_id_set': set(), 'rebuild_count': 0}
+
+def cas_rebuild_pynode_registry():
+    id_to_ref_dict = {}
+    parent_id_set = set()
+    for mat in bpy.data.materials:
+        if mat.use_nodes and 'cas_child_template_parent_id_str' not in mat:        # (child templates are not real child nodes)
+            for node in mat.node_tree.nodes:
+                if "Cutaway Shader" in node.name:
+                    unique_pynode_id_str = node.get('unique_pynode_id_str', '0')
+                    if (unique_pynode_id_str != '0'):
+                        id_to_ref_dict[unique_pynode_id_str] = (mat.name, node.name)
+                        if node.node_is_parent:
+                            parent_id_set.add(unique_pynode_id_str)
+    cas_pynode_registry_dict['id_to_ref_dict'] = id_to_ref_dict
+    cas_pynode_registry_dict['parent_id_set'] = parent_id_set
+    cas_pynode_registry_dict['rebuild_count'] += 1
+
+# Returns (material, pynode) for the registered id, or (None, None) if the registered node is gone or has a different id
+def cas_get_registered_pynode(unique_pynode_id_str):
+    ref = cas_pynode_registry_dict['id_to_ref_dict'].get(unique_pynode_id_str)
+    if (ref != None):
+        mat = bpy.data.materials.get(ref[0])
+        if (mat != None and mat.node_tree != None and ref[1] in mat.node_tree.nodes):
+            node = mat.node_tree.nodes[ref[1]]
+            if (node.get('unique_pynode_id_str') == unique_pynode_id_str):
+                return mat, node
+    return None, None
+
+# Find a pynode from its unique id. Returns (material, pynode) or (None, None) if there is no such pynode.
+def cas_find_pynode_by_unique_id(unique_pynode_id_str, allow_rebuild_bool = True):
+    if (unique_pynode_id_str == '' or unique_pynode_id_str == '0'):
+        return None, None
+    mat, node = cas_get_registered_pynode(unique_pynode_id_str)
+    if (node == None and allow_rebuild_bool):
+        cas_rebuild_pynode_registry()
+        mat, node = cas_get_registered_pynode(unique_pynode_id_str)
+    return mat, node
+
+
+# Object index: which scene objects use which materials, and which materials contain which pynodes.
+# get_all_objs_using_pynode used to loop over every object, material slot and node for every call.
+#   'obj_slot_signature_dict'   object name => tuple of its material slot's material names (detects slot changes)
+#   'mat_to_obj_name_dict'      material name => set of the names of the objects using it
+#   'id_to_mat_name_dict'       pynode unique id => set of the names of the materials containing it (None until first needed)
+# The objects are indexed in full the first time the index is used, when the scene changes, when objects are added or removed 
+# (the object count changes), and after cas_mark_object_index_dirty(). After that the index is kept up to date a piece at a time:
+# cas_scene_update_post_callback re-indexes just the objects flagged is_updated, and the pynode ids are added and removed 
+# where child nodes are added and removed (cas_index_pynode / cas_unindex_pynode).
+# 'generation' goes up whenever an object's material slots change. 'rebuild_count' goes up when the objects are indexed in full.
+cas_object_index_dict = {'scene_name': None, 'obj_slot_signature_dict': {}, 'mat_to_obj_name_dict': {}, 'id_to_mat_name_dict': None, 
+                         'dirty_bool': True, 'generation': 0, 'rebuild_count': 0, 'frame_key': None}
+
+def cas_mark_object_index_dirty():
+    cas_object_index_dict['dirty_bool'] = True
+
+def cas_get_object_slot_signature(obj):
+    return tuple([matslot.material.name for matslot in obj.material_slots if matslot.material != None])
+
+# (Re)index one object's material slots. Returns the set of material names whose users have changed (empty if the slots are the same)
+def cas_index_object_material_slots(obj):
+    obj_slot_signature_dict = cas_object_index_dict['obj_slot_signature_dict']
+    mat_to_obj_name_dict = cas_object_index_dict['mat_to_obj_name_dict']
+    signature = cas_get_object_slot_signature(obj)
+    old_signature = obj_slot_signature_dict.get(obj.name)
+    if (signature == old_signature):
+        return set()
+    if (old_signature != None):
+        for mat_name_str in old_signature:
+            mat_to_obj_name_dict.get(mat_name_str, set()).discard(obj.name)
+    for mat_name_str in signature:
+        if mat_name_str not in mat_to_obj_name_dict:
+            mat_to_obj_name_dict[mat_name_str] = set()
+        mat_to_obj_name_dict[mat_name_str].add(obj.name)
+    obj_slot_signature_dict[obj.name] = signature
+    return set(signature) | set(old_signature or ())
+
+def cas_refresh_object_index(scene):
+    index = cas_object_index_dict
+    if (index['scene_name'] != scene.name or len(index['obj_slot_signature_dict']) != len(scene.objects)):
+        index['dirty_bool'] = True                                      # a different scene, or objects have been added or removed
+    
+    # the pynodes in each material (there are far fewer materials than objects in big assemblies). Built once, then kept up to date by 
+    # cas_index_pynode / cas_unindex_pynode - and checked by cas_get_objects_using_pynode as it is used.
+    if (index['id_to_mat_name_dict'] == None):
+        id_to_mat_name_dict = {}
+        for mat in bpy.data.materials:
+            if mat.use_nodes and 'cas_child_template_parent_id_str' not in mat:
+                for node in mat.node_tree.nodes:
+                    if "Cutaway Shader" in node.name:
+                        unique_pynode_id_str = node.get('unique_pynode_id_str', '0')
+                        if unique_pynode_id_str not in id_to_mat_name_dict:
+                            id_to_mat_name_dict[unique_pynode_id_str] = set()
+                        id_to_mat_name_dict[unique_pynode_id_str].add(mat.name)
+        index['id_to_mat_name_dict'] = id_to_mat_name_dict
+    
+    if (index['dirty_bool'] == False):
+        return
+    
+    # index all the objects in the scene
+    index['scene_name'] = scene.name
+    index['obj_slot_signature_dict'] = {}
+    index['mat_to_obj_name_dict'] = {}
+    for obj in scene.objects:
+        cas_index_object_material_slots(obj)
+    index['dirty_bool'] = False
+    index['generation'] += 1
+    index['rebuild_count'] += 1
+
+# Re-index the scene objects flagged is_updated (called by cas_scene_update_post_callback, while the flags are set).
+# Returns (list of the updated objects, set of the material names whose users have changed) - or (None, None) if the index 
+# is going to be built in full anyway, so there is nothing to compare with.
+# Cost: finding the flagged objects means looking at every scene object (there is no list of the updated objects in 2.7x) - 
+# about 1 attribute read per object, per scene update that has bpy.data.objects.is_updated set. The updates that come from 
+# a frame change (playback, scrubbing) are skipped: those are animated objects moving, and material slots can't be key framed.
+# (So visibility that is key framed isn't followed by the lazy child sync until the index is rebuilt, or a render starts.)
+def cas_update_object_index_for_updated_objects(scene, frame_changed_bool):
+    index = cas_object_index_dict
+    if frame_changed_bool:
+        return [], set()
+    if (index['dirty_bool'] or index['scene_name'] != scene.name):
+        return None, None
+    updated_obj_list = [obj for obj in scene.objects if obj.is_updated or obj.is_updated_data]
+    changed_mat_name_set = set()
+    for obj in updated_obj_list:
+        changed_mat_name_set |= cas_index_object_material_slots(obj)
+    if (len(changed_mat_name_set) > 0):
+        index['generation'] += 1
+    return updated_obj_list, changed_mat_name_set
+
+# Has the scene's frame changed since the last scene update? (called by cas_scene_update_post_callback, on every scene update)
+def cas_scene_frame_has_changed(scene):
+    index = cas_object_index_dict
+    frame_key = (scene.name, scene.frame_current, scene.frame_subframe)
+    if (index['frame_key'] == frame_key):
+        return False
+    frame_changed_bool = (index['frame_key'] != None and index['frame_key'][0] == scene.name)
+    index['frame_key'] = frame_key
+    return frame_changed_bool
+
+# Our own code has changed an object's material slots (e.g. adding child nodes) - re-index it straight away
+def cas_reindex_object(obj):
+    changed_mat_name_set = cas_index_object_material_slots(obj)
+    if (len(changed_mat_name_set) > 0):
+        cas_object_index_dict['generation'] += 1
+        cas_invalidate_scene_material_cache()
+        cas_update_relevant_materials(bpy.context.scene, [obj], changed_mat_name_set)
+    return changed_mat_name_set
+
+# A pynode has been added to a material (or removed from it): keep the pynode registry and the object index up to date
+def cas_index_pynode(mat, py_node):
+    unique_pynode_id_str = py_node.get('unique_pynode_id_str', '0')
+    if (unique_pynode_id_str == '0'):
+        return
+    cas_pynode_registry_dict['id_to_ref_dict'][unique_pynode_id_str] = (mat.name, py_node.name)
+    if py_node.node_is_parent:
+        cas_pynode_registry_dict['parent_id_set'].add(unique_pynode_id_str)
+    id_to_mat_name_dict = cas_object_index_dict['id_to_mat_name_dict']
+    if (id_to_mat_name_dict != None):
+        if unique_pynode_id_str not in id_to_mat_name_dict:
+            id_to_mat_name_dict[unique_pynode_id_str] = set()
+        id_to_mat_name_dict[unique_pynode_id_str].add(mat.name)
+
+def cas_unindex_pynode(mat, py_node):
+    unique_pynode_id_str = py_node.get('unique_pynode_id_str', '0')
+    cas_pynode_registry_dict['id_to_ref_dict'].pop(unique_pynode_id_str, None)
+    cas_pynode_registry_dict['parent_id_set'].discard(unique_pynode_id_str)
+    id_to_mat_name_dict = cas_object_index_dict['id_to_mat_name_dict']
+    if (id_to_mat_name_dict != None):
+        id_to_mat_name_dict.get(unique_pynode_id_str, set()).discard(mat.name)
+
+# Register a pynode that the registry doesn't know about yet (e.g. a parent the user has just added). 
+# The node tree doesn't know which material it belongs to - so look for the material (without looking at the nodes).
+def cas_register_pynode(py_node):
+    for mat in bpy.data.materials:
+        if (mat.node_tree == py_node.id_data):
+            cas_index_pynode(mat, py_node)
+            return
+
+# Does the material (still) contain the pynode with the given id?
+def cas_material_has_pynode(mat_name_str, unique_pynode_id_str):
+    mat = bpy.data.materials.get(mat_name_str)
+    if (mat == None or mat.node_tree == None):
+        return False
+    for node in mat.node_tree.nodes:
+        if (node.bl_idname == 'CutAwayShaderNodeType' and node.get('unique_pynode_id_str') == unique_pynode_id_str):
+            return True
+    return False
+
+# Returns a list of the scene objects using a material that contains the pynode with the given id, 
+# and the (first) material slot of each object that uses the pynode.
+# Cost: each material indexed for the pynode is checked (its nodes are looked through - cas_material_has_pynode), 
+# then the objects using those materials are looked up by name - no pass over all the scene objects.
+def cas_get_objects_using_pynode(scene, unique_pynode_id_str):
+    cas_refresh_object_index(scene)
+    id_to_mat_name_dict = cas_object_index_dict['id_to_mat_name_dict']
+    
+    # Pynodes deleted by hand (or materials renamed) leave old entries behind: check them, and ask the pynode registry if none are left
+    mat_name_set = set([mat_name_str for mat_name_str in id_to_mat_name_dict.get(unique_pynode_id_str, ()) if cas_material_has_pynode(mat_name_str, unique_pynode_id_str)])
+    if (len(mat_name_set) == 0):
+        mat, py_node = cas_find_pynode_by_unique_id(unique_pynode_id_str)
+        if (py_node != None):
+            mat_name_set.add(mat.name)
+    id_to_mat_name_dict[unique_pynode_id_str] = mat_name_set
+    
+    obj_name_set = set()
+    for mat_name_str in mat_name_set:
+        obj_name_set |= cas_object_index_dict['mat_to_obj_name_dict'].get(mat_name_str, set())
+    
+    obj_list = []
+    matslot_list = []
+    for obj_name_str in obj_name_set:
+        obj = scene.objects.get(obj_name_str)
+        if (obj == None):
+            cas_mark_object_index_dirty()                                       # renamed (or removed) - index again on the next look up
+            continue
+        for matslot in obj.material_slots:
+            if (matslot.material != None and matslot.material.name in mat_name_set):
+                obj_list.append(obj)
+                matslot_list.append(matslot)
+                break
+    return obj_list, matslot_list
+
+# Objects have changed (slots assigned, objects added, moved ...) - re-index the objects flagged is_updated.
+# This is called very often, so it just checks the is_updated flags.
+@persistent
+def cas_scene_update_post_callback(scene):
+    frame_changed_bool = cas_scene_frame_has_changed(scene)
+    if bpy.data.objects.is_updated:
+        updated_obj_list, changed_mat_name_set = cas_update_object_index_for_updated_objects(scene, frame_changed_bool)
+        # A material slot has been (re)assigned: the scene may use different materials now. 
+        # (None => the index isn't built yet, so we can't tell - assume it has)
+        if (changed_mat_name_set == None or len(changed_mat_name_set) > 0):
+            cas_invalidate_scene_material_cache()
+        
+        # Objects may have been un-hidden or given new materials - bring any stale child nodes that are now visible up to date
+        # (just moving objects about - or playing an animation - doesn't make any materials relevant, so doesn't cause a sync)
+        if (updated_obj_list != None and cas_update_relevant_materials(scene, updated_obj_list, changed_mat_name_set) and len(cas_stale_child_dict) > 0):
+            cas_sync_stale_child_nodes(scene)
+    
+    # The visible layers have changed
+    relevant_key = cas_lazy_child_sync_state_dict['relevant_key']
+    if (scene.is_updated and relevant_key != None and relevant_key[1] != tuple(scene.layers) and len(cas_stale_child_dict) > 0):
+        cas_sync_stale_child_nodes(scene)
+    
+    # Key frames may have been inserted, deleted or edited
+    if bpy.data.actions.is_updated:
+        cas_reset_propagation_frame_key()                                 # (so setting the same frame again pushes the edited values)
+        cas_check_parent_keyed_value_fcurves()
+        cas_update_outline_watch_frame_handler_registration(scene)       # (a cutaway plane's shape keys or modifiers may have been key framed)
+    
+    # Parent pynodes have been removed - remove their child templates
+    if (len(cas_child_template_removal_id_set) > 0):
+        cas_remove_pending_child_template_materials()
+    
+    # A cutaway plane may have been edited - check its outline
+    cas_watch_cutaway_plane_outlines(scene, frame_changed_bool)
+
+
+# Lazy child sync: Parent setting changes are only copied to child nodes that are 'relevant' - i.e. in a material
+# used by an object that is visible in the viewport (or by a dupli group, which are always treated as relevant).
+# The other child nodes are left 'stale' (their synced_parent_revision_int is behind their parent's child_sync_revision_int),
+# and brought up to date when they become visible, when a render starts, or when the Manual Refresh button is pressed.
+# Child pynode unique id str => parent pynode unique id str, for all the stale child nodes
+cas_stale_child_dict = {}
+# 'rendering_bool' - between render_init and render_complete/render_cancel, all child nodes are relevant
+# 'relevant_key' - (scene name, visible layers, object index rebuild count) that 'relevant_mat_name_set' was worked out in full for
+# 'obj_visible_dict' - object name => visible in the viewport, for the indexed objects
+cas_lazy_child_sync_state_dict = {'rendering_bool': False, 'relevant_key': None, 'relevant_mat_name_set': set(), 'obj_visible_dict': {}}
+
+def cas_get_relevant_key(scene):
+    return (scene.name, tuple(scene.layers), cas_object_index_dict['rebuild_count'])
+
+# Is a (scene) material used by a visible object? Materials with no objects of their own are only used by dupli group objects - these are relevant.
+def cas_material_is_relevant(mat_name_str):
+    obj_visible_dict = cas_lazy_child_sync_state_dict['obj_visible_dict']
+    obj_name_set = cas_object_index_dict['mat_to_obj_name_dict'].get(mat_name_str, ())
+    if (len(obj_name_set) == 0):
+        return True
+    for obj_name_str in obj_name_set:
+        if obj_visible_dict.get(obj_name_str, False):
+            return True
+    return False
+
+# The names of the materials whose child nodes must be kept up to date. Worked out in full when the scene, the visible layers 
+# or the objects (see cas_refresh_object_index) change - and kept up to date by cas_update_relevant_materials in between.
+def cas_get_relevant_material_name_set(scene):
+    cas_refresh_object_index(scene)
+    relevant_key = cas_get_relevant_key(scene)
+    state = cas_lazy_child_sync_state_dict
+    if (state['relevant_key'] != relevant_key):
+        obj_visible_dict = {}
+        for obj in scene.objects:
+            obj_visible_dict[obj.name] = obj.is_visible(scene)
+        state['obj_visible_dict'] = obj_visible_dict
+        state['relevant_mat_name_set'] = set([mat.name for mat in cas_get_scene_materials(scene) if cas_material_is_relevant(mat.name)])
+        state['relevant_key'] = relevant_key
+    return state['relevant_mat_name_set']
+
+# Some objects have been updated (cas_scene_update_post_callback), or had their material slots changed by us (cas_reindex_object).
+# Only the relevance of the materials whose users have changed, or that are used by an object that has been hidden or shown, is worked out again.
+# Objects that have just been moved change nothing. Returns True if a material may have become relevant (i.e. stale child nodes to sync).
+def cas_update_relevant_materials(scene, updated_obj_list, changed_mat_name_set):
+    state = cas_lazy_child_sync_state_dict
+    if (state['relevant_key'] != cas_get_relevant_key(scene)):
+        return True                                                 # worked out in full on the next look up
+    
+    obj_visible_dict = state['obj_visible_dict']
+    obj_slot_signature_dict = cas_object_index_dict['obj_slot_signature_dict']
+    recheck_mat_name_set = set(changed_mat_name_set)
+    for obj in updated_obj_list:
+        visible_bool = obj.is_visible(scene)
+        if (obj_visible_dict.get(obj.name) != visible_bool):
+            obj_visible_dict[obj.name] = visible_bool
+            recheck_mat_name_set.update(obj_slot_signature_dict.get(obj.name, ()))
+    if (len(recheck_mat_name_set) == 0):
+        return False
+    
+    became_relevant_bool = False
+    relevant_mat_name_set = state['relevant_mat_name_set']
+    scene_mat_name_set = None
+    for mat_name_str in recheck_mat_name_set:
+        relevant_bool = cas_material_is_relevant(mat_name_str)
+        if (relevant_bool and len(cas_object_index_dict['mat_to_obj_name_dict'].get(mat_name_str, ())) == 0):
+            # no objects of its own (any more) - only relevant if a dupli group still uses it
+            if (scene_mat_name_set == None):
+                scene_mat_name_set = set([mat.name for mat in cas_get_scene_materials(scene)])
+            relevant_bool = mat_name_str in scene_mat_name_set
+        if relevant_bool:
+            if mat_name_str not in relevant_mat_name_set:
+                relevant_mat_name_set.add(mat_name_str)
+                became_relevant_bool = True
+        else:
+            relevant_mat_name_set.discard(mat_name_str)
+    return became_relevant_bool
+
+# Should parent setting changes be copied to all child nodes straight away?
+def cas_lazy_child_sync_is_off():
+    return bpy.app.background or cas_lazy_child_sync_state_dict['rendering_bool']
+
+# Bring stale child nodes up to date. Only the relevant (visible) ones, unless all_bool is True
+def cas_sync_stale_child_nodes(scene, all_bool = False):
+    if (len(cas_stale_child_dict) == 0):
+        return
+    if not all_bool:
+        relevant_mat_name_set = cas_get_relevant_material_name_set(scene)
+    for child_id_str, parent_id_str in list(cas_stale_child_dict.items()):
+        child_mat, child_py_node = cas_find_pynode_by_unique_id(child_id_str, allow_rebuild_bool = False)
+        parent_mat, parent_py_node = cas_find_pynode_by_unique_id(parent_id_str, allow_rebuild_bool = False)
+        if (child_py_node == None or parent_py_node == None):
+            del cas_stale_child_dict[child_id_str]                               # gone - nothing to sync
+            continue
+        if (all_bool or child_mat.name in relevant_mat_name_set):
+            parent_py_node.bring_child_up_to_date(child_py_node)
+            del cas_stale_child_dict[child_id_str]
+
+# A render is starting: bring all the stale child nodes up to date, and keep all child nodes in sync until the render ends
+@persistent
+def cas_render_init_callback_sync_stale_child_nodes(scene):
+    cas_lazy_child_sync_state_dict['rendering_bool'] = True
+    cas_sync_stale_child_nodes(scene, all_bool = True)
+
+@persistent
+def cas_render_end_callback_resume_lazy_child_sync(scene):
+    cas_lazy_child_sync_state_dict['rendering_bool'] = False
+
+
+# Cutaway plane outline watcher: when a cutaway plane's mesh changes (edit mode is left, a modifier or shape key changes, or it is animated)
+# the new outline is sent to the parent nodes using the plane, and their child nodes - without having to press Refresh.
+# After object updates, only the planes whose data has been updated are checked (at most every cas_outline_watch_interval_float seconds).
+# Planes with animated shape keys or modifiers are also checked after every frame change. The frame_change_post callback is only installed
+# while there are such planes (see cas_update_outline_watch_frame_handler_registration) - so static cutaways still scrub at full speed.
+# A check reads the plane mesh arrays and hashes them - the outline is only worked out, and pushed, if the hash has changed.
+cas_outline_watch_interval_float = 0.25
+# 'pending_plane_name_set' - planes waiting to be checked. 'animated_plane_name_list' - the planes checked on every frame change.
+# 'registration_checked_bool' - False until the frame change callback has been installed/removed to suit the current file.
+# 'watched_plane_name_list' - the (not animated) planes used by the parent pynodes, as found by cas_update_outline_watch_frame_handler_registration.
+cas_outline_watch_state_dict = {'pending_plane_name_set': set(), 'last_check_time_float': 0.0, 'animated_plane_name_list': [], 'registration_checked_bool': False,
+                                'watched_plane_name_list': []}
+
+# Returns a dict: cutaway plane name => [parent pynodes using the plane]. The parents are found through the pynode registry.
+def cas_get_cutaway_plane_parent_dict():
+    plane_parent_dict = {}
+    for parent_id_str in list(cas_pynode_registry_dict['parent_id_set']):
+        mat, node = cas_get_registered_pynode(parent_id_str)
+        if (node == None or not node.node_is_parent):
+            cas_pynode_registry_dict['parent_id_set'].discard(parent_id_str)
+            continue
+        if (node.cutAwayPlaneNameStr == ""):
+            continue
+        if node.cutAwayPlaneNameStr not in plane_parent_dict:
+            plane_parent_dict[node.cutAwayPlaneNameStr] = []
+        plane_parent_dict[node.cutAwayPlaneNameStr].append(node)
+    return plane_parent_dict
+
+# Check the outlines of the named planes, and push any that have changed to the parents using them
+def cas_check_cutaway_plane_outlines(scene, plane_name_list):
+    cas_outline_watch_state_dict['last_check_time_float'] = time.time()
+    plane_parent_dict = cas_get_cutaway_plane_parent_dict()
+    for plane_name_str in plane_name_list:
+        parent_py_node_list = plane_parent_dict.get(plane_name_str)
+        cutaway_obj = scene.objects.get(plane_name_str)
+        if (parent_py_node_list == None or cutaway_obj == None or cutaway_obj.type != 'MESH' or cutaway_obj.mode == 'EDIT'):
+            continue                                        # (edit mode changes are picked up when edit mode is left)
+        outline_array_tuple = cas_read_mesh_outline_arrays(cutaway_obj, scene)
+        rim_outline_hash_str = cas_outline_arrays_hash_str(outline_array_tuple)
+        for parent_py_node in parent_py_node_list:
+            if (parent_py_node.rim_outline_hash_str != rim_outline_hash_str):
+                parent_py_node.push_new_cutaway_plane_outline(cutaway_obj, outline_array_tuple)
+
+# Called by cas_scene_update_post_callback: note the planes whose mesh data has been updated (moving a plane doesn't change its outline), 
+# and check them - but not too often. Only the watched planes are looked at - by name. The updates that come from a frame change are 
+# skipped (the animated planes are checked by the frame change callback). A modifier edit only flags the object, so updated objects count too.
+def cas_watch_cutaway_plane_outlines(scene, frame_changed_bool):
+    state = cas_outline_watch_state_dict
+    if not state['registration_checked_bool']:
+        cas_update_outline_watch_frame_handler_registration(scene)
+    
+    if (not frame_changed_bool and (bpy.data.meshes.is_updated or bpy.data.objects.is_updated)):
+        for plane_name_str in state['watched_plane_name_list']:
+            cutaway_obj = scene.objects.get(plane_name_str)
+            if (cutaway_obj != None and cutaway_obj.type == 'MESH' and (cutaway_obj.is_updated_data or cutaway_obj.data.is_updated)):
+                state['pending_plane_name_set'].add(plane_name_str)
+    
+    if (len(state['pending_plane_name_set']) > 0 and time.time() - state['last_check_time_float'] >= cas_outline_watch_interval_float):
+        plane_name_list = list(state['pending_plane_name_set'])
+        state['pending_plane_name_set'].clear()
+        cas_check_cutaway_plane_outlines(scene, plane_name_list)
+        # (a shape key or modifier may have just been key framed)
+        cas_update_outline_watch_frame_handler_registration(scene)
+
+# Does the plane have key framed (or driven) shape keys or modifiers?
+def cas_cutaway_plane_is_animated(cutaway_obj):
+    shape_keys = cutaway_obj.data.shape_keys
+    if (shape_keys != None and shape_keys.animation_data != None):
+        if (shape_keys.animation_data.action != None or len(shape_keys.animation_data.drivers) > 0):
+            return True
+    anim_data = cutaway_obj.animation_data
+    if (anim_data != None):
+        fcurve_list = list(anim_data.drivers)
+        if (anim_data.action != None):
+            fcurve_list += list(anim_data.action.fcurves)
+        for fcurve in fcurve_list:
+            if fcurve.data_path.startswith("modifiers["):
+                return True
+    return False
+
+# Install the frame change callback while there are planes (used by parent pynodes) with animated shape keys or modifiers - remove it otherwise.
+# Called on load, when a parent's cutaway plane is set, after a plane's data has changed, and when key frames are edited.
+def cas_update_outline_watch_frame_handler_registration(scene):
+    state = cas_outline_watch_state_dict
+    state['registration_checked_bool'] = True
+    animated_plane_name_list = []
+    watched_plane_name_list = []
+    for plane_name_str in cas_get_cutaway_plane_parent_dict():
+        cutaway_obj = scene.objects.get(plane_name_str)
+        if (cutaway_obj != None and cutaway_obj.type == 'MESH' and cas_cutaway_plane_is_animated(cutaway_obj)):
+            animated_plane_name_list.append(plane_name_str)
+        else:
+            watched_plane_name_list.append(plane_name_str)
+    state['animated_plane_name_list'] = animated_plane_name_list
+    state['watched_plane_name_list'] = watched_plane_name_list
+    
+    handler_list = bpy.app.handlers.frame_change_post
+    callback_delete_list = []
+    for callback in handler_list:
+        if (callback.__name__ == cas_frame_change_post_callback_check_cutaway_plane_outlines.__name__):
+            callback_delete_list.append(callback)
+    for callback in callback_delete_list:
+        handler_list.remove(callback)
+    if (len(animated_plane_name_list) > 0):
+        handler_list.append(cas_frame_change_post_callback_check_cutaway_plane_outlines)
+
+# Animated outlines (e.g. key framed shape keys) are followed frame by frame - in renders too
+@persistent
+def cas_frame_change_post_callback_check_cutaway_plane_outlines(scene):
+    cas_check_cutaway_plane_outlines(scene, cas_outline_watch_state_dict['animated_plane_name_list'])
+
+
+# Reconcile the parent/child links of all the cutaway shader pynodes in one pass over the materials.
+# - Parents: child ids that are dangling (no such pynode, or that pynode is not our child) are removed from the child list.
+# - Children: are added back to their parent's child list if missing, and flagged as orphaned if their parent no longer exists.
+# The pynode registry is rebuilt from the same pass. Run on file load, and by the Check Parent/Child Links button.
+# Returns a dict of counts.
+def cas_reconcile_parent_child_links():
+    id_to_node_dict = {}
+    id_to_ref_dict = {}
+    parent_id_set = set()
+    parent_node_list = []
+    child_node_list = []
+    template_mat_list = []
+    for mat in bpy.data.materials:
+        if 'cas_child_template_parent_id_str' in mat:
+            template_mat_list.append(mat)                                           # (child templates are not real child nodes)
+            continue
+        if mat.use_nodes:
+            for node in mat.node_tree.nodes:
+                if "Cutaway Shader" in node.name:
+                    unique_pynode_id_str = node.get('unique_pynode_id_str', '0')
+                    if (unique_pynode_id_str != '0'):
+                        id_to_node_dict[unique_pynode_id_str] = node
+                        id_to_ref_dict[unique_pynode_id_str] = (mat.name, node.name)
+                        if node.node_is_parent:
+                            parent_id_set.add(unique_pynode_id_str)
+                    if (mat.library != None):
+                        continue                                                    # linked materials can't be changed
+                    if node.node_is_parent:
+                        parent_node_list.append(node)
+                    else:
+                        child_node_list.append(node)
+    cas_pynode_registry_dict['id_to_ref_dict'] = id_to_ref_dict
+    cas_pynode_registry_dict['parent_id_set'] = parent_id_set
+    cas_pynode_registry_dict['rebuild_count'] += 1
+    
+    count_dict = {'parents': len(parent_node_list), 'children': len(child_node_list), 'dangling_ids_removed': 0, 'child_links_restored': 0, 'orphans': 0}
+    
+    # Child templates left behind by parents that no longer exist (or made by older versions, without the '.' in their name)
+    for template_mat in template_mat_list:
+        parent_id_str = template_mat['cas_child_template_parent_id_str']
+        parent_node = id_to_node_dict.get(parent_id_str)
+        if (template_mat.library == None and (parent_node == None or not parent_node.node_is_parent
+                                              or template_mat.name != cas_child_template_material_name_str(parent_id_str))):
+            bpy.data.materials.remove(template_mat)
+    
+    for parent_node in parent_node_list:
+        parent_id_str = parent_node.get('unique_pynode_id_str', '0')
+        for child_id_str in parent_node.get_child_unique_id_str_list():
+            child_node = id_to_node_dict.get(child_id_str)
+            if (child_node == None or child_node.node_is_parent or child_node.this_childs_parent_pynode_unique_id_str != parent_id_str):
+                parent_node.remove_child_unique_id_str(child_id_str)
+                count_dict['dangling_ids_removed'] += 1
+    
+    cas_stale_child_dict.clear()
+    for child_node in child_node_list:
+        parent_node = id_to_node_dict.get(child_node.this_childs_parent_pynode_unique_id_str)
+        if (parent_node == None or not parent_node.node_is_parent):
+            cas_set_if_changed(child_node, 'orphaned_child_node_bool', True)
+            count_dict['orphans'] += 1
+            continue
+        cas_set_if_changed(child_node, 'orphaned_child_node_bool', False)
+        # stale child nodes (see lazy child sync)
+        if (child_node.synced_parent_revision_int != parent_node.child_sync_revision_int):
+            cas_stale_child_dict[child_node.get('unique_pynode_id_str', '0')] = child_node.this_childs_parent_pynode_unique_id_str
+        child_id_str = child_node.get('unique_pynode_id_str', '0')
+        if (child_id_str != '0' and parent_node.id_data.library == None and not parent_node.has_child_unique_id_str(child_id_str)):
+            parent_node.add_child_unique_id_str(child_id_str)
+            count_dict['child_links_restored'] += 1
+    
+    return count_dict
+
+def cas_reconcile_report_str(count_dict):
+    return ("CutAwayShader: " + str(count_dict['parents']) + " parent(s), " + str(count_dict['children']) + " child node(s). "
+        + str(count_dict['dangling_ids_removed']) + " dangling child id(s) removed, " + str(count_dict['child_links_restored']) 
+        + " child link(s) restored, " + str(count_dict['orphans']) + " orphaned child node(s)")
+
+
+# Freeze for Render (see CutAwaySetupNode.copy_keyed_value_fcurves_to_osl_node):
+# The parents' key frames are copied onto the OSL node inputs, in this action group. The scene is marked with 
+# 'global_frozen_for_render_bool' so the frame change and render callbacks leave it alone.
+cas_frozen_fcurve_group_name_str = "CutAwayShader Freeze"
+
+# Unfreeze: Remove the frozen fcurves from all the materials' node trees
+def cas_remove_frozen_fcurves():
+    for mat in bpy.data.materials:
+        if mat.use_nodes and mat.node_tree.animation_data != None and mat.node_tree.animation_data.action != None:
+            action = mat.node_tree.animation_data.action
+            fcurve_delete_list = [fcurve for fcurve in action.fcurves if fcurve.group != None and fcurve.group.name == cas_frozen_fcurve_group_name_str]
+            for fcurve in fcurve_delete_list:
+                action.fcurves.remove(fcurve)
+            if cas_frozen_fcurve_group_name_str in action.groups:
+                action.groups.remove(action.groups[cas_frozen_fcurve_group_name_str])
+
+
+# Parent pynodes with baked key frame values (see CutAwaySetupNode.bake_keyed_values).
+# 'parent_ref_list' = [(material name, node name, first baked frame, property name tuple, numpy array of values: property x frame), ...]
+# 'unbaked_animated_parent_bool' = True if there are key framed parents that have not been baked - the frame callbacks still need to 
+# scan the materials for these.
+# Rebuilt on file load, by the Bake Key Frames / Clear Bake buttons, when a parent is key framed (or has all its key frames deleted), 
+# and when a baked parent's key frames are edited (see cas_check_parent_keyed_value_fcurves).
+cas_baked_parent_state_dict = {'parent_ref_list': [], 'unbaked_animated_parent_bool': False}
+
+def cas_rebuild_baked_parent_refs():
+    parent_ref_list = []
+    unbaked_animated_parent_bool = False
+    for mat in bpy.data.materials:
+        if mat.use_nodes:
+            for node in mat.node_tree.nodes:
+                if "Cutaway Shader" in node.name:
+                    if node.node_is_parent == True:
+                        if 'cas_baked_keyed_values' in node.keys():
+                            baked_value_dict = node['cas_baked_keyed_values'].to_dict()
+                            prop_name_tuple = tuple(baked_value_dict.keys())
+                            value_array = numpy.array([baked_value_dict[prop_name_str] for prop_name_str in prop_name_tuple], dtype = numpy.float64)
+                            parent_ref_list.append((mat.name, node.name, node['cas_baked_start_frame_int'], prop_name_tuple, value_array))
+                        elif cas_parent_pynode_is_animated(node):
+                            unbaked_animated_parent_bool = True
+    cas_baked_parent_state_dict['parent_ref_list'] = parent_ref_list
+    cas_baked_parent_state_dict['unbaked_animated_parent_bool'] = unbaked_animated_parent_bool
+
+# Push the baked values for the current frame for all baked parents.
+# Returns True if this did all the work for the frame (i.e. no material scan is needed).
+def cas_push_baked_keyed_values(scene):
+    parent_ref_list = cas_baked_parent_state_dict['parent_ref_list']
+    if (len(parent_ref_list) == 0):
+        return False
+    
+    all_pushed_bool = True
+    for mat_name_str, node_name_str, start_frame_int, prop_name_tuple, value_array in parent_ref_list:
+        mat = bpy.data.materials.get(mat_name_str)
+        if (mat == None or mat.node_tree == None or node_name_str not in mat.node_tree.nodes):
+            all_pushed_bool = False                                      # the parent has gone (or been renamed) - let the material scan find it
+            continue
+        # Sub frames (e.g. motion blur) are not baked - these use the current property values (the material scan)
+        frame_index_int = scene.frame_current - start_frame_int
+        if (scene.frame_subframe != 0.0 or frame_index_int < 0 or frame_index_int >= value_array.shape[1]):
+            all_pushed_bool = False                                      # frame out of the baked range
+            continue
+        override_value_dict = dict(zip(prop_name_tuple, value_array[:, frame_index_int].tolist()))
+        mat.node_tree.nodes[node_name_str].push_keyed_values_to_child_nodes_if_changed(override_value_dict = override_value_dict)
+    return all_pushed_bool and not cas_baked_parent_state_dict['unbaked_animated_parent_bool']
+
+# A hash of the key frames of a parent pynode's key framed properties - so a bake can tell when the key frames it was made from are edited
+def cas_keyed_value_fcurve_hash_str(py_node):
+    hash_obj = hashlib.md5()
+    for prop_name_str, fcurve in sorted(py_node.get_keyed_value_fcurve_dict().items()):
+        hash_obj.update((prop_name_str + fcurve.extrapolation + str(len(fcurve.modifiers))).encode())
+        point_count_int = len(fcurve.keyframe_points)
+        for attr_name_str in ('co', 'handle_left', 'handle_right'):
+            point_array = numpy.empty(point_count_int * 2, dtype = numpy.float32)
+            fcurve.keyframe_points.foreach_get(attr_name_str, point_array)
+            hash_obj.update(point_array.tobytes())
+    return hash_obj.hexdigest()
+
+# An action has been edited (cas_scene_update_post_callback): check the registered parent pynodes for key frames that have been 
+# inserted or deleted (see cas_check_parent_pynode_animation_state), and drop the bakes made from key frames that have since been edited.
+def cas_check_parent_keyed_value_fcurves():
+    for parent_id_str in list(cas_pynode_registry_dict['parent_id_set']):
+        mat, node = cas_get_registered_pynode(parent_id_str)
+        if (node == None or not node.node_is_parent):
+            cas_pynode_registry_dict['parent_id_set'].discard(parent_id_str)
+            continue
+        if (mat.library != None):
+            continue
+        cas_check_parent_pynode_animation_state(node)
+        if 'cas_baked_keyed_values' not in node.keys():
+            continue
+        fcurve_hash_str = cas_keyed_value_fcurve_hash_str(node)
+        if 'cas_baked_fcurve_hash_str' not in node.keys():
+            node['cas_baked_fcurve_hash_str'] = fcurve_hash_str                   # baked by an older version - take the bake as up to date
+        elif (node['cas_baked_fcurve_hash_str'] != fcurve_hash_str):
+            print("CutAwayShader: the key frames of " + mat.name + " : " + node.name + " have changed since they were baked - the bake has been cleared")
+            node.clear_baked_keyed_values()
+            cas_rebuild_baked_parent_refs()
+            cas_reset_propagation_frame_key()
+
+
+# Forget the last propagated frame, so the next frame change or render always does the work.
+def cas_reset_propagation_frame_key():
+    cas_propagation_stats_dict['last_frame_key'] = None
+
+
+# Called when a render (still or animation) starts. Start with fresh counts.
+@persistent
+def cas_render_init_callback_reset_propagation_stats(scene):
+    cas_reset_propagation_frame_key()
+    cas_invalidate_scene_material_cache()
+    cas_propagation_stats_dict['ran'] = 0
+    cas_propagation_stats_dict['skipped'] = 0
+
+
+# Called when a render finishes or is cancelled. Report the counts for the render farm logs.
+@persistent
+def cas_render_end_callback_report_propagation_stats(scene):
+    print("CutAwayShader: keyed value propagation ran for " + str(cas_propagation_stats_dict['ran']) + " frame(s), " 
+        + str(cas_propagation_stats_dict['skipped']) + " duplicate propagation(s) skipped")
+    cas_reset_propagation_frame_key()
+
+
+# Remove our frame change and render callbacks (if they are registered).
+# We can't iterate over a list we're changing, so make a fresh list of functions to delete - and then delete from this list. 
+def cas_remove_keyed_value_frame_handlers():
+    # *** frame_change_pre ***
+    callback_delete_list = []
+    for callback in bpy.app.handlers.frame_change_pre:
+        if (callback.__name__ == cas_frame_change_callback_update_child_nodes_with_keyed_values.__name__):
+            callback_delete_list.append(callback)
+    for callback in callback_delete_list:
+        bpy.app.handlers.frame_change_pre.remove(callback)
+    
+    # *** render_pre *** 
+    callback_delete_list = []
+    for callback in bpy.app.handlers.render_pre:
+        if (callback.__name__ == cas_render_pre_callback_update_child_nodes_with_keyed_values.__name__):
+            callback_delete_list.append(callback)
+    for callback in callback_delete_list:
+        bpy.app.handlers.render_pre.remove(callback)
+    
+    # *** render_init, render_complete, render_cancel (propagation stats) *** 
+    for handler_list, callback_name_str in ((bpy.app.handlers.render_init, cas_render_init_callback_reset_propagation_stats.__name__),
+                                            (bpy.app.handlers.render_complete, cas_render_end_callback_report_propagation_stats.__name__),
+                                            (bpy.app.handlers.render_cancel, cas_render_end_callback_report_propagation_stats.__name__)):
+        callback_delete_list = []
+        for callback in handler_list:
+            if (callback.__name__ == callback_name_str):
+                callback_delete_list.append(callback)
+        for callback in callback_delete_list:
+            handler_list.remove(callback)
+
+
+# Add our frame change and render callbacks.
+# Any old callbacks are removed first. These accumulate (e.g. if the script is re-run), making debugging hard, and slowing down performance.
+def cas_add_keyed_value_frame_handlers():
+    cas_remove_keyed_value_frame_handlers()
+    bpy.app.handlers.frame_change_pre.append(cas_frame_change_callback_update_child_nodes_with_keyed_values)    # <=== frame_change_pre  (good for rendering - and updates preview - but can bog down preview)
+    bpy.app.handlers.render_pre.append(cas_render_pre_callback_update_child_nodes_with_keyed_values)            # <=== render_pre (good for rendering - but not for preview)
+    bpy.app.handlers.render_init.append(cas_render_init_callback_reset_propagation_stats)
+    bpy.app.handlers.render_complete.append(cas_render_end_callback_report_propagation_stats)
+    bpy.app.handlers.render_cancel.append(cas_render_end_callback_report_propagation_stats)
+
+
+# Check if any of a parent pynode's key framable properties (keyed_value_prop_name_tuple) have been key framed.
+# The key frames live in the fcurves of the node tree's action, e.g. data_path = 'nodes["Cutaway Shader"].effectmix_float'
+def cas_parent_pynode_is_animated(py_node):
+    anim_data = py_node.id_data.animation_data
+    if (anim_data == None or anim_data.action == None):
+        return False
+    
+    node_path_str = py_node.path_from_id() + '.'
+    for fcurve in anim_data.action.fcurves:
+        if fcurve.data_path.startswith(node_path_str):
+            if fcurve.data_path[len(node_path_str):] in py_node.keyed_value_prop_name_tuple:
+                return True
+    return False
+
+
+# Check all materials for a parent pynode with key framed properties
+def cas_any_parent_pynode_is_animated():
+    for mat in bpy.data.materials:
+        if mat.use_nodes and mat.node_tree.animation_data != None:                         # no animation data - no key frames
+            for node in mat.node_tree.nodes:
+                if "Cutaway Shader" in node.name:
+                    if node.node_is_parent == True:
+                        if cas_parent_pynode_is_animated(node):
+                            return True
+    return False
+
+
+# Add or remove the frame change and render callbacks to suit the current scene.
+# The callbacks are only needed while at least one parent pynode has key framed properties - static cutaways scrub at full speed.
+# In 'drivers' mode the child OSL nodes are driven directly by their parent pynode, so no python is needed per frame.
+# When frozen for render, the OSL inputs have their own key frames.
+def cas_update_keyed_value_frame_handler_registration():
+    if bpy.context.scene.get('global_drive_child_nodes_with_drivers_bool', False) or bpy.context.scene.get('global_frozen_for_render_bool', False):
+        cas_remove_keyed_value_frame_handlers()
+    elif cas_any_parent_pynode_is_animated():
+        cas_add_keyed_value_frame_handlers()
+    else:
+        cas_remove_keyed_value_frame_handlers()
+
+
+# Blender (2.7x) has no key frame insert/delete callback - but inserting or deleting key frames sets bpy.data.actions.is_updated, 
+# so cas_check_parent_keyed_value_fcurves checks each registered parent's own node tree fcurves then. The full check (all materials) 
+# is only done when a parent's animated state changes (e.g. the user has just key framed Effect Mix for the first time).
+# Keyed by the node's memory address (as_pointer). This may change after an undo - which just causes one extra full check.
+cas_parent_animated_state_dict = {}
+
+def cas_check_parent_pynode_animation_state(py_node):
+    animated_bool = cas_parent_pynode_is_animated(py_node)
+    node_key = py_node.as_pointer()
+    if (cas_parent_animated_state_dict.get(node_key) != animated_bool):
+        cas_parent_animated_state_dict[node_key] = animated_bool
+        cas_update_keyed_value_frame_handler_registration()
+        # a newly key framed parent is not baked (or a baked one no longer animated) - the frame callbacks must know
+        cas_rebuild_baked_parent_refs()
+
+
+# Open child update transactions (see CutAwaySetupNode.begin_child_update_transaction).
+# Parent pynode unique id str => {'depth': nesting depth, 'action_tuple_list': [(action_str, param1, param2), ...]}
+cas_child_update_transaction_dict = {}
+
+# Deferred Child Sync (see casDeferredChildSyncTimer).
+# Parent pynode unique id str => set of carry_out_action_on_this_parents_child_nodes_b() action strs waiting to be done.
+# A set, so dragging a slider across many values still only results in one update of the child nodes per timer tick.
+cas_deferred_child_sync_dict = {}
+# 'immediate_depth' > 0 => the child nodes must be updated immediately (e.g. by the frame change and render callbacks)
+cas_deferred_child_sync_state_dict = {'timer_running': False, 'immediate_depth': 0}
+
+# Carry out the waiting child node updates. Returns the number of parent pynodes that were waiting.
+def cas_flush_deferred_child_sync():
+    if (len(cas_deferred_child_sync_dict) == 0):
+        return 0
+    
+    pending_dict = dict(cas_deferred_child_sync_dict)
+    cas_deferred_child_sync_dict.clear()
+    
+    cas_deferred_child_sync_state_dict['immediate_depth'] += 1
+    try:
+        # look the waiting parents up in the pynode registry (rather than looping over all the materials and nodes)
+        for parent_id_str, action_str_set in pending_dict.items():
+            mat, node = cas_find_pynode_by_unique_id(parent_id_str)
+            if (node != None and node.node_is_parent == True):
+                action_tuple_list = [(action_str, None, None) for action_str in action_str_set]
+                node.carry_out_actions_on_this_parents_child_nodes(action_tuple_list)
+    finally:
+        cas_deferred_child_sync_state_dict['immediate_depth'] -= 1
+    return len(pending_dict)
+
+
+# (pynode pointer, pynode unique id str) of the parent pynodes known to have no 'pnuidX' child ID properties left (see has_legacy_child_id_props),
+# so their ID properties aren't scanned again every time their child list is read or changed
+cas_no_legacy_child_id_key_set = set()
+
+
+# Called after a .blend file has been loaded.
+# The snapshot ids belong to the previous file, so forget them.
+# Parent pynodes in older files are converted to the child_unique_id_collection child list.
+# (Older parents appended or linked later are converted the first time their child list changes - see get_child_unique_id_str_list)
+@persistent
+def cas_load_post_callback(dummy):
+    for mat in bpy.data.materials:
+        if mat.use_nodes and mat.library == None:                                  # linked materials can't be changed
+            for node in mat.node_tree.nodes:
+                if "Cutaway Shader" in node.name:
+                    node.migrate_child_id_props_to_collection()
+    
+    # Tidy up the parent/child links (and build the pynode registry)
+    count_dict = cas_reconcile_parent_child_links()
+    if (count_dict['dangling_ids_removed'] > 0 or count_dict['child_links_restored'] > 0 or count_dict['orphans'] > 0):
+        print(cas_reconcile_report_str(count_dict))
+    cas_keyed_value_snapshot_dict.clear()
+    cas_parent_animated_state_dict.clear()
+    cas_no_legacy_child_id_key_set.clear()
+    cas_reset_propagation_frame_key()
+    cas_invalidate_scene_material_cache()
+    cas_rebuild_baked_parent_refs()
+    cas_object_index_dict['scene_name'] = None
+    cas_object_index_dict['id_to_mat_name_dict'] = None
+    cas_deferred_child_sync_dict.clear()
+    cas_child_template_removal_id_set.clear()                         # (left behind templates are removed by the reconcile above)
+    cas_deferred_child_sync_state_dict['timer_running'] = False        # the timer's modal handler does not survive the load
+    cas_lazy_child_sync_state_dict['rendering_bool'] = False
+    cas_lazy_child_sync_state_dict['relevant_key'] = None
+    cas_outline_watch_state_dict['pending_plane_name_set'].clear()
+    cas_outline_watch_state_dict['registration_checked_bool'] = False      # (the frame change callback is installed/removed by the next scene update)
+    cas_update_keyed_value_frame_handler_registration()
+
+
+
 
 # *************************************************************************************
 # *************************************************************************************
@@ -989,6 +2296,286 @@ class casWarningDialogOperator(bpy.types.Operator):
 
 
 
+# ***************************** Parent pynode child list *****************************
+# A parent pynode's record of its child pynodes: one item per child, named with the child pynode's unique id str.
+# (Older files stored one 'pnuidX' ID property per child - these are converted by migrate_child_id_props_to_collection on load, 
+# or when the child list is first changed)
+class CasChildUniqueIdPropertyGroup(bpy.types.PropertyGroup):
+    pass    # the child pynode's unique id str is the item's name
+
+
+
+# < Cutaway plane outline >
+# Read the outline of a cutaway plane from its mesh data: obj.data.vertices, obj.data.edges and obj.data.loops, in bulk with foreach_get.
+# No context, selection, layer or mode changes are made - so this is quick, adds no undo steps, and can be called from scripts.
+# Returns (outer_loop_list, hole_loop_list) - see cas_find_outline_loops.
+def cas_get_mesh_outline_loops(obj):
+    return cas_find_outline_loops(*cas_read_mesh_outline_arrays(obj, bpy.context.scene))
+
+# Returns (vertex co-ordinates V x 3, edge vertex indices E x 2, number of faces using each edge E) - as cas_find_outline_loops takes them
+# If a scene is given, the outline of a plane with modifiers or shape keys is read from its evaluated mesh (render settings while rendering).
+def cas_read_mesh_outline_arrays(obj, scene = None):
+    mesh = obj.data
+    if (scene != None and obj.mode != 'EDIT' and (len(obj.modifiers) > 0 or mesh.shape_keys != None)):
+        settings_str = 'RENDER' if cas_lazy_child_sync_state_dict['rendering_bool'] else 'PREVIEW'
+        evaluated_mesh = obj.to_mesh(scene, True, settings_str)
+        try:
+            return cas_read_outline_arrays_from_mesh(evaluated_mesh)
+        finally:
+            bpy.data.meshes.remove(evaluated_mesh)
+    
+    if (obj.mode == 'EDIT'):
+        if hasattr(obj, "update_from_editmode"):
+            # copy the edit mesh into obj.data (the edit mesh is only written back when edit mode is left)
+            obj.update_from_editmode()
+        else:
+            bm = bmesh.from_edit_mesh(mesh)
+            bm.verts.index_update()
+            co_array = numpy.array([vert.co[:] for vert in bm.verts], dtype = numpy.float64).reshape(-1, 3)
+            edge_array = numpy.array([(edge.verts[0].index, edge.verts[1].index) for edge in bm.edges], dtype = numpy.int64).reshape(-1, 2)
+            edge_face_count_array = numpy.array([len(edge.link_faces) for edge in bm.edges], dtype = numpy.int64)
+            return co_array, edge_array, edge_face_count_array
+    
+    return cas_read_outline_arrays_from_mesh(mesh)
+
+def cas_read_outline_arrays_from_mesh(mesh):
+    co_array = numpy.empty(len(mesh.vertices) * 3, dtype = numpy.float32)
+    mesh.vertices.foreach_get("co", co_array)
+    edge_array = numpy.empty(len(mesh.edges) * 2, dtype = numpy.int32)
+    mesh.edges.foreach_get("vertices", edge_array)
+    loop_edge_index_array = numpy.empty(len(mesh.loops), dtype = numpy.int32)
+    mesh.loops.foreach_get("edge_index", loop_edge_index_array)
+    # the number of faces each edge is used by
+    edge_face_count_array = numpy.bincount(loop_edge_index_array, minlength = len(mesh.edges)).astype(numpy.int64)
+    return co_array.reshape(-1, 3).astype(numpy.float64), edge_array.reshape(-1, 2).astype(numpy.int64), edge_face_count_array
+
+# A cheap hash of the arrays read by cas_read_mesh_outline_arrays. If it hasn't changed, neither has the outline.
+def cas_outline_arrays_hash_str(outline_array_tuple):
+    hash_obj = hashlib.md5()
+    for array in outline_array_tuple:
+        hash_obj.update(numpy.ascontiguousarray(array).tobytes())
+    return hash_obj.hexdigest()
+
+# Outline hash str => rim segment XML data str, so an unchanged plane doesn't have its outline worked out again (see update_rim_segment_data)
+cas_outline_xml_cache_dict = {}
+cas_outline_xml_cache_size_int = 64
+
+# Vertices closer than this are treated as one vertex (duplicate vertices, split edges etc.)
+cas_outline_weld_distance_float = 0.00001
+# Half of the 26 grid cells next to a cell (the other half are found from the other side), see cas_find_outline_loops
+cas_outline_weld_neighbour_offset_list = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1) if (dx, dy, dz) > (0, 0, 0)]
+
+# Find the closed boundary loops of a mesh, from its vertex co-ordinates (V x 3), edge vertex indices (E x 2) and the number of faces using each edge (E).
+# The boundary edges are the edges used by one face - or by no face (so all the edges of a face-less outline).
+# Loops that touch at a vertex (e.g. two faces sharing just a corner) are split into separate loops there.
+# The loops are classified by nesting: a loop inside an odd number of other loops is a hole. 
+# Outer loops are wound anti clockwise, and holes clockwise, about the normal of the largest loop (pointing along the positive local axis). 
+# Each list is sorted largest loop first.
+# Returns (outer_loop_list, hole_loop_list). Each loop is a list of (local) vertex co-ordinates, ending with its first vertex again.
+def cas_find_outline_loops(co_array, edge_array, edge_face_count_array):
+    edge_array = edge_array[edge_face_count_array <= 1]
+    if (len(edge_array) == 0):
+        return [], []
+    
+    # Only the vertices of the boundary edges are needed
+    used_vert_index_array, edge_vert_index_array = numpy.unique(edge_array, return_inverse = True)
+    co_array = co_array[used_vert_index_array]
+    edge_array = edge_vert_index_array.reshape(-1, 2)
+    
+    # Weld coincident vertices: vertices in the same (weld distance sized) grid cell get the same index. Then neighbouring cells whose 
+    # vertices are within the weld distance are joined too - coincident vertices may fall either side of a cell boundary.
+    key_array = numpy.ascontiguousarray(numpy.floor(co_array / cas_outline_weld_distance_float).astype(numpy.int64))
+    void_key_array = key_array.view(numpy.dtype((numpy.void, key_array.dtype.itemsize * 3))).ravel()
+    unique_key_array, first_vert_index_array, cell_index_array = numpy.unique(void_key_array, return_index = True, return_inverse = True)
+    cell_key_list = [tuple(key) for key in key_array[first_vert_index_array].tolist()]
+    cell_co_list = co_array[first_vert_index_array].tolist()
+    cell_index_dict = dict((cell_key, i) for i, cell_key in enumerate(cell_key_list))
+    root_cell_index_list = list(range(len(cell_key_list)))                     # union find: joined cells share a root cell
+    
+    def find_root_cell_index(cell_index):
+        while (root_cell_index_list[cell_index] != cell_index):
+            root_cell_index_list[cell_index] = root_cell_index_list[root_cell_index_list[cell_index]]
+            cell_index = root_cell_index_list[cell_index]
+        return cell_index
+    
+    weld_distance_squared_float = cas_outline_weld_distance_float * cas_outline_weld_distance_float
+    for i, (x, y, z) in enumerate(cell_key_list):
+        for dx, dy, dz in cas_outline_weld_neighbour_offset_list:
+            j = cell_index_dict.get((x + dx, y + dy, z + dz))
+            if (j == None):
+                continue
+            co_i, co_j = cell_co_list[i], cell_co_list[j]
+            if ((co_i[0] - co_j[0]) ** 2 + (co_i[1] - co_j[1]) ** 2 + (co_i[2] - co_j[2]) ** 2 <= weld_distance_squared_float):
+                root_cell_index_list[find_root_cell_index(i)] = find_root_cell_index(j)
+    
+    root_cell_index_array = numpy.array([find_root_cell_index(i) for i in range(len(cell_key_list))], dtype = numpy.int64)
+    unique_root_array, first_cell_index_array, welded_cell_index_array = numpy.unique(root_cell_index_array, return_index = True, return_inverse = True)
+    co_array = co_array[first_vert_index_array[first_cell_index_array]]
+    welded_index_array = welded_cell_index_array[cell_index_array]
+    vert_count_int = len(co_array)
+    edge_array = numpy.sort(welded_index_array[edge_array], axis = 1)
+    edge_array = edge_array[edge_array[:, 0] != edge_array[:, 1]]
+    
+    # An edge that is there twice after welding joins two pieces of the mesh - it's not on the boundary
+    edge_key_array = edge_array[:, 0] * vert_count_int + edge_array[:, 1]
+    unique_edge_key_array, first_edge_index_array, edge_count_array = numpy.unique(edge_key_array, return_index = True, return_counts = True)
+    edge_array = edge_array[first_edge_index_array[edge_count_array == 1]]
+    if (len(edge_array) == 0):
+        return [], []
+    
+    # The boundary edges linked to each vert: links first_link_array[v] to first_link_array[v] + degree_array[v] - 1 
+    # (to_array: the vert at the other end of the link's edge)
+    edge_count_int = len(edge_array)
+    from_array = numpy.concatenate((edge_array[:, 0], edge_array[:, 1]))
+    to_array = numpy.concatenate((edge_array[:, 1], edge_array[:, 0]))
+    link_edge_index_array = numpy.concatenate((numpy.arange(edge_count_int), numpy.arange(edge_count_int)))
+    order_array = numpy.argsort(from_array, kind = 'mergesort')
+    degree_array = numpy.bincount(from_array, minlength = vert_count_int)
+    first_link_array = numpy.cumsum(degree_array) - degree_array
+    
+    # Walk along the boundary edges (each edge is walked once). Whenever the walk gets back to a vert already on its path, 
+    # the path from that vert on is a closed loop - so loops that touch at a vert (4 or more boundary edges) are split there.
+    # Walks that come to a dead end (edges that aren't on a closed loop) back up to the last vert with edges left to walk.
+    to_list = to_array[order_array].tolist()
+    link_edge_index_list = link_edge_index_array[order_array].tolist()
+    next_link_list = first_link_array.tolist()                             # the next link of each vert to try
+    end_link_list = (first_link_array + degree_array).tolist()
+    edge_walked_list = [False] * edge_count_int
+    loop_list = []
+    for first_vert_index in numpy.nonzero(degree_array)[0].tolist():
+        path_vert_index_list = [first_vert_index]
+        path_position_dict = {first_vert_index: 0}
+        while (len(path_vert_index_list) > 0):
+            current_vert_index = path_vert_index_list[-1]
+            link_index = next_link_list[current_vert_index]
+            while (link_index < end_link_list[current_vert_index] and edge_walked_list[link_edge_index_list[link_index]]):
+                link_index += 1
+            next_link_list[current_vert_index] = link_index
+            if (link_index == end_link_list[current_vert_index]):
+                # no edges left to walk from here - back up
+                path_vert_index_list.pop()
+                del path_position_dict[current_vert_index]
+                continue
+            
+            edge_walked_list[link_edge_index_list[link_index]] = True
+            next_vert_index = to_list[link_index]
+            if next_vert_index in path_position_dict:
+                # back at a vert on the path: a closed loop
+                position_int = path_position_dict[next_vert_index]
+                loop_vert_index_list = path_vert_index_list[position_int:]
+                for vert_index in loop_vert_index_list[1:]:
+                    del path_position_dict[vert_index]
+                del path_vert_index_list[position_int + 1:]
+                if (len(loop_vert_index_list) >= 3):
+                    loop_list.append(co_array[loop_vert_index_list])
+            else:
+                path_position_dict[next_vert_index] = len(path_vert_index_list)
+                path_vert_index_list.append(next_vert_index)
+    
+    if (len(loop_list) == 0):
+        return [], []
+    
+    # Newell's method: the sum of the cross products of each edge's end points is twice the loop's area times its normal
+    area_normal_array = numpy.array([numpy.cross(loop, numpy.roll(loop, -1, axis = 0)).sum(axis = 0) / 2.0 for loop in loop_list])
+    area_array = numpy.sqrt((area_normal_array * area_normal_array).sum(axis = 1))
+    largest_loop_index = int(numpy.argmax(area_array))
+    if (area_array[largest_loop_index] == 0.0):
+        return [cas_closed_loop_co_list(loop) for loop in loop_list], []
+    normal_vec = area_normal_array[largest_loop_index] / area_array[largest_loop_index]
+    normal_axis_int = int(numpy.argmax(numpy.abs(normal_vec)))
+    if (normal_vec[normal_axis_int] < 0):
+        normal_vec = -normal_vec                        # anti clockwise as seen looking down the (local) axis the plane faces
+    signed_area_array = area_normal_array.dot(normal_vec)
+    
+    # Look at the loops in 2D (drop the axis the normal points along the most) and count how many loops each loop is inside
+    kept_axis_list = [axis for axis in range(3) if axis != normal_axis_int]
+    loop_2d_list = [loop[:, kept_axis_list] for loop in loop_list]
+    outer_loop_list = []
+    hole_loop_list = []
+    for i, loop in enumerate(loop_list):
+        # (the middle of the loop's first edge - its verts may be shared with a loop it touches)
+        test_point = (loop_2d_list[i][0] + loop_2d_list[i][1]) / 2.0
+        inside_count_int = 0
+        for j, other_loop_2d in enumerate(loop_2d_list):
+            if (j != i and abs(signed_area_array[j]) > abs(signed_area_array[i]) and cas_point_in_polygon(test_point, other_loop_2d)):
+                inside_count_int += 1
+        is_hole_bool = inside_count_int % 2 == 1
+        
+        # wind outer loops anti clockwise, holes clockwise
+        if ((signed_area_array[i] < 0) != is_hole_bool):
+            loop = loop[::-1]
+        if (is_hole_bool):
+            hole_loop_list.append((abs(signed_area_array[i]), loop))
+        else:
+            outer_loop_list.append((abs(signed_area_array[i]), loop))
+    
+    outer_loop_list.sort(key = lambda area_loop: -area_loop[0])
+    hole_loop_list.sort(key = lambda area_loop: -area_loop[0])
+    return [cas_closed_loop_co_list(loop) for area, loop in outer_loop_list], [cas_closed_loop_co_list(loop) for area, loop in hole_loop_list]
+
+# Even-odd ray crossing test of a 2D point against a 2D polygon (N x 2 array)
+def cas_point_in_polygon(point, polygon_array):
+    x_a, y_a = polygon_array[:, 0], polygon_array[:, 1]
+    x_b, y_b = numpy.roll(x_a, -1), numpy.roll(y_a, -1)
+    crossing_mask = (y_a > point[1]) != (y_b > point[1])
+    with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+        x_cross_array = x_a + (point[1] - y_a) * (x_b - x_a) / (y_b - y_a)
+    return numpy.count_nonzero(crossing_mask & (point[0] < x_cross_array)) % 2 == 1
+
+# A loop as a list of co-ordinate tuples, with its first vertex repeated at the end
+def cas_closed_loop_co_list(loop_array):
+    co_list = [tuple(co) for co in loop_array.tolist()]
+    co_list.append(co_list[0])
+    return co_list
+# < !Cutaway plane outline >
+
+# Load the cutaway shader py and osl code into the text block memory (if they are not already there).
+# Looked up by name - this is called every time a cutaway py node is created.
+def cas_load_cutaway_shader_texts():
+    # load the osl code into the tex block memory if needed   
+    if "CutAwayShader.osl" not in bpy.data.texts:
+        #cutaway_shader_osl_pathandfile_name = bpy.utils.script_paths()[0] +  '/addons/node_cutaway_shader/CutAwayShader.osl'  #'%saddons%snode_cutaway_shader%sCutAwayShader.py'
+        cutaway_shader_osl_pathandfile_name = os.path.join(os.path.dirname(__file__), '..', 'node_cutaway_shader', 'CutAwayShader.osl')
+        cutaway_shader_osl_textblock = bpy.data.texts.load(cutaway_shader_osl_pathandfile_name)
+         
+    # load the py code into the text block memory if needed    
+    if "CutAwayShader.py" not in bpy.data.texts:
+        #cutaway_shader_py_pathandfile_name = bpy.utils.script_paths()[0] +  '/addons/node_cutaway_shader/CutAwayShader.py'  #'%saddons%snode_cutaway_shader%sCutAwayShader.py'
+        cutaway_shader_py_pathandfile_name = os.path.join(os.path.dirname(__file__), '..', 'node_cutaway_shader', '__init__.py')
+        cutaway_shader_py_textblock = bpy.data.texts.load(cutaway_shader_py_pathandfile_name)
+        cutaway_shader_py_textblock.name = 'CutAwayShader.py'
+        cutaway_shader_py_textblock.use_module = True
+        print (cutaway_shader_py_textblock.name)
+
+# Child node templates: add_child_node_to_material creates child py nodes while 'depth' > 0. 
+# The py node init then skips the setup node output sockets and their links to the OSL node - the child's settings 
+# are copied from the parent's child template instead (see get_child_template_material)
+cas_fast_child_init_state_dict = {'depth': 0}
+
+# The child template material of a parent pynode. The leading '.' hides it in the material browsers, and it has a fake user 
+# so it is kept when the file is saved (no object uses it).
+def cas_child_template_material_name_str(parent_pynode_unique_id_str):
+    return ".cas_child_template_" + parent_pynode_unique_id_str
+
+# The unique ids of parent pynodes that have been removed (see CutAwaySetupNode.free). Their child templates are removed by 
+# cas_scene_update_post_callback - materials can't safely be removed while Blender is removing a node.
+cas_child_template_removal_id_set = set()
+
+def cas_remove_pending_child_template_materials():
+    parent_id_str_list = list(cas_child_template_removal_id_set)
+    cas_child_template_removal_id_set.clear()
+    for parent_id_str in parent_id_str_list:
+        mat, node = cas_find_pynode_by_unique_id(parent_id_str)
+        if (node != None and node.node_is_parent):
+            continue                                                        # (still there - e.g. the removal was undone)
+        cas_remove_child_template_material(parent_id_str)
+
+def cas_remove_child_template_material(parent_id_str):
+    template_material = bpy.data.materials.get(cas_child_template_material_name_str(parent_id_str))
+    if (template_material != None and template_material.library == None):
+        bpy.data.materials.remove(template_material)
+
+
 # ***************************** Define the Custom Node(s) *****************************
 #                   We can create more than one new node if desired
 #
@@ -1037,6 +2624,9 @@ class CutAwaySetupNode(Node):
     # Properties used by child nodes (set to '' for parent nodes)
     this_childs_parent_pynode_unique_id_str = bpy.props.StringProperty(default ='')
     orphaned_child_node_bool = bpy.props.BoolProperty()                 # Set to true if a child's parent node no longer exits (e.g. no object uses the material - or the material has been deleted)          
+    child_sync_revision_int = bpy.props.IntProperty()                   # Parent: bumped when a setting is copied to the child nodes, and an up to date child node misses it (see carry_out_actions_on_this_parents_child_nodes)
+    synced_parent_revision_int = bpy.props.IntProperty()                # Child: the parent's child_sync_revision_int when this child was last brought up to date
+    rim_outline_hash_str = bpy.props.StringProperty()                   # A hash of the cutaway plane mesh arrays that RimSegmentXMLData was made from (see update_rim_segment_data)
     
     # properties to store user pynode settings
     cutAwayPlaneNameStr = bpy.props.StringProperty()                    # Set when user selects from drop down enumeration box (from the socket input)
@@ -1047,61 +2637,7 @@ class CutAwaySetupNode(Node):
     node_is_parent = bpy.props.BoolProperty()                           # false if a child node, true otherwise
     
     
-    def cas_frame_change_callback_update_child_nodes_with_keyed_values(scene):
-        # Check if global_auto_update_child_nodes_on_frame_change_bool has been defined
-        if 'global_auto_update_child_nodes_on_frame_change_bool' not in bpy.context.scene.keys():
-            bpy.context.scene['global_auto_update_child_nodes_on_frame_change_bool'] = True
-            
-        if bpy.context.scene['global_auto_update_child_nodes_on_frame_change_bool'] == False:
-            return
-            
-        #print("frame change: frame" + str(bpy.context.scene.frame_current))
-        # iterate over all materials. For parent pynodes - copy any key framed data to the parent osl shader and child osl shaders
-        for mat in bpy.data.materials:
-            if mat.use_nodes:
-                for node in mat.node_tree.nodes:
-                    if "Cutaway Shader" in node.name:
-                    #if node.name.find("Cutaway Shader") != -1:
-                        if node.node_is_parent == True:
-                            #if (node.effectmix_float_last_frame_value != node.effectmix_float):
-                            #print("PreFrame:Setting effectmix_float for: " + node.name)
-                            node.effectmix_float = node.effectmix_float           # setting the property to itself will call the update call back for this property => update this and all child node => update all OSL inputs
- 
-                            #if (node.rimeffectmix_float_last_frame_value != node.rimeffectmix_float):
-                            node.rimeffectmix_float = node.rimeffectmix_float
-                      
-                            #if (node.edge_fade_distance_float_last_frame_value != node.edge_fade_distance_float_prop): 
-                            node.edge_fade_distance_float_prop = node.edge_fade_distance_float_prop  
-                                
-                            #if (node.edge_fade_sharpness_float_last_frame_value != node.edge_fade_sharpness_float_prop): 
-                            node.edge_fade_sharpness_float_prop = node.edge_fade_sharpness_float_prop
-                            
-                            
-                            
-    def cas_render_pre_callback_update_child_nodes_with_keyed_values(scene):
-        #print("frame change: frame" + str(bpy.context.scene.frame_current))
-        # iterate over all materials. For parent pynodes - copy any key framed data to the parent osl shader and child osl shaders
-        for mat in bpy.data.materials:
-            if mat.use_nodes:
-                for node in mat.node_tree.nodes:
-                    if "Cutaway Shader" in node.name:
-                    #if node.name.find("Cutaway Shader") != -1:
-                        if node.node_is_parent == True:
-                            #if (node.effectmix_float_last_frame_value != node.effectmix_float):
-                            #print("PreFrame:Setting effectmix_float for: " + node.name)
-                            node.effectmix_float = node.effectmix_float           # setting the property to itself will call the update call back for this property => update this and all child node => update all OSL inputs
-
-                            #if (node.rimeffectmix_float_last_frame_value != node.rimeffectmix_float):
-                            node.rimeffectmix_float = node.rimeffectmix_float
-                      
-                            #if (node.edge_fade_distance_float_last_frame_value != node.edge_fade_distance_float_prop): 
-                            node.edge_fade_distance_float_prop = node.edge_fade_distance_float_prop  
-                                
-                            #if (node.edge_fade_sharpness_float_last_frame_value != node.edge_fade_sharpness_float_prop): 
-                            node.edge_fade_sharpness_float_prop = node.edge_fade_sharpness_float_prop
-                        
-                        
-    # This routine is called before every frame is rendered (see below for more info on this)
+    # This routine is called before every frame is rendered (see the key frame propagation helpers above this class for more info on this)
     # We check to see if any of our sliders have been animation keyed (i.e check to see if their value has been updated for this new frame).
     # If any of the values have been keyed - then then this py node's osl node needs to be updated - as do all the child nodes.
     '''
@@ -1140,61 +2676,6 @@ class CutAwaySetupNode(Node):
         print("float value changed", self.effectmix_float)
     #print("Frame Change2", scene.frame_current, self.effectmix_float)  # effectmix_float
     '''
-    # There was an issue where key framed values on a parent pynode were not being copied to the child nodes
-    # when the time line was moved, or when an animation was being rendered.
-    # The callback allows the master pynode to copy the appropriate parameters to all its child nodes (I had tried adding
-    # drivers programmatically to do this -- but the child pynodes could not be driven -- maybe this will change as the depsgraph is updated )
-    # Note"If there are *alot* of child nodes - then it can take some time to update all the parameters, so it may be worth while)
-    # having a check box to turn off the automatic update during render previews.  
-    # There was also an issue during the development where the callback seemed to be called twice (this was used at the time to detect
-    # materials being changed -- e.g. duplicated -- and dealing with the re-creation of a new parent node, or finding the parent of a 
-    # duplicated child node) -- need to re-check this.
-        
-    # Comment out the unused callback options (some favour rendering, others favour preview)     
-    # *** scene_update_post ***    
-    # callback_delete_list = []
-    # for callback in bpy.app.handlers.scene_update_post:
-        # if (callback.__name__ == cas_pre_frame_render_callback.__name__):
-            # print ("found " + callback.__name__ + "to delete" )
-            # callback_delete_list.append(callback)
-        
-    # for callback in callback_delete_list:
-        # print("Deleting old callback: " + callback.__name__)
-        # bpy.app.handlers.scene_update_post.remove(callback)
-        
-        
-    # *** frame_change_pre ***
-    # Remove any old callbacks. These accumulate, making debugging hard, and slowing down performance.
-    # We can't iterate over a list we're changing, so make a fresh list of functions to delete - and then delete from this list. 
-    callback_delete_list = []
-    for callback in bpy.app.handlers.frame_change_pre:
-        if (callback.__name__ == cas_frame_change_callback_update_child_nodes_with_keyed_values.__name__):
-            print ("found frame_change_pre " + callback.__name__ + " to delete" )
-            callback_delete_list.append(callback)
-                 
-    for callback in callback_delete_list:
-        print("Deleting old frame_change_pre callback: " + callback.__name__)
-        bpy.app.handlers.frame_change_pre.remove(callback)
-    
-   
-    # *** render_pre *** 
-    # Remove any old callbacks. These accumulate, making debugging hard, and slowing down performance.
-    # We can't iterate over a list we're changing, so make a fresh list of functions to delete - and then delete from this list.     
-    callback_delete_list = []
-    for callback in bpy.app.handlers.render_pre:                                                                            # <=== render_pre.append
-        if (callback.__name__ == cas_render_pre_callback_update_child_nodes_with_keyed_values.__name__):
-            #print ("found render_pre " + callback.__name__ + "to delete" )
-            callback_delete_list.append(callback)
-        
-    for callback in callback_delete_list:
-        #print("Deleting old render_pre callback: " + callback.__name__)
-        bpy.app.handlers.render_pre.remove(callback)
-
-    #print("ADDING PRE FRAME CALLBACK_called once when Blender started or script first run")
-    bpy.app.handlers.frame_change_pre.append(cas_frame_change_callback_update_child_nodes_with_keyed_values)                # <=== frame_change_pre  (good for rendering - and updates preview - but can bog down preview)
-    bpy.app.handlers.render_pre.append(cas_render_pre_callback_update_child_nodes_with_keyed_values)                        # <=== render_pre.append (good for rendering - but not for preview)
-    #bpy.app.handlers.scene_update_post.append(cas_pre_frame_render_callback)     
-
     
     # --------------------------------------------------------------------------------------------
     # --------------------------------------------------------------------------------------------
@@ -1206,38 +2687,8 @@ class CutAwaySetupNode(Node):
     #   - init the py-node properties 
 
     def init(self, context):
-        # See if the cutaway shader py and osl files are already in the text block memory.
-        cutAwayShader_py_exists = False
-        cutAwayShader_osl_exists = False
-        for textblock in bpy.data.texts:
-            if textblock.name == "CutAwayShader.py":
-                cutAwayShader_py_exists = True
-            elif textblock.name == "CutAwayShader.osl":
-                cutAwayShader_osl_exists = True
-            
-            # Have we found both files    
-            if cutAwayShader_py_exists == True and cutAwayShader_py_exists == True:
-                # Yes: no need to keep checking the rest of the text blocks
-                break
-              
-        # load the osl code into the tex block memory if needed   
-        #cutAwayShader_osl_exists = False  
-        if cutAwayShader_osl_exists == False:
-            #cutaway_shader_osl_pathandfile_name = bpy.utils.script_paths()[0] +  '/addons/node_cutaway_shader/CutAwayShader.osl'  #'%saddons%snode_cutaway_shader%sCutAwayShader.py'
-            cutaway_shader_osl_pathandfile_name = os.path.join(os.path.dirname(__file__), '..', 'node_cutaway_shader', 'CutAwayShader.osl')
-            cutaway_shader_osl_textblock = bpy.data.texts.load(cutaway_shader_osl_pathandfile_name)
-             
-        #cutAwayShader_py_exists = False
-        # load the py code into the text block memory if needed    
-        if cutAwayShader_py_exists == False:
-            #cutaway_shader_py_pathandfile_name = bpy.utils.script_paths()[0] +  '/addons/node_cutaway_shader/CutAwayShader.py'  #'%saddons%snode_cutaway_shader%sCutAwayShader.py'
-            #cutaway_shader_py_pathandfile_name = os.path.join(os.path.dirname(__file__), '..', 'node_cutaway_shader', 'CutAwayShader.py')
-            cutaway_shader_py_pathandfile_name = os.path.join(os.path.dirname(__file__), '..', 'node_cutaway_shader', '__init__.py')
-            cutaway_shader_py_textblock = bpy.data.texts.load(cutaway_shader_py_pathandfile_name)
-            cutaway_shader_py_textblock.name = 'CutAwayShader.py'
-            cutaway_shader_py_textblock.use_module = True
-            print (cutaway_shader_py_textblock.name)
-        
+        # Make sure the cutaway shader py and osl files are in the text block memory.
+        cas_load_cutaway_shader_texts()
         
         # setup references
         py_node = self                   #  py_node is this cut_away_shader pynode helper. self = nodes['Cutaway Shader']
@@ -1249,8 +2700,8 @@ class CutAwaySetupNode(Node):
         NODE_Y_OFFSET = 185             # determined by 'hand' - makes the nodes line up nicely.
         
         # Assign a unique id to this pynode - so that parent nodes may find child nodes and vise versa
-        # Note - this routine creates the unique_pynode_id_int property for this node.
-        self.get_unique_pynode_id_str__create_if_neccessary(self)
+        # Note - this routine creates the unique_pynode_id_str property for this node.
+        self.assign_unique_pynode_id_str(self)
         
         # true if the user needs to enable CPU render mode and/or enable OSL render mode
         self.enable_OSL_bool_prop = (bpy.context.scene.cycles.shading_system == True) and (bpy.context.scene.cycles.device  == 'CPU')  ,
@@ -1282,7 +2733,18 @@ class CutAwaySetupNode(Node):
         osl_node.inputs["EdgeFadeSharpness"].default_value = self.edge_fade_sharpness_float_prop            # set the OSL Shader's 
 
 
-        # create setup node output sockets
+        # Child nodes made from a child template don't need the setup node output sockets (see cas_fast_child_init_state_dict)
+        if (cas_fast_child_init_state_dict['depth'] == 0):
+            self.add_setup_node_sockets_and_links(osl_node)
+            # A new parent: register it, so its key frames are checked when actions are edited (see cas_check_parent_keyed_value_fcurves).
+            # (Child nodes are registered by the parent that adds them.)
+            cas_register_pynode(self)
+    
+    # create setup node output sockets, and link them to the osl cutaway shader node inputs
+    def add_setup_node_sockets_and_links(self, osl_node):
+        py_node = self
+        nodetree = py_node.id_data
+        
         outputSkt = py_node.outputs.new('NodeSocketFloat', "Effect Mix" )
         outputSkt = py_node.outputs.new('NodeSocketFloat', "Rim Effect Mix")
         outputSkt = py_node.outputs.new('NodeSocketInt', "Invert Cutaway Bounds")
@@ -1393,7 +2855,7 @@ class CutAwaySetupNode(Node):
         self.edge_fade_sharpness_float_prop = self.edge_fade_sharpness_float_prop
             #keyframe_prop_change = True    
             
-        # todo:
+        # todo: (done - see push_keyed_values_to_child_nodes_if_changed and begin_child_update_transaction)
         # would be faster to use  keyframe_prop_change. Iterate through all the child nodes just once (instead of multiple times as above) 
         # change above ifs to elif           
             #self.effectmix_float_last_frame_value = self.effectmix_float;
@@ -1446,9 +2908,9 @@ class CutAwaySetupNode(Node):
     def invertCutAwayBoundsUpdate(self, context):
         oslNode = self.id_data.nodes[self.osl_nodename_str]      # id_data represents treenode
         if (self.invert_cutaway_bounds_prop):
-            oslNode.inputs["InvertCutawayBounds"].default_value = 1
+            cas_set_osl_input_if_changed(oslNode, "InvertCutawayBounds", 1)
         else:
-            oslNode.inputs["InvertCutawayBounds"].default_value = 0  
+            cas_set_osl_input_if_changed(oslNode, "InvertCutawayBounds", 0)  
             
         self.set_invert_cutaway_bounds_prop_for_all_child_nodes()
     
@@ -1628,9 +3090,9 @@ class CutAwaySetupNode(Node):
     def occludeRimUpdate(self, context):
         oslNode = self.id_data.nodes[self.osl_nodename_str]
         if (self.occludeRim_bool_prop):
-            oslNode.inputs["RimOcclusionEnable"].default_value = 1
+            cas_set_osl_input_if_changed(oslNode, "RimOcclusionEnable", 1)
         else:
-            oslNode.inputs["RimOcclusionEnable"].default_value = 0
+            cas_set_osl_input_if_changed(oslNode, "RimOcclusionEnable", 0)
                                                
     # Check box to select "Rim Occlusion Enable" : Property Definition
     occludeRim_bool_prop = bpy.props.BoolProperty( 
@@ -1649,16 +3111,16 @@ class CutAwaySetupNode(Node):
         theSelection = self.plane_shape_items[indexInt][1]
         oslNode = self.id_data.nodes[self.osl_nodename_str]
         if (theSelection == 'Rectangular'):
-              oslNode.inputs["DrawMode_circular0_rectangular1"].default_value = 1
+              cas_set_osl_input_if_changed(oslNode, "DrawMode_circular0_rectangular1", 1)
               self.rectangular_circular_int = 1 
               
         elif (theSelection == 'Circular'):
-              oslNode.inputs["DrawMode_circular0_rectangular1"].default_value = 0
+              cas_set_osl_input_if_changed(oslNode, "DrawMode_circular0_rectangular1", 0)
               self.rectangular_circular_int = 0    
               
         elif (theSelection == 'From Image'):
-              oslNode.inputs["DrawMode_circular0_rectangular1"].default_value = 2
-              oslNode.inputs["cutAwayImg"].default_value = self.cutaway_image_path_and_name_str
+              cas_set_osl_input_if_changed(oslNode, "DrawMode_circular0_rectangular1", 2)
+              cas_set_osl_input_if_changed(oslNode, "cutAwayImg", self.cutaway_image_path_and_name_str)
               self.rectangular_circular_int = 2 
         
         self.update_child_node_rect_circular_settings()
@@ -1677,7 +3139,7 @@ class CutAwaySetupNode(Node):
     # < Edge Fade Distance Slider >
     def edge_fade_distance_update(self, context):
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["EdgeFadeDistance"].default_value = self.edge_fade_distance_float_prop
+        cas_set_osl_input_if_changed(oslNode, "EdgeFadeDistance", self.edge_fade_distance_float_prop)
         self.set_fadedist_and_sharpness_prop_for_all_child_nodes()
         
     edge_fade_distance_float_prop = bpy.props.FloatProperty(
@@ -1695,7 +3157,7 @@ class CutAwaySetupNode(Node):
     # < Edge Fade Sharpness Slider >
     def edge_fade_sharpness_update(self, context):
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["EdgeFadeSharpness"].default_value = self.edge_fade_sharpness_float_prop
+        cas_set_osl_input_if_changed(oslNode, "EdgeFadeSharpness", self.edge_fade_sharpness_float_prop)
         self.set_fadedist_and_sharpness_prop_for_all_child_nodes()
         
     edge_fade_sharpness_float_prop = bpy.props.FloatProperty(
@@ -1729,7 +3191,7 @@ class CutAwaySetupNode(Node):
     # Update the EffectMixFactor input of the OSL cutaway shader
     def effectmix_update(self, context):
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["EffectMixFactor"].default_value = self.effectmix_float
+        cas_set_osl_input_if_changed(oslNode, "EffectMixFactor", self.effectmix_float)
         self.copy_mixfactor_setting_to_child_nodes()
     
     effectmix_float = bpy.props.FloatProperty(
@@ -1744,11 +3206,34 @@ class CutAwaySetupNode(Node):
     effectmix_float_last_frame_value = effectmix_float;
     # <!Final Effect Mix Slider !>
     
+    # < Deferred Child Sync check box and interval >
+    # If checked, the child nodes are updated by a timer while the Effect Mix and Edge Fade sliders are dragged (see casDeferredChildSyncTimer)
+    deferred_child_sync_bool_prop = bpy.props.BoolProperty( 
+        name="Deferred Child Sync",
+        description="Keep the sliders responsive when there are lots of child nodes. This node is updated straight away, the child nodes are updated at the given interval",
+        default = False)
+        
+    deferred_child_sync_interval_float_prop = bpy.props.FloatProperty(
+        name = "Interval", 
+        description = "Seconds between child node updates while a slider is being dragged",
+        default = 0.1,
+        min = 0.02,
+        max = 2.0)
+    # < !Deferred Child Sync check box and interval >
+    
+    # < Share Child Materials check box >
+    # If checked, Add Child Nodes to Selected adds one child node per material (see add_child_nodes_to_selected)
+    share_child_materials_bool_prop = bpy.props.BoolProperty( 
+        name="Share Child Materials",
+        description="Objects that use the same material share one child material (also with the child materials added earlier). Keeps the number of OSL shaders to compile down to the number of different materials",
+        default = False)
+    # < !Share Child Materials check box >
+    
 
     # < Rim Thickness Slider >
     def rim_thickness_update(self, context):
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["RimThickness"].default_value = self.rimthickness_float
+        cas_set_osl_input_if_changed(oslNode, "RimThickness", self.rimthickness_float)
         
     rimthickness_float = bpy.props.FloatProperty(
         name = "Thickness", 
@@ -1763,7 +3248,7 @@ class CutAwaySetupNode(Node):
     # < Rim Effect Mix Factor Slider >
     def rim_effect_mix_update(self, context):
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["RimEffectMixFactor"].default_value = self.rimeffectmix_float
+        cas_set_osl_input_if_changed(oslNode, "RimEffectMixFactor", self.rimeffectmix_float)
              
     rimeffectmix_float = bpy.props.FloatProperty(
         name = "Rim Effect Mix", 
@@ -1787,20 +3272,20 @@ class CutAwaySetupNode(Node):
         if (theSelection == 'No Rim Drawn'):
               #oslNode.inputs["DrawMode_circular0_rectangular1"].default_value = 1
               #self.rectangular_circular_int = 1 
-              oslNode.inputs["RimFillEnable"].default_value = 0
+              cas_set_osl_input_if_changed(oslNode, "RimFillEnable", 0)
               self.fillRim_bool_prop = False;
               
         elif (theSelection == 'Emission Rim Shader'):
               #oslNode.inputs["DrawMode_circular0_rectangular1"].default_value = 0
               #self.rectangular_circular_int = 0    
-              oslNode.inputs["RimFillEnable"].default_value = 1
+              cas_set_osl_input_if_changed(oslNode, "RimFillEnable", 1)
               self.fillRim_bool_prop = True
               
         elif (theSelection == 'Diffuse Rim Shader'):
               #oslNode.inputs["DrawMode_circular0_rectangular1"].default_value = 2
               #oslNode.inputs["cutAwayImg"].default_value = self.cutaway_image_path_and_name_str
               #self.rectangular_circular_int = 2 
-              oslNode.inputs["RimFillEnable"].default_value = 10
+              cas_set_osl_input_if_changed(oslNode, "RimFillEnable", 10)
               self.fillRim_bool_prop = True
         
         #self.update_child_node_rect_circular_settings()
@@ -1822,9 +3307,9 @@ class CutAwaySetupNode(Node):
     def fillRimUpdate(self, context):
         oslNode = self.id_data.nodes[self.osl_nodename_str]      # id_data represents treenode
         if (self.fillRim_bool_prop):
-            oslNode.inputs["RimFillEnable"].default_value = 1
+            cas_set_osl_input_if_changed(oslNode, "RimFillEnable", 1)
         else:
-            oslNode.inputs["RimFillEnable"].default_value = 0  
+            cas_set_osl_input_if_changed(oslNode, "RimFillEnable", 0)  
     
     # Check box to select "fill cutaway with a rim" 
     fillRim_bool_prop = bpy.props.BoolProperty( 
@@ -1853,42 +3338,8 @@ class CutAwaySetupNode(Node):
                 
             self.cutAwayPlaneNameStr = newCutawayPlaneStr
             
-            # save the users original context
-            if (bpy.context.area == None):
-                return
-            
-            original_areatype = bpy.context.area.type
-            
-            # bpy.ops.object.select_all only work from the 3d view context. So, switch to this.
-            bpy.context.area.type = "VIEW_3D"
-            
-            if (bpy.context.scene.objects.active == None):
-                bpy.context.scene.objects.active = bpy.context.scene.objects[newCutawayPlaneStr]
-            
-            # we need to be in object mode to do this work
-            bpy.ops.object.mode_set(mode='OBJECT')
-            
-            # xx save the active object (to prevent our tree node disappearing if not pinned)
-            active_obj_save = bpy.context.scene.objects.active
-            
-            # Select the cut away plane. bpy.ops.object.mode_set(mode='OBJECT') will crash if the last active plane was just deleted - this fixes the crash
-            bpy.context.scene.objects.active = bpy.context.scene.objects[newCutawayPlaneStr]
-            
-            # bpy.ops.object.select_all only work from the 3d view context. So, switch to this.
-            #bpy.context.area.type = "VIEW_3D"
-            
-             # Save the layers that the user has enabled
-            #saved_layer_settings_list = self.save_layer_settings()
-            
-            # Make all layers enabled - so we can find the cut away plane (if it was on a disabled layer)
-            #bpy.context.scene.layers = [True] * 20 # Show all layers (bug here -- need to restore)
-            #bpy.context.scene.objects.active = bpy.context.scene.objects[newCutawayPlaneStr]
-            
-            # we need to be in object mode to do this work
-            #bpy.ops.object.mode_set(mode='OBJECT')
-            
-            # save the active object (to prevent our tree node disappearing if not pinned)
-            #active_obj_save = bpy.context.scene.objects.active
+            # Nothing here needs a particular context, selection or mode (the plane's outline is read from its mesh data),
+            # so a plane can be set or refreshed from a script too.
             
             #get a reference to the OSL cutaway shader
             py_node = self
@@ -1903,28 +3354,26 @@ class CutAwaySetupNode(Node):
 
             ob = bpy.context.scene.objects[newCutawayPlaneStr]
             if (ob != None):
-                #bpy.ops.object.select_all(action='DESELECT')
-                bpy.ops.object.mode_set(mode='OBJECT')
+                old_rim_outline_hash_str = self.rim_outline_hash_str
                 RimSegmentXMLDataStr = self.update_rim_segment_data(ob)
-                if (self.node_is_parent == True):
+                # No need to tell the child nodes if neither the plane nor its outline has changed
+                if (self.node_is_parent == True and (cutawayPlaneChanged or self.rim_outline_hash_str != old_rim_outline_hash_str)):
                     self.copy_new_cutaway_plane_settings_to_child(newCutawayPlaneStr, RimSegmentXMLDataStr)
+                # The outline watcher finds parents through the registry - and this plane may be animated
+                if (self.node_is_parent == True):
+                    if (self.get('unique_pynode_id_str') not in cas_pynode_registry_dict['parent_id_set']):
+                        cas_register_pynode(self)
+                    cas_update_outline_watch_frame_handler_registration(bpy.context.scene)
 
                 # Ensure that at least one of the layers that the object appears on is enabled
                 for i in range (len(bpy.context.scene.layers)):
                     if ob.layers[i] == True:
                         bpy.context.scene.layers[i] = True
-                        bpy.context.space_data.layers[i] = True
+                        if hasattr(bpy.context.space_data, "layers"):
+                            bpy.context.space_data.layers[i] = True
                         break
                 # a hack to get the 3D rendered scene to update after choosing a new cutaway plane
-                ob.select = True
                 ob.delta_location=(0.0, 0.0, 0.0)
-            
-            # This prevents the tree node jumping to the new plane material.
-            if (active_obj_save != None):
-                bpy.context.scene.objects.active = active_obj_save
-             
-            # save the users original context
-            bpy.context.area.type = original_areatype
         else:
             # The cutaway plane no longer exists
             self.cutAwayPlaneNameStr = ""
@@ -1932,13 +3381,16 @@ class CutAwaySetupNode(Node):
     # The cutawayplane has been changed (or reselected/refreshed)
     # copy the relevant guff, given to us by our parent, into our child settings 
     # If this is called - we are a child node  
-    def set_child_cutaway_plane(self, newCutawayPlaneStr, RimSegmentXMLDataStr):
+    def set_child_cutaway_plane(self, newCutawayPlaneStr, RimSegmentXMLDataStr, rim_outline_hash_str = ""):
         # Check if the cutaway plane has changed (some times just the number of edges etc change - not the actual plane)
         cutawayPlaneChanged = True
         if (self.cutAwayPlaneNameStr == newCutawayPlaneStr):
             cutawayPlaneChanged = False
+            # Nothing to do if we already have this outline
+            if (rim_outline_hash_str != "" and self.rim_outline_hash_str == rim_outline_hash_str):
+                return
             
-        self.cutAwayPlaneNameStr = newCutawayPlaneStr
+        cas_set_if_changed(self, 'cutAwayPlaneNameStr', newCutawayPlaneStr)
         
         #get a reference to the OSL cutaway shader
         nodetree = self.id_data
@@ -1952,7 +3404,8 @@ class CutAwaySetupNode(Node):
           
         # copy over the rim segment data XML string (this defines where the edeges are on our cutaway plane    
         osl_node = self.id_data.nodes[self.osl_nodename_str]
-        osl_node.inputs["RimSegmentXMLData"].default_value = RimSegmentXMLDataStr 
+        cas_set_osl_input_if_changed(osl_node, "RimSegmentXMLData", RimSegmentXMLDataStr) 
+        cas_set_if_changed(self, 'rim_outline_hash_str', rim_outline_hash_str)
         
      
     # The user has pressed the refresh cutaway plane button.
@@ -1964,9 +3417,20 @@ class CutAwaySetupNode(Node):
         # temp: update our name in case the user changed it.
         #self.mat_name_str = self.get_mat_idstr()
         
-        #refresh the actual plane
-        self.origin_reset()  
-        self.setNewCutawayPlane(self.cutAwayPlaneNameStr)
+        #refresh the actual plane. The new origin and the plane settings reach the child nodes in one pass (see begin_child_update_transaction)
+        self.begin_child_update_transaction()
+        try:
+            self.origin_reset()  
+            self.setNewCutawayPlane(self.cutAwayPlaneNameStr)
+        finally:
+            self.end_child_update_transaction()
+    
+    # The cutaway plane's outline has changed (see cas_check_cutaway_plane_outlines): just send the new outline to our OSL node 
+    # and the child nodes - the plane, its drivers and the origin are the same.
+    # If this is called - we are a parent node  
+    def push_new_cutaway_plane_outline(self, cutaway_obj, outline_array_tuple):
+        RimSegmentXMLDataStr = self.update_rim_segment_data(cutaway_obj, outline_array_tuple)
+        self.copy_new_cutaway_plane_settings_to_child(self.cutAwayPlaneNameStr, RimSegmentXMLDataStr)
         
     # --------------------------------------------------------------------------------------------
     # Driver Helper methods called when adding a new cutaway plane
@@ -2069,18 +3533,18 @@ class CutAwaySetupNode(Node):
         
         # Set the OSL node to the inner mesh setting
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["InnerMesh0_OuterMesh1"].default_value = 0
+        cas_set_osl_input_if_changed(oslNode, "InnerMesh0_OuterMesh1", 0)
         
 
     def copy_mixfactor_setting_to_child_nodes(self):
-        self.carry_out_action_on_this_parents_child_nodes_b('COPY_MIX_FACTOR_TO_CHILD')
+        self.carry_out_or_defer_child_action('COPY_MIX_FACTOR_TO_CHILD')
      
     # called by the parent when the effect mix changes (i.e we must be a child)    
     def set_cutaway_mix_float(self, effectmix):
         #print(self.py_nodename_str + ": copying effect mix to child node")
-        self.effectmix_float = effectmix
+        cas_set_if_changed(self, 'effectmix_float', effectmix)
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["EffectMixFactor"].default_value = self.effectmix_float
+        cas_set_osl_input_if_changed(oslNode, "EffectMixFactor", self.effectmix_float)
     
     def xxxNodex(self):
         callback_delete_list = []
@@ -2094,6 +3558,29 @@ class CutAwaySetupNode(Node):
             bpy.app.handlers.frame_change_pre.remove(callback)
         
 
+    # Slider updates: If 'Deferred Child Sync' is checked, leave the child nodes to the casDeferredChildSyncTimer
+    # so the slider stays responsive however many child nodes there are. Otherwise update the child nodes now.
+    def carry_out_or_defer_child_action(self, action_str):
+        if (self.node_is_parent and self.deferred_child_sync_bool_prop and self.get_unique_pynode_id_str(self) != '0'
+                and cas_deferred_child_sync_state_dict['immediate_depth'] == 0 and not bpy.app.background):
+            unique_pynode_id_str = self.get_unique_pynode_id_str(self)
+            if unique_pynode_id_str not in cas_deferred_child_sync_dict:
+                cas_deferred_child_sync_dict[unique_pynode_id_str] = set()
+            cas_deferred_child_sync_dict[unique_pynode_id_str].add(action_str)
+            
+            if (cas_deferred_child_sync_state_dict['timer_running']):
+                return
+            try:
+                bpy.ops.cas_btn.deferred_child_sync_timer('INVOKE_DEFAULT', interval_float = self.deferred_child_sync_interval_float_prop)
+                return
+            except RuntimeError:
+                # No window to run the timer in (e.g. the property was set from a script) - just do it now
+                cas_deferred_child_sync_dict[unique_pynode_id_str].discard(action_str)
+                if (len(cas_deferred_child_sync_dict[unique_pynode_id_str]) == 0):
+                    del cas_deferred_child_sync_dict[unique_pynode_id_str]
+        
+        self.carry_out_action_on_this_parents_child_nodes_b(action_str)
+        
     # Copy the important settings from this parent node to all its child nodes.
     def copy_parent_settings_to_all_child_nodes(self):
         # don't do if we are a child node
@@ -2123,20 +3610,47 @@ class CutAwaySetupNode(Node):
     # set self.invert_cutaway_bounds_prop to match the parent node (as the user has probably just changed it in the parent node)
     def copy_invert_cutaway_bounds_to_child(self, invert_prop_bool):  # #self.invert_cutaway_bounds_prop
         # Setting this property will force the property update routine to update the OSL node
-        self.invert_cutaway_bounds_prop = invert_prop_bool
+        cas_set_if_changed(self, 'invert_cutaway_bounds_prop', invert_prop_bool)
         
     # If this is called, we are a parent node    
     def set_fadedist_and_sharpness_prop_for_all_child_nodes(self):
         # don't do if we are a child node
         if (self.node_is_parent == False):
             return
-        self.carry_out_action_on_this_parents_child_nodes_b('COPY_FADEDIST_AND_SHARPNESS_TO_CHILD') 
+        self.carry_out_or_defer_child_action('COPY_FADEDIST_AND_SHARPNESS_TO_CHILD') 
      
      # If this is called, we are a child node    
     def copy_fadedist_and_sharpness_to_child(self, fade_dist_float, fade_sharpness_float):
-        self.edge_fade_distance_float_prop = fade_dist_float
-        self.edge_fade_sharpness_float_prop = fade_sharpness_float
+        cas_set_if_changed(self, 'edge_fade_distance_float_prop', fade_dist_float)
+        cas_set_if_changed(self, 'edge_fade_sharpness_float_prop', fade_sharpness_float)
+        # The update callbacks are not called if the property writes were elided - make sure the OSL node matches.
+        oslNode = self.id_data.nodes[self.osl_nodename_str]
+        cas_set_osl_input_if_changed(oslNode, "EdgeFadeDistance", fade_dist_float)
+        cas_set_osl_input_if_changed(oslNode, "EdgeFadeSharpness", fade_sharpness_float)
+        
+    # Copy our cutaway plane, and the rim segment data in our OSL node, to the given child node (if we have a cutaway plane)
+    # If this is called we are a parent. The child pynode is passed as a parameter
+    def copy_cutaway_plane_to_child(self, child_py_node):
+        if (self.cutAwayPlaneNameStr not in bpy.context.scene.objects):
+            return
+        parent_osl_node = self.id_data.nodes[self.osl_nodename_str]
+        child_py_node.set_child_cutaway_plane(self.cutAwayPlaneNameStr, parent_osl_node.inputs["RimSegmentXMLData"].default_value, self.rim_outline_hash_str)
         
+    # Lazy child sync: copy all of the settings a child node follows to a (stale) child node.
+    # If this is called we are a parent. The child pynode is passed as a parameter
+    def bring_child_up_to_date(self, child_py_node):
+        child_osl_node = child_py_node.id_data.nodes[child_py_node.osl_nodename_str]
+        
+        self.copy_cutaway_plane_to_child(child_py_node)
+        cas_set_osl_input_if_changed(child_osl_node, "OriginOffset", self.origin_offset)
+        child_py_node.set_child_rect_circular_settings(self.rectangular_circular_int, self.cutaway_image_path_and_name_str)
+        child_py_node.set_cutaway_mix_float(self.effectmix_float)
+        child_py_node.copy_fadedist_and_sharpness_to_child(self.edge_fade_distance_float_prop, self.edge_fade_sharpness_float_prop)
+        child_py_node.copy_invert_cutaway_bounds_to_child(self.invert_cutaway_bounds_prop)
+        
+        cas_set_if_changed(child_py_node, 'synced_parent_revision_int', self.child_sync_revision_int)
+        cas_stale_child_dict.pop(self.get_unique_pynode_id_str(child_py_node), None)
+    
     # Copy the important settings from this parent to the given child node. 
     # If this is called we are a parent. The child pynode is passed as a parameter
     def copy_parent_settings_to_child(self, child_py_node):
@@ -2147,14 +3661,16 @@ class CutAwaySetupNode(Node):
         
         #the_mat_idstr = self.get_mat_idstr()                                                        #doubleox
         
-        parent_pynode_unique_id_str = self.get_unique_pynode_id_str__create_if_neccessary(self)     #doubler
+        parent_pynode_unique_id_str = self.assign_unique_pynode_id_str(self)                        #doubler
         
         # get the child pynode's OSL node and set the origin offset to the parents origin offset
         osl_node = child_py_node.id_data.nodes[child_py_node.osl_nodename_str]
-        osl_node.inputs["OriginOffset"].default_value = self.origin_offset
+        cas_set_osl_input_if_changed(osl_node, "OriginOffset", self.origin_offset)
         
         
-        child_py_node.setNewCutawayPlane(self.cutAwayPlaneNameStr) 
+        # Copy our cutaway plane and its rim segment data over. The child doesn't need to re-calculate the rim segment data from the plane
+        # (setNewCutawayPlane) - it's the same as ours. This avoids the operator calls and context switches that setNewCutawayPlane makes for every child.
+        self.copy_cutaway_plane_to_child(child_py_node)
         #print ("setting new plane ", self.cutAwayPlaneNameStr)
         child_py_node.set_child_rect_circular_settings(self.rectangular_circular_int, self.cutaway_image_path_and_name_str)
         #child_py_node.set_parent_mat_and_node_link_strs(the_mat_idstr, self.name, parent_pynode_unique_id_str) #doubler #doubleox added parent_pynode_unique_id_str parm. next step get rif of the_mat_idstr
@@ -2163,6 +3679,11 @@ class CutAwaySetupNode(Node):
         child_py_node.set_cutaway_mix_float(self.effectmix_float)
         child_py_node.copy_fadedist_and_sharpness_to_child(self.edge_fade_distance_float_prop, self.edge_fade_sharpness_float_prop)
         child_py_node.copy_invert_cutaway_bounds_to_child(self.invert_cutaway_bounds_prop)
+        cas_set_if_changed(child_py_node, 'synced_parent_revision_int', self.child_sync_revision_int)
+        
+        # In 'drivers' mode the child's OSL node follows our key framed values through drivers
+        if (self.get_global_drive_child_nodes_with_drivers_bool_create_if_neccessary()):
+            self.add_keyed_value_drivers_to_osl_node(osl_node)
         
         
         
@@ -2177,22 +3698,275 @@ class CutAwaySetupNode(Node):
             child_node.select = True
             #bpy.ops.node.view_selected()
     ''' 
+    # The unique ids of this (parent) pynode's child pynodes. Items are named with the child's unique id str, 
+    # so membership tests and look ups (in, find) are done by Blender by name - without iterating in python.
+    child_unique_id_collection = bpy.props.CollectionProperty(type = CasChildUniqueIdPropertyGroup)
+    
+    # Parents from older files that have not been converted yet (e.g. appended, or linked from a library, after the file was loaded) 
+    # still have their 'pnuidX' child ID properties. These are read as the child list, and converted the first time the list is changed.
+    def get_child_unique_id_str_list(self):
+        if (len(self.child_unique_id_collection) == 0 and self.has_legacy_child_id_props()):
+            return self.get_legacy_child_unique_id_str_list()
+        return [item.name for item in self.child_unique_id_collection]
+        
+    def has_child_unique_id_str(self, child_pynode_unique_id_str):
+        if (len(self.child_unique_id_collection) == 0 and self.has_legacy_child_id_props()):
+            return child_pynode_unique_id_str in self.get_legacy_child_unique_id_str_list()
+        return child_pynode_unique_id_str in self.child_unique_id_collection
+        
+    def add_child_unique_id_str(self, child_pynode_unique_id_str):
+        self.migrate_child_id_props_to_collection()
+        if child_pynode_unique_id_str not in self.child_unique_id_collection:
+            item = self.child_unique_id_collection.add()
+            item.name = child_pynode_unique_id_str
+    
+    def remove_child_unique_id_str(self, child_pynode_unique_id_str):
+        self.migrate_child_id_props_to_collection()
+        index_int = self.child_unique_id_collection.find(child_pynode_unique_id_str)
+        if (index_int > -1):
+            self.child_unique_id_collection.remove(index_int)
+    
+    def get_legacy_child_unique_id_str_list(self):
+        return [self[key_str] for key_str in self.keys() if key_str.startswith("pnuid")]
+    
+    # Does this pynode still have 'pnuidX' child ID properties? The ID properties are only scanned until none are found (or they are converted).
+    def has_legacy_child_id_props(self):
+        no_legacy_key = (self.as_pointer(), self.get('unique_pynode_id_str', '0'))
+        if no_legacy_key in cas_no_legacy_child_id_key_set:
+            return False
+        for key_str in self.keys():
+            if key_str.startswith("pnuid"):
+                return True
+        cas_no_legacy_child_id_key_set.add(no_legacy_key)
+        return False
+    
+    # Convert the child list of older files: one 'pnuidX' ID property per child => child_unique_id_collection
+    # (linked pynodes can't be changed - their old child list is just read, see get_child_unique_id_str_list)
+    def migrate_child_id_props_to_collection(self):
+        if (self.id_data.library != None or not self.has_legacy_child_id_props()):
+            return
+        pnuid_key_str_list = [key_str for key_str in self.keys() if key_str.startswith("pnuid")]
+        for key_str in pnuid_key_str_list:
+            child_pynode_unique_id_str = self[key_str]
+            del self[key_str]
+            if child_pynode_unique_id_str not in self.child_unique_id_collection:
+                item = self.child_unique_id_collection.add()
+                item.name = child_pynode_unique_id_str
+        cas_no_legacy_child_id_key_set.add((self.as_pointer(), self.get('unique_pynode_id_str', '0')))
+    
+    # The parent properties that may be key framed, and so need copying to the child nodes when the frame changes.
+    keyed_value_prop_name_tuple = ('effectmix_float', 'rimeffectmix_float', 'edge_fade_distance_float_prop', 'edge_fade_sharpness_float_prop')
+
+    # Called by the frame change and render callbacks (and the manual refresh button). If this is called, we are a parent node.
+    # Key framed values are written straight into the properties by Blender - without calling the property update callbacks.
+    # Setting a property to itself calls its update callback => update this and all child nodes => update all OSL inputs.
+    # Only the properties whose value has changed since they were last pushed are set (unless force_bool is True),
+    # so static (un-keyed) parents don't cascade through all their child nodes on every frame.
+    # override_value_dict: {property name : value} values to use instead of the current property values (e.g. baked key frame values)
+    def push_keyed_values_to_child_nodes_if_changed(self, force_bool = False, override_value_dict = None):
+        unique_pynode_id_str = self.get_unique_pynode_id_str(self)
+        if (unique_pynode_id_str == '0'):
+            snapshot_dict = {}                      # no unique id (yet) - it would share its snapshot with every other such parent, so push everything
+        else:
+            if unique_pynode_id_str not in cas_keyed_value_snapshot_dict:
+                cas_keyed_value_snapshot_dict[unique_pynode_id_str] = {}
+            snapshot_dict = cas_keyed_value_snapshot_dict[unique_pynode_id_str]
+
+        # Frame changes and renders can't wait for the Deferred Child Sync timer.
+        # All the changed values are copied to the child nodes in one pass (a child update transaction)
+        cas_deferred_child_sync_state_dict['immediate_depth'] += 1
+        self.begin_child_update_transaction()
+        try:
+            for prop_name_str in self.keyed_value_prop_name_tuple:
+                if (override_value_dict != None and prop_name_str in override_value_dict):
+                    value = override_value_dict[prop_name_str]
+                else:
+                    value = getattr(self, prop_name_str)
+                if force_bool or (prop_name_str not in snapshot_dict) or (snapshot_dict[prop_name_str] != value):
+                    setattr(self, prop_name_str, value)                     # calls the update callback for this property
+                    snapshot_dict[prop_name_str] = value
+        finally:
+            cas_deferred_child_sync_state_dict['immediate_depth'] -= 1
+            self.end_child_update_transaction()
+
+    # Bake Key Frames: Evaluate this (parent) pynode's key framed properties for every frame in the range, and store the values
+    # in the node (ID properties are saved in the .blend file). The frame change and render callbacks can then look up
+    # the values for the frame, instead of scanning all the materials for parents.
+    # self['cas_baked_keyed_values'] = {property name : [value for each frame]}, self['cas_baked_start_frame_int'] = first frame 
+    # Returns True if any of the properties are key framed. 
+    def bake_keyed_values(self, frame_start_int, frame_end_int):
+        self.clear_baked_keyed_values()
+        anim_data = self.id_data.animation_data
+        if (anim_data == None or anim_data.action == None or frame_end_int < frame_start_int):
+            return False
+        
+        baked_value_dict = {}
+        node_path_str = self.path_from_id() + '.'
+        for prop_name_str in self.keyed_value_prop_name_tuple:
+            fcurve = anim_data.action.fcurves.find(node_path_str + prop_name_str)
+            if (fcurve != None):
+                baked_value_dict[prop_name_str] = [fcurve.evaluate(frame) for frame in range(frame_start_int, frame_end_int + 1)]
+        
+        if (len(baked_value_dict) == 0):
+            return False
+        self['cas_baked_keyed_values'] = baked_value_dict
+        self['cas_baked_start_frame_int'] = frame_start_int
+        self['cas_baked_fcurve_hash_str'] = cas_keyed_value_fcurve_hash_str(self)         # (see cas_check_parent_keyed_value_fcurves)
+        return True
+        
+    def clear_baked_keyed_values(self):
+        for key_str in ('cas_baked_keyed_values', 'cas_baked_start_frame_int', 'cas_baked_fcurve_hash_str'):
+            if key_str in self.keys():
+                del self[key_str]
+    
+    # Returns {property name : baked value} for the scene's current frame, or None if there are no baked values for the frame.
+    # Sub frames (e.g. motion blur) are not baked - these use the current property values as before.
+    def get_baked_keyed_values_for_frame(self, scene):
+        if 'cas_baked_keyed_values' not in self.keys() or scene.frame_subframe != 0.0:
+            return None
+        
+        frame_index_int = scene.frame_current - self['cas_baked_start_frame_int']
+        baked_value_dict = {}
+        for prop_name_str, baked_values in self['cas_baked_keyed_values'].items():
+            if (frame_index_int < 0 or frame_index_int >= len(baked_values)):
+                return None
+            baked_value_dict[prop_name_str] = baked_values[frame_index_int]
+        return baked_value_dict
+    
+
+    # The OSL inputs that are fed by the keyed_value_prop_name_tuple properties (in the same order)
+    keyed_value_osl_input_name_tuple = ('EffectMixFactor', 'RimEffectMixFactor', 'EdgeFadeDistance', 'EdgeFadeSharpness')
+    
+    # Freeze for Render: Returns {property name : fcurve} for this (parent) pynode's key framed properties
+    def get_keyed_value_fcurve_dict(self):
+        fcurve_dict = {}
+        anim_data = self.id_data.animation_data
+        if (anim_data == None or anim_data.action == None):
+            return fcurve_dict
+        
+        node_path_str = self.path_from_id() + '.'
+        for prop_name_str in self.keyed_value_prop_name_tuple:
+            fcurve = anim_data.action.fcurves.find(node_path_str + prop_name_str)
+            if (fcurve != None):
+                fcurve_dict[prop_name_str] = fcurve
+        return fcurve_dict
+    
+    # Freeze for Render: Copy the key frames of this parent's properties onto the matching inputs of the given OSL node 
+    # (our own, or a child's in another material). Blender then animates the OSL inputs itself - no python needed per frame.
+    # The new fcurves are put in the cas_frozen_fcurve_group_name_str action group, so unfreezing can find them again.
+    def copy_keyed_value_fcurves_to_osl_node(self, osl_node, fcurve_dict):
+        node_tree = osl_node.id_data
+        if (node_tree.animation_data == None):
+            node_tree.animation_data_create()
+        if (node_tree.animation_data.action == None):
+            node_tree.animation_data.action = bpy.data.actions.new(name = "CutAwayShader Freeze")
+        action = node_tree.animation_data.action
+        
+        for i, prop_name_str in enumerate(self.keyed_value_prop_name_tuple):
+            if prop_name_str not in fcurve_dict:
+                continue
+            src_fcurve = fcurve_dict[prop_name_str]
+            data_path_str = osl_node.inputs[self.keyed_value_osl_input_name_tuple[i]].path_from_id('default_value')
+            
+            # replace any old frozen fcurve
+            old_fcurve = action.fcurves.find(data_path_str)
+            if (old_fcurve != None):
+                action.fcurves.remove(old_fcurve)
+            fcurve = action.fcurves.new(data_path_str, action_group = cas_frozen_fcurve_group_name_str)
+            fcurve.extrapolation = src_fcurve.extrapolation
+            
+            fcurve.keyframe_points.add(len(src_fcurve.keyframe_points))
+            for k, src_keyframe in enumerate(src_fcurve.keyframe_points):
+                keyframe = fcurve.keyframe_points[k]
+                keyframe.co = src_keyframe.co
+                keyframe.interpolation = src_keyframe.interpolation
+                keyframe.handle_left_type = src_keyframe.handle_left_type
+                keyframe.handle_right_type = src_keyframe.handle_right_type
+                keyframe.handle_left = src_keyframe.handle_left
+                keyframe.handle_right = src_keyframe.handle_right
+                keyframe.easing = src_keyframe.easing
+            fcurve.update()
+    
+    # Freeze for Render: Copy our key frames onto our own OSL node and all our child OSL nodes. If this is called, we are a parent node.
+    def freeze_keyed_values_for_this_parent_and_child_nodes(self):
+        if (self.node_is_parent == False):
+            return
+        fcurve_dict = self.get_keyed_value_fcurve_dict()
+        if (len(fcurve_dict) == 0):
+            return
+        self.copy_keyed_value_fcurves_to_osl_node(self.id_data.nodes[self.osl_nodename_str], fcurve_dict)
+        self.carry_out_action_on_this_parents_child_nodes_b('FREEZE_KEYED_VALUES_INTO_CHILD', fcurve_dict)
+
+    # 'Drivers' mode: Add a driver that copies one of this (parent) pynode's properties to an OSL node input.
+    # The OSL node may be our own, or a child's OSL node in another material.
+    # An 'AVERAGE' driver with a single variable just copies the value - no python expression needs to be evaluated.
+    def addKeyedValueDriver(self, driven_osl_node, driven_input_name_str, prop_name_str):
+        driven_node_input = driven_osl_node.inputs[driven_input_name_str]
+        driven_node_input.driver_remove('default_value')                                           # don't stack drivers if this is called twice
+        drv = driven_node_input.driver_add('default_value')
+        drv.driver.type = 'AVERAGE'
+        
+        #source data for driver (see addMixFactorDriver)
+        srcVar = drv.driver.variables.new()
+        srcVar.name = "var"
+        srcVar.type = 'SINGLE_PROP'
+        srcVar.targets[0].id_type = 'NODETREE'
+        srcVar.targets[0].id = self.id_data                                                         # the node tree for this (parent) py node
+        srcVar.targets[0].data_path =  "nodes[\"" + self.py_nodename_str + "\"]." + prop_name_str
+    
+    # Drive all the key framable inputs of the given OSL node from this (parent) pynode
+    def add_keyed_value_drivers_to_osl_node(self, driven_osl_node):
+        for i, prop_name_str in enumerate(self.keyed_value_prop_name_tuple):
+            self.addKeyedValueDriver(driven_osl_node, self.keyed_value_osl_input_name_tuple[i], prop_name_str)
+    
+    # Remove the 'drivers' mode drivers from the given OSL node
+    def remove_keyed_value_drivers_from_osl_node(self, osl_node):
+        for input_name_str in self.keyed_value_osl_input_name_tuple:
+            osl_node.inputs[input_name_str].driver_remove('default_value')
+    
+    # Add (or remove) the 'drivers' mode drivers to our own OSL node and all our child OSL nodes.
+    # If this is called, we are a parent node.
+    def update_keyed_value_drivers_for_this_parent_and_child_nodes(self, drive_bool):
+        if (self.node_is_parent == False):
+            return
+        
+        osl_node = self.id_data.nodes[self.osl_nodename_str]
+        if (drive_bool):
+            self.add_keyed_value_drivers_to_osl_node(osl_node)
+            self.carry_out_action_on_this_parents_child_nodes_b('ADD_KEYED_VALUE_DRIVERS_TO_CHILD')
+        else:
+            self.remove_keyed_value_drivers_from_osl_node(osl_node)
+            self.carry_out_action_on_this_parents_child_nodes_b('REMOVE_KEYED_VALUE_DRIVERS_FROM_CHILD')
+            # The OSL inputs keep the last driven value. Copy over the current values now that python is doing the work again.
+            self.push_keyed_values_to_child_nodes_if_changed(force_bool = True)
+    
+    # Called after the Use Drivers button is pressed. All parent nodes are switched to/from 'drivers' mode
+    def update_keyed_value_drivers_for_all_parent_nodes(self, drive_bool):
+        for mat in bpy.data.materials:
+            if mat.use_nodes:
+                for node in mat.node_tree.nodes:
+                    if "Cutaway Shader" in node.name:
+                        if node.node_is_parent == True:
+                            node.update_keyed_value_drivers_for_this_parent_and_child_nodes(drive_bool)
+
     # Called after Manual refresh button pressed or auto refresh update button pressed
-    def manual_refresh_child_nodes_after_frame_change(self):  
+    def manual_refresh_child_nodes_after_frame_change(self):
         # iterate over all materials. For parent pynodes - copy any key framed data to the parent osl shader and child osl shaders
-        # this is the same routine as xxx - except the update of values to child nodes is forced.
+        # this is the same routine as cas_frame_change_callback_update_child_nodes_with_keyed_values - except the update of values to child nodes is forced.
         for mat in bpy.data.materials:
             if mat.use_nodes:
                 for node in mat.node_tree.nodes:
                     if "Cutaway Shader" in node.name:
                         if node.node_is_parent == True:
-                            #if (node.effectmix_float_last_frame_value != node.effectmix_float):
-                            #print("Refresh:Setting effectmix_float for: " + node.name)
-                            node.effectmix_float = node.effectmix_float           # setting the property to itself will call the update call back for this property => update this and all child node => update all OSL inputs
-                            node.rimeffectmix_float = node.rimeffectmix_float
-                            node.edge_fade_distance_float_prop = node.edge_fade_distance_float_prop  
-                            node.edge_fade_sharpness_float_prop = node.edge_fade_sharpness_float_prop
-                            
+                            node.push_keyed_values_to_child_nodes_if_changed(force_bool = True)
+        
+        # An explicit refresh: bring the hidden (stale) child nodes up to date too
+        cas_sync_stale_child_nodes(bpy.context.scene, all_bool = True)
+        
+        # The user may have changed material slots, or added or removed key frames - check if the frame change callbacks are still needed
+        cas_invalidate_scene_material_cache()
+        cas_update_keyed_value_frame_handler_registration()
+
     
     # Called when the user pressed the Center (cutawayPlane origin) button 
     def origin_reset(self):
@@ -2255,17 +4029,9 @@ class CutAwaySetupNode(Node):
             # We can't be a child node because we don't have a copy of our parent's pynode unique id
             return None
         
-        # iterate over all materials and all treenodes and all nodes until we find our parent Cutaway Shader pynode.
-        for mat in bpy.data.materials:
-            if mat.use_nodes:
-                for node in mat.node_tree.nodes:
-                    #if node.name.find("Cutaway Shader") != -1:
-                    if "Cutaway Shader" in node.name:
-                        if self.this_childs_parent_pynode_unique_id_str == self.get_unique_pynode_id_str__create_if_neccessary(node):
-                            # we have found our parent. Return its pynode reference
-                            return node
-        # Our parent pynode was not found - so return None
-        return None
+        # look up our parent Cutaway Shader pynode in the pynode registry. (None if our parent pynode was not found)
+        mat, node = cas_find_pynode_by_unique_id(self.this_childs_parent_pynode_unique_id_str)
+        return node
         
         
     
@@ -2354,7 +4120,7 @@ class CutAwaySetupNode(Node):
         #self.cutaway_image_path_and_name_str = os.path.relpath(filenameAndPath)
         self.cutaway_image_path_and_name_str = the_filepath #os.path.relpath(the_filepath)
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["cutAwayImg"].default_value = self.cutaway_image_path_and_name_str
+        cas_set_osl_input_if_changed(oslNode, "cutAwayImg", self.cutaway_image_path_and_name_str)
         self.update_child_node_rect_circular_settings()
         #print (self.cutaway_image_path_and_name_str)
 
@@ -2364,256 +4130,471 @@ class CutAwaySetupNode(Node):
     # (referenced to this parent) to all the materials used by this object. 
     # If the object has no material, then create a defualt one.
     def add_child_nodes_to_selected(self):
-        # handy constants
-        cutaway_nodes_width = 1000
-        NODE_Y_OFFSET = 185
+        for progress_tuple in self.add_child_nodes_to_objects_iter(list(bpy.context.selected_objects)):
+            pass
+    
+    # Add child nodes to the materials of the objects in obj_list, a piece at a time. 
+    # Yields (done_int, total_int) after each object is checked, and after each material has its child node added - so the work can be 
+    # spread over the timer ticks of a modal operator (see cas_start_chunked_child_job). Stopping between yields leaves every object 
+    # and material either done or untouched, and the parent's child list always matches the child nodes added so far.
+    # If this is called - we are a parent node  
+    def add_child_nodes_to_objects_iter(self, obj_list):
+        # The material slots of the objects may change (the changed objects are re-indexed as we go - see cas_reindex_object)
+        cas_invalidate_scene_material_cache()
         
         # make this a user setting
         add_defualt_mat_bool = True
         make_duplicate_copy = True
         
-        bpy.ops.object.mode_set(mode='OBJECT')
+        # Everything below is done through the data API (obj.data.materials, node_tree.nodes/links) - no operators are called,
+        # and the active and selected objects are left alone. Operator calls validate the context, push an undo step and redraw 
+        # each time they are called - which makes adding child nodes to thousands of objects take many minutes.
+        # Material edits made in edit mode are lost when edit mode is left, so we need to be in object mode (just the once).
+        if (bpy.context.object != None and bpy.context.object.mode != 'OBJECT'):
+            bpy.ops.object.mode_set(mode='OBJECT')
+        
+        parent_py_node_unique_id_str = self.assign_unique_pynode_id_str(self)                                # doubler
+        
+        # 'Share Child Materials': objects that used the same material share one child material - including the child materials
+        # made by earlier presses of the button. Objects that need a default material share one per color.
+        share_child_materials_bool = self.share_child_materials_bool_prop
+        
+        # The child material to use in place of a source material, by source material name (or default material key)
+        # When child notes are added in a particular operation (by this routine) materials will only be duplicated once. 
+        # This prevents many many copies of the same material
+        duplicated_material_name_dict = {}
+        if (share_child_materials_bool):
+            duplicated_material_name_dict = self.get_shared_child_material_dict()
+        
+        # The empty slots, and the slots whose materials don't use nodes, are cleaned out of the objects. Nothing is changed while the objects
+        # are grouped (1): the slots are only removed in the step (2 or 3) that gives the object its child material or default material - so 
+        # stopping early never leaves an object with its old (diffuse only) material removed and nothing in its place.
+        # obj.data pointer (objects can share their data) => [slot index to remove, ...] (highest first)
+        pending_slot_pop_dict = {}
+        def pop_unused_slots(obj):
+            # update_data = True keeps the faces assigned to the slots after a removed slot on the same material.
+            for matslot_index in pending_slot_pop_dict.pop(obj.data.as_pointer(), ()):
+                obj.data.materials.pop(index = matslot_index, update_data = True)
+        
+        # 1) Group the material slots of the selected objects by the material they use (and the objects with no usable 
+        #    material by the default material color), so each material only has a child node added once.
+        source_matslot_dict = {}            # source material name => [(obj, matslot_index once the unused slots are removed), ...]
+        default_mat_obj_dict = {}           # default material key => (color, [obj, ...])
+        done_int = 0
+        total_int = len(obj_list)
+        for obj in obj_list:
+            done_int += 1
+            yield (done_int, total_int)
+            
+            # we can only add child nodes to objects that support materials (e.g. not cameras etc)
+            if (obj.type not in ('MESH', 'CURVE', 'SURFACE', 'META', 'FONT')):
+                continue  
+            
+            # Check all the material slots of the object
+            # If we find usable ones - we will add the cut away shader to them
+            # If we don't find a usable one, we will create/add a default cutaway shader material.
+            new_diffuse_color = (1, 0, 1, 1)            # (R, G, B, A) = (1, 0, 1, 1) , a default crimson color to denote this is a completely new material added by the cutaway shader.
+            
+            # Find the empty slots, and the slots whose materials don't use nodes (we'll create a new node based one in their place).
+            # Work backwards so they are removed highest first - and the slot indices of the slots still to be removed don't change.
+            pop_index_list = []
+            for matslot_index in reversed(range(len(obj.material_slots))):
+                matslot = obj.material_slots[matslot_index]
+                if (matslot.material != None and matslot.material.use_nodes):
+                    continue
+                if (matslot.material != None):
+                    # if we are here, the material is defined - but does not use nodes (i.e. is just a diffuse color for cycles)
+                    # save the diffuse color
+                    new_diffuse_color = matslot.material.diffuse_color
+                pop_index_list.append(matslot_index)
+            if (len(pop_index_list) > 0):
+                pending_slot_pop_dict[obj.data.as_pointer()] = pop_index_list
+            
+            # The slots whose node tree contains a material output are the usable ones
+            found_material_output = False
+            kept_matslot_index = -1                                 # the slot index once the slots above have been removed
+            for matslot_index, matslot in enumerate(obj.material_slots):
+                if matslot_index in pop_index_list:
+                    continue
+                kept_matslot_index += 1
+                if ("Material Output" in matslot.material.node_tree.nodes):
+                    found_material_output = True
+                    if matslot.material.name not in source_matslot_dict:
+                        source_matslot_dict[matslot.material.name] = []
+                    source_matslot_dict[matslot.material.name].append((obj, kept_matslot_index))
+                
+            # If we didn't find a usable material, we will need to create a default one / add the existing default one           
+            if (found_material_output == False and add_defualt_mat_bool):
+                mat_color = (new_diffuse_color[0], new_diffuse_color[1], new_diffuse_color[2], 1)
+                if (share_child_materials_bool):
+                    default_mat_key_str = "default %.3f %.3f %.3f" % (mat_color[0], mat_color[1], mat_color[2])
+                else:
+                    default_mat_key_str = "default " + obj.name         # a default material for every object
+                if default_mat_key_str not in default_mat_obj_dict:
+                    default_mat_obj_dict[default_mat_key_str] = (mat_color, [])
+                default_mat_obj_dict[default_mat_key_str][1].append(obj)
+        
+        total_int += len(default_mat_obj_dict) + len(source_matslot_dict)
+        
+        # 2) Add a default material to the objects that have no usable materials
+        for default_mat_key_str, (mat_color, default_obj_list) in default_mat_obj_dict.items():
+            done_int += 1
+            yield (done_int, total_int)
+            
+            for obj in default_obj_list:
+                pop_unused_slots(obj)
+            
+            child_material = duplicated_material_name_dict.get(default_mat_key_str)
+            if (child_material == None):
+                # Add a copy of the child template material to the first object (it already has a child node with our settings)
+                self.add_child_template_material_to_obj(mat_color, default_obj_list[0])   # (1, 0, 1, 1) (r,g,b,a) 
+                
+                child_material = default_obj_list[0].data.materials[-1]                # the default material that was just added
+                if (share_child_materials_bool):
+                    self.mark_as_shared_child_material(child_material, default_mat_key_str)
+                default_obj_list = default_obj_list[1:]
+            # the other objects share the same material
+            for obj in default_obj_list:
+                obj.data.materials.append(child_material)
+            for obj in default_mat_obj_dict[default_mat_key_str][1]:
+                cas_reindex_object(obj)
+        
+        # 3) Add a child node to each of the (usable) source materials - then use the material with the child node in all the slots that used the source material
+        for source_mat_name_str, obj_matslot_list in source_matslot_dict.items():
+            done_int += 1
+            yield (done_int, total_int)
+            
+            for obj, matslot_index in obj_matslot_list:
+                pop_unused_slots(obj)
+            
+            child_material = duplicated_material_name_dict.get(source_mat_name_str)
+            if (child_material == None):
+                child_material = self.add_child_node_to_material(bpy.data.materials[source_mat_name_str], make_duplicate_copy)
+                if (child_material != None):
+                    # allow the new material to be referenced using the name of the old material
+                    duplicated_material_name_dict[source_mat_name_str] = child_material
+                    if (share_child_materials_bool and child_material.name != source_mat_name_str):
+                        self.mark_as_shared_child_material(child_material, source_mat_name_str)
+            
+            # (child_material is None if no child node could be added to this material - see add_child_node_to_material)
+            for obj, matslot_index in obj_matslot_list:
+                if (child_material != None):
+                    cas_set_if_changed(obj.material_slots[matslot_index], 'material', child_material)
+                cas_reindex_object(obj)
+    
+    # < Child template >
+    # Adding thousands of child nodes one at a time (nodes.new + copy_parent_settings_to_child) works everything out again for every child.
+    # Instead, each parent keeps a child template: a material (not used by any object) with a child node that already has this parent's 
+    # settings. Default child materials are copies of the template material. Child nodes added to existing materials (nodes can't be copied 
+    # between node trees) are made without the setup node output sockets, and have the template's settings copied over.
+    # The template is brought up to date when the settings it copies from us have changed since it was last used (child_template_is_up_to_date).
+    # It is removed when we are removed (see free) or become a child node (see copy), and by cas_reconcile_parent_child_links if it is left behind.
+    # Returns (template material, template child pynode).
+    # If this is called - we are a parent node  
+    def get_child_template_material(self):
+        parent_py_node_unique_id_str = self.assign_unique_pynode_id_str(self)
+        template_mat_name_str = cas_child_template_material_name_str(parent_py_node_unique_id_str)
+        
+        template_material = bpy.data.materials.get(template_mat_name_str)
+        template_child_py_node = None
+        if (template_material != None and template_material.node_tree != None):
+            for node in template_material.node_tree.nodes:
+                if (node.bl_idname == 'CutAwayShaderNodeType'):
+                    template_child_py_node = node
+                    break
+        
+        if (template_child_py_node != None):
+            if self.child_template_is_up_to_date(template_child_py_node):
+                # (child_sync_revision_int moves on when other child nodes are left stale - without changing anything here)
+                cas_set_if_changed(template_child_py_node, 'synced_parent_revision_int', self.child_sync_revision_int)
+            else:
+                self.bring_child_up_to_date(template_child_py_node)
+            return template_material, template_child_py_node
+        
+        # There is no template yet (or the user has tampered with it) - make one
+        if (template_material != None):
+            bpy.data.materials.remove(template_material)
+        template_material = bpy.data.materials.new(name = template_mat_name_str)
+        template_material['cas_child_template_parent_id_str'] = parent_py_node_unique_id_str
+        template_material.use_fake_user = True
+        template_material.use_nodes = True
+        
+        # strip all the nodes out of the new (default) nodetree except the output
+        node_tree = template_material.node_tree
+        out_node = self.clean_node_tree(node_tree)
+        
+        bsdf_diffuseGreen = node_tree.nodes.new('ShaderNodeBsdfDiffuse')                                # - the default material color
+        template_child_py_node = node_tree.nodes.new('CutAwayShaderNodeType')                           # - a the py_cutaway node  
+        osl_node = node_tree.nodes[template_child_py_node.osl_nodename_str]                            # - an OSL cutaway node
+        
+        # link up the nodes
+        node_tree.links.new(out_node.inputs[0], osl_node.outputs[0])             # Shader -> CutAwayShaderOut
+        node_tree.links.new(osl_node.inputs[0], bsdf_diffuseGreen.outputs[0])    # CutawayShaderIn ->  Bsdf_diffuseGreen             
+
+        # make the node layout all pretty
+        self.auto_align_nodes(node_tree)
+        template_child_py_node.location[0] -= 125 #125
+        
+        template_child_py_node.make_a_child_node(parent_py_node_unique_id_str)
+        self.copy_parent_settings_to_child(template_child_py_node)
+        
+        # The key framed value drivers are added to each child made from the template (see finish_child_made_from_template)
+        self.remove_keyed_value_drivers_from_osl_node(osl_node)
+        return template_material, template_child_py_node
+    
+    # Does the template child have all the settings a child node takes from us (see bring_child_up_to_date)?
+    # If this is called - we are a parent node  
+    def child_template_is_up_to_date(self, template_child_py_node):
+        for prop_name_str in ('cutAwayPlaneNameStr', 'rim_outline_hash_str', 'rectangular_circular_int', 'cutaway_image_path_and_name_str', 
+                              'effectmix_float', 'edge_fade_distance_float_prop', 'edge_fade_sharpness_float_prop', 'invert_cutaway_bounds_prop'):
+            if not cas_values_are_equal(getattr(template_child_py_node, prop_name_str), getattr(self, prop_name_str)):
+                return False
+        template_osl_node = template_child_py_node.id_data.nodes[template_child_py_node.osl_nodename_str]
+        return cas_values_are_equal(template_osl_node.inputs["OriginOffset"].default_value, self.origin_offset)
+    
+    # Add a copy of the child template material to obj, with the given default material color. Returns the new child pynode.
+    # If this is called - we are a parent node  
+    def add_child_template_material_to_obj(self, mat_color, obj):
+        template_material, template_child_py_node = self.get_child_template_material()
+        
+        material = template_material.copy()
+        material.name = "cutaway_shader_material"
+        material.use_fake_user = False
+        del material['cas_child_template_parent_id_str']
+        
+        nodes = material.node_tree.nodes
+        for node in nodes:
+            if (node.type == 'BSDF_DIFFUSE'):
+                node.inputs[0].default_value = mat_color
+        child_py_node = nodes[template_child_py_node.name]
+        self.finish_child_made_from_template(template_child_py_node, child_py_node)
+        cas_index_pynode(material, child_py_node)
+        
+        obj.data.materials.append(material)
+        return child_py_node
+    
+    # The settings a child node made by add_child_node_to_material needs from the child template 
+    # (the OSL node inputs are copied too)
+    child_template_prop_name_tuple = ('cutAwayPlaneNameStr', 'rectangular_circular_int', 'cutaway_image_path_and_name_str', 'effectmix_float', 
+                                      'edge_fade_distance_float_prop', 'edge_fade_sharpness_float_prop', 'invert_cutaway_bounds_prop', 'synced_parent_revision_int',
+                                      'rim_outline_hash_str')
+    
+    # Copy the template child's settings to a newly made child node (rather than working them out from scratch)
+    # If this is called - we are a parent node  
+    def copy_child_template_settings_to_child(self, template_child_py_node, child_py_node):
+        child_py_node.make_a_child_node(template_child_py_node.this_childs_parent_pynode_unique_id_str)
+        for prop_name_str in self.child_template_prop_name_tuple:
+            cas_set_if_changed(child_py_node, prop_name_str, getattr(template_child_py_node, prop_name_str))
+        
+        template_osl_node = template_child_py_node.id_data.nodes[template_child_py_node.osl_nodename_str]
+        child_osl_node = child_py_node.id_data.nodes[child_py_node.osl_nodename_str]
+        for input in template_osl_node.inputs:
+            if hasattr(input, "default_value"):
+                cas_set_osl_input_if_changed(child_osl_node, input.name, input.default_value)
+        
+        # the cutaway plane drivers belong to the node tree - so they can't be copied
+        if (child_py_node.cutAwayPlaneNameStr in bpy.context.scene.objects):
+            child_py_node.addDriversToCutawayShaderOslScriptNode(child_py_node.cutAwayPlaneNameStr, child_osl_node)
+    
+    # A child node copied from (or with settings copied from) the child template needs its own unique id, and must be added to our child list
+    # If this is called - we are a parent node  
+    def finish_child_made_from_template(self, template_child_py_node, child_py_node):
+        # a copied node keeps the template's unique id - unless its copy call back has already given it a new one 
+        if (self.get_unique_pynode_id_str(child_py_node) == self.get_unique_pynode_id_str(template_child_py_node)):
+            self.assign_unique_pynode_id_str(child_py_node, force_assignment_bool = True)
+        self.append_child_unique_pynode_id_to_parents_master_child_dict(child_py_node)
+        
+        # In 'drivers' mode the child's OSL node follows our key framed values through drivers
+        if (self.get_global_drive_child_nodes_with_drivers_bool_create_if_neccessary()):
+            self.add_keyed_value_drivers_to_osl_node(child_py_node.id_data.nodes[child_py_node.osl_nodename_str])
+    # < !Child template >
+    
+    # 'Share Child Materials': the child materials made by earlier calls to add_child_nodes_to_selected, that can be used again.
+    # A child material is recorded with the name of the material it was made from (or its default material key) and the unique id of its parent node.
+    # Returns a dict: source material name (or default material key) => child material
+    # If this is called - we are a parent node  
+    def get_shared_child_material_dict(self):
+        parent_py_node_unique_id_str = self.get_unique_pynode_id_str(self)
+        shared_child_material_dict = {}
+        for mat in bpy.data.materials:
+            if (mat.get('cas_child_material_parent_id_str') != parent_py_node_unique_id_str or mat.node_tree == None):
+                continue
+            # only if the material still has one of our child nodes in it
+            for node in mat.node_tree.nodes:
+                if (node.bl_idname == 'CutAwayShaderNodeType' and node.this_childs_parent_pynode_unique_id_str == parent_py_node_unique_id_str):
+                    shared_child_material_dict[mat['cas_child_material_source_str']] = mat
+                    break
+        return shared_child_material_dict
+    
+    # Record the material a child material was made from, so it can be used again by get_shared_child_material_dict
+    def mark_as_shared_child_material(self, child_material, source_mat_name_str):
+        child_material['cas_child_material_source_str'] = source_mat_name_str
+        child_material['cas_child_material_parent_id_str'] = self.get_unique_pynode_id_str(self)
+    
+    # Add a child cutaway node in front of the material output of the given material (or of a copy of the material, if make_duplicate_copy is True)
+    # Returns the material the child node was added to, or None if a child node cannot be added to the material 
+    # If this is called - we are a parent node  
+    def add_child_node_to_material(self, material, make_duplicate_copy):
+        # handy constants
+        cutaway_nodes_width = 1000
+        NODE_Y_OFFSET = 185
+        
+        # *** If we are here we can try and add a cutaway shader into this material  ***
+        node_tree = material.node_tree
+        nodes = node_tree.nodes
+        outmat_node  = nodes["Material Output"]      # there can be only one ... [outMat node]
+        surface_skt =  outmat_node.inputs["Surface"]
         
-        duplicated_material_name_dict = {}
+        # we don't (yet) deal with volume shaders 
+        volume_skt =  outmat_node.inputs["Volume"]
+        if (volume_skt.is_linked):
+            # - so look at next material if this is a volumetric materials for child nodes (parent nodes are ok - as these are added manually)
+            return None
         
-        save_active_obj = bpy.context.scene.objects.active
+        # get the socket that connects to the material output node
+        if (len(surface_skt.links) == 0):
+            return None
         
-        parent_py_node_unique_id_str = self.get_unique_pynode_id_str__create_if_neccessary(self)             # doubler
+        surface_skt_feeder_skt = surface_skt.links[0].from_socket
         
-        # Make a list of the selcted objects for us to iterate over - we don't want to modify a list we are iterating over
-        # We are going to select one object at a time after this. 
-        selected_obj_list = []
-        for obj in bpy.context.selected_objects:
-            selected_obj_list.append(obj)
-            
-        for obj in selected_obj_list:
-            obj.select = True
-            bpy.context.scene.objects.active = obj
-            
-            # we can only add child nodes to objects that support materials (e.g. not cameras etc)
-            do_not_add = True
-            if (obj.type == 'MESH' or obj.type == 'CURVE' or obj.type == 'SURFACE' or obj.type == 'META' or obj.type == 'FONT'):
-                do_not_add = False
-             
-            # if this obj is not supported - continue to the next obj 
-            if (do_not_add):
-                continue  
-            
-            #print(obj.name)
+        # we don't  add child cutaway shader nodes to cut away planes   
+        if (surface_skt_feeder_skt.node.name.find("cutAwayMix") > -1):    
+            return None
+        
+        # We don't add another a child if there is already an OSL node present.
+        if hasattr(surface_skt_feeder_skt.node, "script"): 
+            if "CutAwayShader" in surface_skt_feeder_skt.node.script.name:
+                return None
             
-            # Check all the material slots of the object
-            # If we find a usable one - we will add the cut away shader to it
-            # If we don't find a usable ine, we will create/add a default cutaway shader material.
-            index = 0
-            #found_material_output = False
-            new_diffuse_color = (1, 0, 1, 1)            # (R, G, B, A) = (1, 0, 1, 1) , a default crimson color to denote this is a completely new material added by the cutaway shader.
-            for matslot_index, matslot in enumerate(obj.material_slots):
-                found_material_output = False
-                print (matslot.material, index)
-                # Is the slot empty?
-                if (matslot.material == None):
-                    # There is a matslot - but no material assigned. clean these out - they just get in the way!
-                    obj.active_material_index = index
-                    bpy.ops.object.material_slot_remove()
-                    
-                # does that material use nodes and have the required material output node?
-                elif (matslot.material.use_nodes == False):
-                    # if we are here, the material is defined - but does not use nodes (i.e. is just a diffuse color for cycles)
-                    # delete the material -- we'll create a new node based one in its place.
-                    # save the diffuse color
-                    new_diffuse_color = matslot.material.diffuse_color
-                    
-                    # erase the slot
-                    obj.active_material_index = index
-                    bpy.ops.object.material_slot_remove()
-                else:  
-                     # if we are here, the material is defined and uses nodes.                                                     #if(matslot.material.use_nodes):
-                    nodes = matslot.material.node_tree.nodes
-                    # does the node tree contain a material output?
-                    if ("Material Output" in nodes.keys()):
-                        # We've found a usable material (we won't need to create/add one).
-                        # Set the flag that will prevent a new material from being added
-                        found_material_output = True
-                        # (section move note below XXXX)
-                
-                # let's look at the next slot in the material        
-                index += 1
+        # If we are already a parent in this node tree- don't automatically add a child to the node tree too.
+        if (node_tree == self.id_data):
+            return None
+        
+        # ***** If we are here this material is about to have a child cut away node added ****
+        # If the user has selected 'make_duplicate_copy' - then we want to make a copy of the material before adding the cut away shader in
+        # A duplicate can be useful when a material is shared by many objects (the extreme case is when there is just one material!)
+        # but the user only wants to have a cutaway shader only affect selected objects.
+        if (make_duplicate_copy):
+            material = material.copy()
             
+            node_tree = material.node_tree
+            outmat_node  = node_tree.nodes["Material Output"]      # there can be only one ... [outMat node]
+            surface_skt =  outmat_node.inputs["Surface"]
+            surface_skt_feeder_skt = surface_skt.links[0].from_socket
+
+        # calculate the gap width between the output material node and its feeder node 
+        #(this is currently ignoring and volume or displacement nodes that may be connected
+        gap = abs(surface_skt_feeder_skt.node.location.x - outmat_node.location.x)
+        required_gap_filler = cutaway_nodes_width - gap
+        if required_gap_filler < 0:
+            required_gap_filler = 0
             
-                create_new_mat = False        
-                numslots = len(obj.material_slots.items()) 
-                
-                # Did we find a usable material to add the cutaway shader to?    
-                if (numslots == 0 or  found_material_output == False or matslot.material == None):
-                    # No we didn't, so we will have to create one
-                    create_new_mat = True
-                 
-                # If we didn't find a usable material, we will need to create a default one / add the existing default one           
-                if (create_new_mat and add_defualt_mat_bool):
-                    # This obj has no materials.  Add a default material to this new child object.
-                    child_py_node = self.add_default_child_material_to_obj((new_diffuse_color[0], new_diffuse_color[1],new_diffuse_color[2],1), inner_mesh_bool = False)   # (1, 0, 1, 1) (r,g,b,a) 
-                    
-                    self.append_child_unique_pynode_id_to_parents_master_child_dict(child_py_node)            #doubler  see ****** above for #doubleo
-                    thestr = child_py_node.make_a_child_node(parent_py_node_unique_id_str)                    #DOUBLErx
-                    self.copy_parent_settings_to_child(child_py_node)
-                    
-                    # continue to the next obj that needs a child node added
-                    continue
-                
-                 
-                # *** If we are here we can try and add a cutaway shader into this material slot  ***
-                # <=== Should this section be put above (see XXXX)
-                node_tree = matslot.material.node_tree
-                outmat_node  = nodes["Material Output"]      # there can be only one ... [outMat node]
-                surface_skt =  outmat_node.inputs["Surface"]
-                
-                # we don't (yet) deal with volume shaders 
-                volume_skt =  outmat_node.inputs["Volume"]
-                if (volume_skt.is_linked):
-                    # - so look at next material if this is a volumetric materials for child nodes (parent nodes are ok - as these are added manually)
-                    continue
-                # <==== Section move end?
-                
-                # get the socket that connects to the material output node
-                if (len(surface_skt.links) == 0):
-                    continue
-                
-                surface_skt_feeder_skt = surface_skt.links[0].from_socket
-                
-                # we don't  add child cutaway shader nodes to cut away planes   
-                if (surface_skt_feeder_skt.node.name.find("cutAwayMix") > -1):    
-                    continue
+        # move the Material Output node to the right to make way for the cut away shader
+        outmat_node.location.x +=  required_gap_filler
+        
+        # add in a new cut away shader py and osl node (without the setup node output sockets - see cas_fast_child_init_state_dict)
+        template_material, template_child_py_node = self.get_child_template_material()
+        cas_fast_child_init_state_dict['depth'] += 1
+        try:
+            child_py_node = node_tree.nodes.new('CutAwayShaderNodeType')       
+        finally:
+            cas_fast_child_init_state_dict['depth'] -= 1
+        child_osl_node_name =  child_py_node.osl_nodename_str             
+        child_osl_node = node_tree.nodes[child_osl_node_name]       
+        
+        # line up the nodes so they're all pretty
+        child_py_node.location = outmat_node.location
+        child_py_node.location.x -= cutaway_nodes_width
+        child_py_node.location.y -=NODE_Y_OFFSET
+        
+        child_osl_node.location = outmat_node.location
+        child_osl_node.location.x -= cutaway_nodes_width /2
+        
+        node_tree.links.new(surface_skt, child_osl_node.outputs[0])                                 # Shader -> CutAwayShaderOut
+        node_tree.links.new(child_osl_node.inputs[0], surface_skt_feeder_skt)                       # CutawayShaderIn ->  Bsdf_diffuseGreen             
+        
+        # let the new  py node know that it is a child node, who its parent is, and copy the (already worked out) settings over from the child template
+        self.copy_child_template_settings_to_child(template_child_py_node, child_py_node)
+        self.finish_child_made_from_template(template_child_py_node, child_py_node)
+        cas_index_pynode(material, child_py_node)
+        
+        return material
                 
-                # We don't add another a child if there is already an OSL node present.
-                if hasattr(surface_skt_feeder_skt.node, "script"): 
-                    #if (surface_skt_feeder_skt.node.script.name.find("CutAwayShader") > -1):  
-                    if "CutAwayShader" in surface_skt_feeder_skt.node.script.name:
-                        continue
-                    
-                #print("got through")
-                    
-                # Iterate over the node tree. If we are already a parent in this node tree- don't automatically add a child to the node tree too.
-                dont_add_child = False
-                for a_node in nodes:
-                    #print(a_node)
-                    if  (a_node == self): 
-                        # If we are here, then this node tree already contains 'us' as a parent.
-                        # We don't want to automatically add a child node to ourselves.
-                        dont_add_child = True
+    # The remove child nodes from_selected objects button (cas_btn.remove_child_nodes_from_selected) has been pressed and this function called.           
+    def remove_child_nodes_from_selected(self):
+        self.remove_child_nodes_from_selected_objects()
+        
+    # Remove this parent's child nodes from the materials of the selected objects.
+    # Starts from the selected objects (rather than from each child node, looking for the objects that use it), 
+    # so the cost depends on the size of the selection - not the size of the scene.
+    # The parent's child list is updated once at the end. Returns the number of child nodes removed.
+    # If this is called, we are a parent node.
+    def remove_child_nodes_from_selected_objects(self):
+        removed_child_id_str_set = set()
+        for progress_tuple in self.remove_child_nodes_from_objects_iter(list(bpy.context.selected_objects), removed_child_id_str_set):
+            pass
+        return len(removed_child_id_str_set)
+    
+    # Remove this parent's child nodes from the materials of the objects in obj_list, a piece at a time. 
+    # Yields (done_int, total_int) after each object (see add_child_nodes_to_objects_iter). The ids of the removed child nodes are added
+    # to removed_child_id_str_set. The parent's child list is updated when the iteration ends - or is stopped early (close()).
+    # If this is called, we are a parent node.
+    def remove_child_nodes_from_objects_iter(self, obj_list, removed_child_id_str_set):
+        if (self.node_is_parent == False):
+            return
+        
+        try:
+            parent_unique_pynode_id_str = self.get_unique_pynode_id_str(self)
+            visited_mat_name_set = set()                                        # many objects may share a material
+            for done_int, obj in enumerate(obj_list, 1):
+                yield (done_int, len(obj_list))
+                for matslot in obj.material_slots:
+                    mat = matslot.material
+                    if (mat == None or mat.name in visited_mat_name_set):
                         continue
-                    
-                    # We don't want to add a child shader to the material if there is already a child shader with the same parent
-                    #if  'Cutaway Shader' in a_node.name and a_node.parent_node_name_str == self.py_nodename_str:
-                    #    print('BLOCKED')
-                    #    dont_add_child = True
-                    #    continue
-                        
-                if (dont_add_child):
-                    # We don't want to automatically add a child node to ourselves or to materials that already have a child shader with this parent
-                    # continue the for loop that iterates through object matslots, and objects in the scene.
-                    continue
-                
-                # ***** If we are here this object is about to have a child cut away node added ****
-                # If the user has selected 'make_duplicate_copy' - then we want to make a copy of this objects material slots and materials before adding the cut away shader in
-                # A duplicate can be useful when a material is shared by many objects (the extreme case is when there is just one material!)
-                # but the user only wants to have a cutaway shader only affect selected objects.
-                # Note: When child notes are added in a particular operation (by this routine) materials will only be duplicated once. 
-                # This prevents many many copies of the same material
-                
-                # Does the user want us to make new material copies when child cutaway shaders are added
-                #s=""
-                #for k in duplicated_material_name_dict.keys(): s += k + ", "
-                #print("duplicate enter", matslot.material.name, s)
-                
-                material_already_duplicated = matslot.material.name in duplicated_material_name_dict.keys()
-                
-                # Does the user want us to make new material copies when child cutaway shaders are added
-                # make_duplicate_copy is hardwired to true for the moment 
-                if (make_duplicate_copy):
-                    # Yes they do.
-                    # Has this material already been duplicated in call to add_child_nodes(...)
-                    if (material_already_duplicated == False):
-                        # no, so duplicate the materail
-                        old_name = matslot.material.name +""
-                        # Before making a copy of the material - prevent individual pynodes from triggering their node copy 
-                        new_mat = matslot.material.copy()
-                        # DSW: xxx don't append a new fancy name str
-                        #new_mat.name = matslot.material.name  + ".cutshdr" #"_cutshdr"         # blender will ensure that a unique id is appended to the name
-                        obj.material_slots[matslot_index].material = new_mat
-                        # allow the new material to be referenced using the name of the old material
-                        duplicated_material_name_dict[old_name] = new_mat
-                    else:
-                        #yes, get a reference to the recently duplicated material
-                        new_mat = duplicated_material_name_dict[matslot.material.name]
-                        obj.material_slots[matslot_index].material = new_mat
-                        
-                        # There is no need to create a new cutaway shader - we just re-used one that was created earlier
-                        # so continue to the next object
-                        # DSW check - does a driver have to be added to the effect mix?
+                    visited_mat_name_set.add(mat.name)
+                    if (not mat.use_nodes or mat.library != None):
                         continue
                     
-                    
-                    node_tree = new_mat.node_tree
-                    outmat_node  = node_tree.nodes["Material Output"]      # there can be only one ... [outMat node]
-                    surface_skt =  outmat_node.inputs["Surface"]
-                    surface_skt_feeder_skt = surface_skt.links[0].from_socket
-
-                # calculate the gap width between the output material node and its feeder node 
-                #(this is currently ignoring and volume or displacement nodes that may be connected
-                gap = abs(surface_skt_feeder_skt.node.location.x - outmat_node.location.x)
-                required_gap_filler = cutaway_nodes_width - gap
-                if required_gap_filler < 0:
-                    required_gap_filler = 0
-                    
-                # move the Material Output node to the right to make way for the cut away shader
-                outmat_node.location.x +=  required_gap_filler
-                
-                # add in a new cut away shader py and osl node.
-                child_py_node = node_tree.nodes.new('CutAwayShaderNodeType')       
-                child_osl_node_name =  child_py_node.osl_nodename_str             
-                child_osl_node = node_tree.nodes[child_osl_node_name]       
-                
-                # line up the nodes so they're all pretty
-                child_py_node.location = outmat_node.location
-                child_py_node.location.x -= cutaway_nodes_width
-                child_py_node.location.y -=NODE_Y_OFFSET
-                
-                child_osl_node.location = outmat_node.location
-                child_osl_node.location.x -= cutaway_nodes_width /2
-                
-                node_tree.links.new(surface_skt, child_osl_node.outputs[0])                                 # Shader -> CutAwayShaderOut
-                node_tree.links.new(child_osl_node.inputs[0], surface_skt_feeder_skt)                       # CutawayShaderIn ->  Bsdf_diffuseGreen             
-                
-                # let the new  py node know that it is a child node, and let it know who its parent material and object is.
-                # todo: looks like there is redundancy in the lines below. see if mat_name_str and py name str is over done.
-                self.append_child_unique_pynode_id_to_parents_master_child_dict(child_py_node)              #doubler  see zzzzz above for #doubleo
-                child_py_node.make_a_child_node(parent_py_node_unique_id_str)                               #doublerx
-                self.copy_parent_settings_to_child(child_py_node)
-                
-                # This allows key frames added to the parent node's mixEffectFactor to be applied to
-                # all child nodes. Blenders driver system will handle the task of keeping track of
-                # the child nodes. Note - many methods were tried to get key frames from the parent mixEffectFactor
-                # to copy over to the child nodes (along with several other properties). These would work when 
-                # properties were chnged directly by the user (using the node sliders) but did not work when
-                # the property was key framed!
-                # This technique could also be applied to other properties that need to be copied to child nodes.
-                # This could be alot faster than the current method of iterating over each material (until be find the child nodes)
-                # DSW: Put in 'todo' list 
-                #self.addMixFactorDriver(child_py_node.osl_nodename_str)
-                
-                    
-                    
-                    
-        # restore selection and active obj
-        bpy.ops.object.select_all(action='DESELECT')
-        for obj in selected_obj_list:
-            obj.select = True
-           
-        bpy.context.scene.objects.active = save_active_obj
+                    child_py_node_list = [node for node in mat.node_tree.nodes if "Cutaway Shader" in node.name and node.node_is_parent == False
+                                            and node.this_childs_parent_pynode_unique_id_str == parent_unique_pynode_id_str]
+                    for child_py_node in child_py_node_list:
+                        removed_child_id_str_set.add(self.get_unique_pynode_id_str(child_py_node))
+                        self.remove_child_pynode_and_osl_node(mat, child_py_node)
+        finally:
+            # update the child list once: the removed ids are found by name (by Blender), and removed last first so the other indices stay put
+            if (len(removed_child_id_str_set) > 0):
+                self.migrate_child_id_props_to_collection()
+                child_id_collection = self.child_unique_id_collection
+                removed_index_list = [child_id_collection.find(child_id_str) for child_id_str in removed_child_id_str_set]
+                for index_int in sorted(removed_index_list, reverse = True):
+                    if (index_int > -1):
+                        child_id_collection.remove(index_int)
+    
+    # Remove a child pynode and its OSL node from the material. The shaders each side of the OSL node are linked back together.
+    def remove_child_pynode_and_osl_node(self, mat, child_py_node):
+        nodes = mat.node_tree.nodes
+        if child_py_node.osl_nodename_str in nodes:
+            osl_node = nodes[child_py_node.osl_nodename_str]
+            
+            # get the OSL input feeder socket, and the OSL output fed socket
+            osl_shaderin_skt = osl_node.inputs["ShaderIn"]
+            osl_shaderout_skt = osl_node.outputs["CutAwayShaderOut"]
+            if (len(osl_shaderin_skt.links) > 0 and len(osl_shaderout_skt.links) > 0):
+                osl_shaderin_skt_feeder_skt = osl_shaderin_skt.links[0].from_socket     # src: the feeder socker
+                osl_shaderout_skt_fed_skt = osl_shaderout_skt.links[0].to_socket        # dest: the fed socket
                 
-    # The remove child nodes from_selected objects button (cas_btn.remove_child_nodes_from_selected) has been pressed and this function called.           
-    def remove_child_nodes_from_selected(self):
-        self.carry_out_action_on_this_parents_child_nodes_b(action_str = 'REMOVE_CHILD_NODES')
+                # Before the OSL node is removed - re link the shaders each side of it
+                mat.node_tree.links.new(osl_shaderout_skt_fed_skt, osl_shaderin_skt_feeder_skt)
+            nodes.remove(osl_node)
+        
+        # A Hack to get the shaded object to re-draw (this will prevent the deleted cut away shader from 'hanging around')        
+        mat.use_nodes = False      # I assume this triggers the dependancy graph to force a 3D rendered scene re-draw.
+        mat.use_nodes = True
+        
+        # remove the cutaway child_py_node
+        cas_unindex_pynode(mat, child_py_node)
+        nodes.remove(child_py_node)
       
 
     # A simple name 'override' of the function carry_out_action_on_this_parents_child_nodes_b(...).
@@ -2641,6 +4622,38 @@ class CutAwaySetupNode(Node):
     # - An optional child_object_override_list (string) list can be provided to this routine. 
     #   This allows an arbitrary set of objects in the scene (containing cutaway shaders) 
     #   doubler
+    # Child update transactions: Between begin_child_update_transaction() and end_child_update_transaction(), the 'batchable' 
+    # actions passed to carry_out_action_on_this_parents_child_nodes_b are collected instead of being carried out. 
+    # When the (outermost) transaction ends they are all carried out in a single pass over the child nodes.
+    # e.g. a frame change that changes the effect mix, edge fade distance and sharpness walks the child nodes once (instead of three times).
+    # Always end the transaction (use try: ... finally:). If this is called, we are a parent node.
+    # Parents without a unique id (yet) don't batch - their transactions would be mixed up with those of every other such parent.
+    batchable_child_action_str_tuple = ('COPY_MIX_FACTOR_TO_CHILD', 'COPY_FADEDIST_AND_SHARPNESS_TO_CHILD', 'COPY_INVERT_CUTAWAY_BOUNDS_TO_CHILD',
+                                        'COPY_RECT_CIRCULAR_SETTINGS_TO_CHILD', 'COPY_NEW_ORIGIN_TO_CHILD', 'COPY_NEW_CUTAWAY_PLANE_SETTINGS_TO_CHILD',
+                                        'COPY_PARENT_SETTINGS_TO_CHILD')
+    
+    def begin_child_update_transaction(self):
+        unique_pynode_id_str = self.get_unique_pynode_id_str(self)
+        if (unique_pynode_id_str == '0'):
+            return
+        if unique_pynode_id_str not in cas_child_update_transaction_dict:
+            cas_child_update_transaction_dict[unique_pynode_id_str] = {'depth': 0, 'action_tuple_list': []}
+        cas_child_update_transaction_dict[unique_pynode_id_str]['depth'] += 1
+        
+    def end_child_update_transaction(self):
+        unique_pynode_id_str = self.get_unique_pynode_id_str(self)
+        if (unique_pynode_id_str == '0'):
+            return
+        transaction_dict = cas_child_update_transaction_dict.get(unique_pynode_id_str)
+        if (transaction_dict == None):
+            return
+        transaction_dict['depth'] -= 1
+        if (transaction_dict['depth'] > 0):
+            return                                                                  # an outer transaction is still collecting actions
+        del cas_child_update_transaction_dict[unique_pynode_id_str]
+        if (len(transaction_dict['action_tuple_list']) > 0):
+            self.carry_out_actions_on_this_parents_child_nodes(transaction_dict['action_tuple_list'])
+    
     def carry_out_action_on_this_parents_child_nodes_b(self, 
                                                      action_str = '', 
                                                      param1 = None,                             # optional parameter to feed to action. (action specific)
@@ -2652,47 +4665,98 @@ class CutAwaySetupNode(Node):
         if (self.node_is_parent == False):
             return return_bool
         
-        clean_child_node_keys_that_no_longer_exist_list = []
-        
-        # iterate through all the child keys of this parent node
-        for key_str in self.keys():                                         # FOR LOOP 1
-            # not all keys belong to the 'parent's node unique id' (pnuid)
-            # so check that pnuid is in the key name
-            if key_str.find("pnuid") > -1:
-                # extract the child node unique id str from the dict
-                child_pynode_unique_id_str = self[key_str]
-                # iterate through all materials and nodes to find the child node we're after
-                found_child = False
-                for mat in bpy.data.materials:                              # FOR LOOP 2  
-                    if mat.use_nodes:
-                        for child_py_node in mat.node_tree.nodes:           # FOR LOOP 3  
-                            #if child_py_node.name.find("Cutaway Shader") != -1:
-                            if "Cutaway Shader" in child_py_node.name:
-                                if child_pynode_unique_id_str == self.get_unique_pynode_id_str__create_if_neccessary(child_py_node):
-                                    # child_py_node is actually a child py node
-                                    found_child = True
-                                    osl_node = mat.node_tree.nodes[child_py_node.osl_nodename_str]
-                                    # no need to keep iterating through the mat.node_tree.nodes:
-                                    break                                   # Exit FOR LOOP 3 - no need to look through more nodes
-                        if found_child == True:
-                            break                                           # Exit FOR LOOP 2 - no need to look through more materials
-                             
-                                    
-                # did we find the child node in any of the materials?        
-                if found_child == False:
-                    # no we didn't. 
-                    # The child pynode no longer exists (the user may have deleted the node of the material) - so 
-                    # remove the key from this parent node's record of child nodes at the end of this operation.
-                    # (we can't remove it now because we're iterating over the keys) 
-                    #print("appending to erase list", key_str)
-                    clean_child_node_keys_that_no_longer_exist_list.append(key_str)
-
-                    # continue to the next child node id in the key set
-                    continue                                                # continue with  FOR LOOP 1 id child node not found
-
-                # If we are here we have found a reference to the child pynode that matches child_pynode_unique_id_str
-                # now it's time to carry out the action given by action_str
-                 
+        # In a child update transaction: the action is done (along with the other actions in the transaction) when the transaction ends
+        if (action_str in self.batchable_child_action_str_tuple and self.get_unique_pynode_id_str(self) != '0'):
+            transaction_dict = cas_child_update_transaction_dict.get(self.get_unique_pynode_id_str(self))
+            if (transaction_dict != None):
+                # only the latest params are needed if the same action is queued again
+                for i, action_tuple in enumerate(transaction_dict['action_tuple_list']):
+                    if (action_tuple[0] == action_str):
+                        transaction_dict['action_tuple_list'][i] = (action_str, param1, param2)
+                        return return_bool
+                transaction_dict['action_tuple_list'].append((action_str, param1, param2))
+                return return_bool
+        
+        return self.carry_out_actions_on_this_parents_child_nodes([(action_str, param1, param2)], child_object_override_list, allowed_to_clean)
+    
+    # Carry out a list of (action_str, param1, param2) actions on each of this parent's child nodes. 
+    # Each child node is looked up once, and all the actions are done on it before moving on to the next child node.
+    def carry_out_actions_on_this_parents_child_nodes(self, action_tuple_list, child_object_override_list = None, allowed_to_clean = True):
+        return_bool = False
+        # don't do if we are a child node 
+        if (self.node_is_parent == False):
+            return return_bool
+        
+        clean_child_node_ids_that_no_longer_exist_list = []
+        
+        # Lazy child sync: settings are only copied to the relevant (visible) child nodes. The others are marked as stale.
+        # child_sync_revision_int is only moved on when a child node that is up to date is about to miss this update (so is left stale). 
+        # Once the hidden child nodes are stale, pushing key framed values (every frame) writes no revision stamps at all.
+        sync_action_bool = True
+        for action_tuple in action_tuple_list:
+            if action_tuple[0] not in self.batchable_child_action_str_tuple:
+                sync_action_bool = False
+        if (sync_action_bool):
+            old_revision_int = self.child_sync_revision_int
+            synced_child_py_node_list = []                                  # the child nodes stamped with child_sync_revision_int so far
+            relevant_mat_name_set = None
+            if not cas_lazy_child_sync_is_off():
+                relevant_mat_name_set = cas_get_relevant_material_name_set(bpy.context.scene)
+            parent_unique_pynode_id_str = self.get_unique_pynode_id_str(self)
+        
+        # Only allow one registry rebuild for all the look ups below (deleted child nodes would otherwise cause a rebuild each)
+        registry_rebuild_count_int = cas_pynode_registry_dict['rebuild_count']
+        
+        # CLEAN_CHILD_LIST stops the child walk at the first child node found (the ids of the missing child nodes before it are cleaned)
+        end_child_walk_bool = False
+        
+        # iterate through all the child ids of this parent node
+        for child_pynode_unique_id_str in self.get_child_unique_id_str_list():      # FOR LOOP 1
+            if end_child_walk_bool:
+                break
+            # look up the child node we're after in the pynode registry
+            mat, child_py_node = cas_find_pynode_by_unique_id(child_pynode_unique_id_str, 
+                                    allow_rebuild_bool = registry_rebuild_count_int == cas_pynode_registry_dict['rebuild_count'])
+            found_child = child_py_node != None
+            if found_child == True:
+                osl_node = mat.node_tree.nodes[child_py_node.osl_nodename_str]
+                
+                                
+            # did we find the child node in any of the materials?        
+            if found_child == False:
+                # no we didn't. 
+                # The child pynode no longer exists (the user may have deleted the node of the material) - so 
+                # remove the id from this parent node's record of child nodes at the end of this operation.
+                #print("appending to erase list", child_pynode_unique_id_str)
+                clean_child_node_ids_that_no_longer_exist_list.append(child_pynode_unique_id_str)
+
+                # continue to the next child node id in the key set
+                continue                                                # continue with  FOR LOOP 1 id child node not found
+
+            # If we are here we have found a reference to the child pynode that matches child_pynode_unique_id_str
+            # now it's time to carry out the action given by action_str
+            
+            # Lazy child sync: skip child nodes that are not visible (mark them as stale). 
+            # Child nodes that were already stale get all the parent settings - not just the ones in action_tuple_list.
+            if (sync_action_bool):
+                if (relevant_mat_name_set != None and mat.name not in relevant_mat_name_set):
+                    if (child_py_node.synced_parent_revision_int == self.child_sync_revision_int):
+                        # up to date until now: move the revision on (re-stamping the child nodes already synced in this pass)
+                        self.child_sync_revision_int += 1
+                        for synced_child_py_node in synced_child_py_node_list:
+                            cas_set_if_changed(synced_child_py_node, 'synced_parent_revision_int', self.child_sync_revision_int)
+                    cas_stale_child_dict[child_pynode_unique_id_str] = parent_unique_pynode_id_str
+                    continue                                            # continue with  FOR LOOP 1
+                synced_child_py_node_list.append(child_py_node)
+                if (child_py_node.synced_parent_revision_int != old_revision_int):
+                    self.bring_child_up_to_date(child_py_node)
+                    continue                                            # continue with  FOR LOOP 1
+                cas_set_if_changed(child_py_node, 'synced_parent_revision_int', self.child_sync_revision_int)
+                cas_stale_child_dict.pop(child_pynode_unique_id_str, None)
+             
+            # Carry out the action(s) on this child node. 
+            # (more than one action if this is a batch of actions from a child update transaction - see begin_child_update_transaction)
+            for action_str, param1, param2 in action_tuple_list:                    # FOR LOOP 1b
                 # Carry out child_node_action
                 # *********************************************
                 # SELECT_CHILD_OBJS
@@ -2701,8 +4765,8 @@ class CutAwaySetupNode(Node):
                 if (action_str == 'SELECT_CHILD_OBJS'):   
                     self.select_all_objects_using_this_unique_pynode_id(child_pynode_unique_id_str, False)
                     # continue looking through the keys of this parent node for more child node id str keys 
-                    continue                                                # continue with  FOR LOOP 1
-                
+                    continue                                            # continue with  FOR LOOP 1b (the next action)
+            
                 # *********************************************
                 # REMOVE_CHILD_NODES
                 # Done1
@@ -2714,52 +4778,31 @@ class CutAwaySetupNode(Node):
                     for obj in obj_list:
                         if (obj.select):
                             # remove the reference to the child pynode from this parent
-                            #key_name = 'pnuid'+child_pynode_unique_id_str
-                            #if key_name not in parent_node.keys():
-                            #del self["pnuid"+child_pynode_unique_id_str]
-                            # check if below is correct - should it be more similar to the above?
-                            if  child_pynode_unique_id_str in self:                                 # doubler
-                                del self["pnuid"+child_pynode_unique_id_str]
-
-                            # get the OSL input feeder socket
-                            osl_shaderin_skt = osl_node.inputs["ShaderIn"]
-                            osl_shaderin_skt_feeder_skt = osl_shaderin_skt.links[0].from_socket     # src: the feeder socker
-
-                            # get the OSL output fed socket
-                            osl_shaderout_skt = osl_node.outputs["CutAwayShaderOut"]
-                            osl_shaderout_skt_fed_skt = osl_shaderout_skt.links[0].to_socket        # dest: the fed socket
-                            
-                            # Before the OSL node is removed - re link the shaders each side of it
-                            mat.node_tree.links.new(osl_shaderout_skt_fed_skt, osl_shaderin_skt_feeder_skt)
-                            
-                            # A Hack to get the shaded object to re-draw (this will prevent the deleted cut away shader from 'hanging around')        
-                            matslot_list[i].material.use_nodes = False      # I assume this triggers the dependancy graph to force a 3D rendered scene re-draw.
-                            matslot_list[i].material.use_nodes = True
-                          
-                            # remove the cutaway child_py_node and osl_node
-                            nodes = osl_node.id_data.nodes
-                            nodes.remove(osl_node)
-                            nodes.remove(child_py_node)
-                            
+                            self.remove_child_unique_id_str(child_pynode_unique_id_str)
+
+                            # re link the shaders each side of the OSL node, and remove the cutaway child_py_node and osl_node
+                            self.remove_child_pynode_and_osl_node(mat, child_py_node)
+                        
                             # now tidy up
                             # cutaway_nodes_width = 100
                             # outmat_node.location.x -=  cutaway_nodes_width
-                            
+                        
                             # We can break out of the obj in obj_list loop because even though many objects may have been selected, this pynode is
                             # only in one material. Once the pynode and osl node have been removed from the material, there is no need to remove them
                             # again for other objects (since they already have been removed)
                             break
                         i += 1
-                            
-                
+                        
+            
                 # *********************************************
                 # CLEAN_CHILD_LIST   
                 # Done1 
                 # A Does not need child_py_node, or osl_node
                 elif (action_str == 'CLEAN_CHILD_LIST'):
                     # All cleaning is done automatically. No further action
+                    end_child_walk_bool = True
                     break
-                
+            
                 # *********************************************
                 # COPY_PARENT_SETTINGS_TO_CHILD
                 # Done1
@@ -2769,7 +4812,7 @@ class CutAwaySetupNode(Node):
                     #if (matslot.material not in material_covered_list):
                     #    material_covered_list.append(matslot.material)
                     self.copy_parent_settings_to_child(child_py_node)
-                 
+             
                 # *********************************************
                 # COPY_NEW_CUTAWAY_PLANE_SETTINGS_TO_CHILD   
                 # param1 = new cut away plane name str
@@ -2777,30 +4820,30 @@ class CutAwaySetupNode(Node):
                 # Done1
                 # B Needs child_py_node, or osl_node     
                 elif (action_str == 'COPY_NEW_CUTAWAY_PLANE_SETTINGS_TO_CHILD'):
-                    child_py_node.set_child_cutaway_plane(param1, param2)
-                 
+                    child_py_node.set_child_cutaway_plane(param1, param2, self.rim_outline_hash_str)
+             
                 # *********************************************
                 # COPY_RECT_CIRCULAR_SETTINGS_TO_CHILD 
                 # Done1
                 # B Needs child_py_node, or osl_node      
                 elif (action_str == 'COPY_RECT_CIRCULAR_SETTINGS_TO_CHILD'):
                     child_py_node.set_child_rect_circular_settings(self.rectangular_circular_int, self.cutaway_image_path_and_name_str)
-                    
                 
+            
                 # *********************************************
                 # COPY_INVERT_CUTAWAY_BOUNDS_TO_CHILD 
                 # Done1
                 # B Needs child_py_node, or osl_node  
                 elif (action_str == 'COPY_INVERT_CUTAWAY_BOUNDS_TO_CHILD'):
                     child_py_node.copy_invert_cutaway_bounds_to_child(self.invert_cutaway_bounds_prop)
-                    
+                
                 # *********************************************
                 # COPY_FADEDIST_AND_SHARPNESS_TO_CHILD
                 # Done1
                 # B Needs child_py_node, or osl_node  
                 elif (action_str == 'COPY_FADEDIST_AND_SHARPNESS_TO_CHILD'):
                     child_py_node.copy_fadedist_and_sharpness_to_child(self.edge_fade_distance_float_prop, self.edge_fade_sharpness_float_prop)
-                    
+                
                 # *********************************************
                 # COPY_NEW_ORIGIN_TO_CHILD 
                 # Done1
@@ -2808,17 +4851,36 @@ class CutAwaySetupNode(Node):
                 elif (action_str == 'COPY_NEW_ORIGIN_TO_CHILD'):
                     # This is a child obj- so copy our data over
                     osl_node = child_py_node.id_data.nodes[child_py_node.osl_nodename_str]
-                    
+                
                     # param1 equals the  origin_offset_vec
-                    osl_node.inputs["OriginOffset"].default_value = param1 
-                    
+                    cas_set_osl_input_if_changed(osl_node, "OriginOffset", param1) 
+                
                 # *********************************************
                 # COPY_MIX_FACTOR_TO_CHILD  
                 # Done1
                 # B Needs child_py_node, or osl_node       
                 elif (action_str == 'COPY_MIX_FACTOR_TO_CHILD'):
                     child_py_node.set_cutaway_mix_float(self.effectmix_float)
-                    
+                
+                # *********************************************
+                # FREEZE_KEYED_VALUES_INTO_CHILD
+                # B Needs child_py_node, or osl_node
+                # param1 = {property name : parent fcurve}
+                elif (action_str == 'FREEZE_KEYED_VALUES_INTO_CHILD'):
+                    self.copy_keyed_value_fcurves_to_osl_node(osl_node, param1)
+                
+                # *********************************************
+                # ADD_KEYED_VALUE_DRIVERS_TO_CHILD
+                # B Needs child_py_node, or osl_node
+                elif (action_str == 'ADD_KEYED_VALUE_DRIVERS_TO_CHILD'):
+                    self.add_keyed_value_drivers_to_osl_node(osl_node)
+                
+                # *********************************************
+                # REMOVE_KEYED_VALUE_DRIVERS_FROM_CHILD
+                # B Needs child_py_node, or osl_node
+                elif (action_str == 'REMOVE_KEYED_VALUE_DRIVERS_FROM_CHILD'):
+                    self.remove_keyed_value_drivers_from_osl_node(osl_node)
+                
                 # *********************************************
                 # CHECK_IF_VALID_CHILD_NODE_EXITS 
                 # Done1
@@ -2826,14 +4888,13 @@ class CutAwaySetupNode(Node):
                 elif (action_str == 'CHECK_IF_VALID_CHILD_NODE_EXITS'):
                     # This is a child - so return true (no need to carry out further checking)
                     return True
-                                       
-        # Clean out any object names form the child list if the objects couldn't be found                                
-        if  ((len(clean_child_node_keys_that_no_longer_exist_list) > 0) and allowed_to_clean):
-            for child_pynode_key_str_to_remove_from_this_parent in clean_child_node_keys_that_no_longer_exist_list:
-                # remove the key that had no corresponding child pynode
-                if child_pynode_key_str_to_remove_from_this_parent in self:
-                    #print("removing", child_pynode_key_str_to_remove_from_this_parent)
-                    del self[child_pynode_key_str_to_remove_from_this_parent]
+                                   
+        # Clean out any child ids from the child list if the child pynodes couldn't be found                                
+        if  ((len(clean_child_node_ids_that_no_longer_exist_list) > 0) and allowed_to_clean):
+            for child_pynode_unique_id_str in clean_child_node_ids_that_no_longer_exist_list:
+                # remove the id that had no corresponding child pynode
+                #print("removing", child_pynode_unique_id_str)
+                self.remove_child_unique_id_str(child_pynode_unique_id_str)
             
         return return_bool                            
     
@@ -2854,7 +4915,7 @@ class CutAwaySetupNode(Node):
         bpy.ops.object.select_all(action='DESELECT')
         
         # Get our (parent) pynode's unique id
-        parent_unique_pynode_id_str = self.get_unique_pynode_id_str__create_if_neccessary(self)
+        parent_unique_pynode_id_str = self.get_unique_pynode_id_str(self)
         
         # Get a list of the objects in the scene that use this pynode.
         obj_list, matslot_list = self.get_all_objs_using_pynode(parent_unique_pynode_id_str)
@@ -3002,7 +5063,7 @@ class CutAwaySetupNode(Node):
     # The user has pressed the "Select all Objects using this child shader" button
     # We are a child node    
     def select_all_objects_using_this_child_node(self):
-        id_str = self.get_unique_pynode_id_str__create_if_neccessary(self)
+        id_str = self.get_unique_pynode_id_str(self)
         self.select_all_objects_using_this_unique_pynode_id(id_str, False) 
                    
     def remove_all_cut_away_shader_nodes(self):
@@ -3101,29 +5162,9 @@ class CutAwaySetupNode(Node):
 
     
     #doubler
+    # Returns the scene objects that use the pynode with the given unique id (and the material slot that uses it). See cas_get_objects_using_pynode.
     def get_all_objs_using_pynode(self, pynode_unique_id_str):
-        obj_list = []
-        matslot_list = []
-        for obj in bpy.context.scene.objects:
-            foundobj = False;
-            for matslot in obj.material_slots:
-                if (matslot.material != None):
-                    if matslot.material.use_nodes:
-                        for node in matslot.material.node_tree.nodes:
-                            #if node.name.find("Cutaway Shader") != -1:
-                            if "Cutaway Shader" in node.name:
-                                node_unique_id_str = self.get_unique_pynode_id_str__create_if_neccessary(node)
-                                if pynode_unique_id_str == node_unique_id_str:
-                                    # We have found a pynode (and hence material) that matches the one passed to us as a param
-                                    # add this object to the list and move on, there is no need to check the rest of the 
-                                    # materials this obj uses - as we have added the obj to the list).
-                                    obj_list.append(obj)
-                                    matslot_list.append(matslot)
-                                    foundobj = True
-                                    break  # node loop
-                if foundobj == True:
-                    break # matslot loop  
-        return obj_list, matslot_list
+        return cas_get_objects_using_pynode(bpy.context.scene, pynode_unique_id_str)
     
 
     # debug helper 
@@ -3131,27 +5172,18 @@ class CutAwaySetupNode(Node):
     #    wm = bpy.data.window_managers[0]
     #    wm['pynode_unique_id_counter_int'] = 0  
         
-    def check_unique_pynode_id_exists__create_if_neccessary(self, pynode):
-        # Check if the unique_pynode_id_int has been defined
-        if 'unique_pynode_id_str' not in pynode.keys():
-            # No it hasn't - so define it
-            pynode['unique_pynode_id_str'] = '0'
+    # Get the unique idstr that is assigned to every cut away shader pydnode. '0' if it doesn't have one (yet).
+    # This never writes anything - so it is safe to use in scans over all the materials and nodes.
+    def get_unique_pynode_id_str(self, pynode):
+        return pynode.get('unique_pynode_id_str', '0')
             
-        # Check if the global id counter has been defined
-        if 'pynode_unique_id_counter_int' not in bpy.context.scene.keys():
-            bpy.context.scene['pynode_unique_id_counter_int'] = 0
-            
-    # Get the unique idstr that is assigned to every cut away shader pydnode.
-    # If the shader (for some reason) doesn't have a unique id - then create one.     
-    def get_unique_pynode_id_str__create_if_neccessary(self, pynode, force_assignment_bool = False):
-        # Check that the pynode_unique_id_counter and unique_pynode_id_str exist - create them if they don't
-        self.check_unique_pynode_id_exists__create_if_neccessary(pynode)
-        
-        #unique_id_str = pynode.unique_pynode_id_str
-        # if needed, assign a unique id to this cut away shader pynode, and increase the unique counter
-        if force_assignment_bool or pynode['unique_pynode_id_str'] == '0':
-            pynode['unique_pynode_id_str'] = str(bpy.context.scene['pynode_unique_id_counter_int'])
-            bpy.context.scene['pynode_unique_id_counter_int'] += 1
+    # Assign a unique idstr to a cut away shader pydnode, if it doesn't have one already (or if force_assignment_bool is True).
+    # Only called when pynodes are created or copied, and when a parent/child link is made.
+    # The ids are random (uuid4) - so there is no shared counter, and pynodes appended from other files won't collide.
+    # (Files from older versions have small integer ids - these still work.)
+    def assign_unique_pynode_id_str(self, pynode, force_assignment_bool = False):
+        if force_assignment_bool or pynode.get('unique_pynode_id_str', '0') == '0':
+            pynode['unique_pynode_id_str'] = uuid.uuid4().hex
             
         # return the pynode unique id    
         return pynode['unique_pynode_id_str']
@@ -3172,26 +5204,40 @@ class CutAwaySetupNode(Node):
         self.define_global_auto_update_child_nodes_on_frame_change_bool_if_neccessary()
         bpy.context.scene['global_auto_update_child_nodes_on_frame_change_bool'] = value_bool
         
+    def define_global_drive_child_nodes_with_drivers_bool_if_neccessary(self):
+        # Check if global_drive_child_nodes_with_drivers_bool has been defined
+        if 'global_drive_child_nodes_with_drivers_bool' not in bpy.context.scene.keys():
+            bpy.context.scene['global_drive_child_nodes_with_drivers_bool'] = False
+        
+    def get_global_drive_child_nodes_with_drivers_bool_create_if_neccessary(self):
+        # Check that the global_drive_child_nodes_with_drivers_bool exists - create it if it doesn't
+        self.define_global_drive_child_nodes_with_drivers_bool_if_neccessary()
+        return bpy.context.scene['global_drive_child_nodes_with_drivers_bool']
+        
+    def set_global_drive_child_nodes_with_drivers_bool_create_if_neccessary(self, value_bool):
+        # Check that the global_drive_child_nodes_with_drivers_bool exists - create it if it doesn't
+        self.define_global_drive_child_nodes_with_drivers_bool_if_neccessary()
+        bpy.context.scene['global_drive_child_nodes_with_drivers_bool'] = value_bool
+        
+    def get_global_frozen_for_render_bool(self):
+        return bpy.context.scene.get('global_frozen_for_render_bool', False)
+        
+    def set_global_frozen_for_render_bool(self, value_bool):
+        bpy.context.scene['global_frozen_for_render_bool'] = value_bool
+        
         
 
             
     #double1r
-    # The unique id of the given (child) pynode is added to the parents keys.
-    # The key format is: 'pnuidX', where X represents the integer id (in string format) e.g.  pnuid1  , pnuid3895 ... etc. 
-    # pnuid stands for pynode unique id.
+    # The unique id of the given (child) pynode is added to the parents child list (child_unique_id_collection).
     # If the child pynode does not have a unique id yet - one will be created
-    # If the child pynode unique id has already been added as a key -- no change is made
+    # If the child pynode unique id has already been added -- no change is made
     # If this is called, we are a parent node.
     def append_child_unique_pynode_id_to_parents_master_child_dict(self, child_pynode):
-        parent_node = self
-        
         # If the child pynode does not already have a unique id, one will be created
-        child_pynode_unique_id_str = self.get_unique_pynode_id_str__create_if_neccessary(child_pynode)
-    
-        key_name = 'pnuid'+child_pynode_unique_id_str
-        if key_name not in parent_node.keys():
-            #print("child pynode added to parent keys: ", child_pynode_unique_id_str)
-            parent_node[key_name] = child_pynode_unique_id_str
+        child_pynode_unique_id_str = self.assign_unique_pynode_id_str(child_pynode)
+        #print("child pynode added to parent: ", child_pynode_unique_id_str)
+        self.add_child_unique_id_str(child_pynode_unique_id_str)
 
     
 
@@ -3215,7 +5261,7 @@ class CutAwaySetupNode(Node):
             return
         
         # Get our (parent) pynode's unique id
-        parent_unique_pynode_id_str = self.get_unique_pynode_id_str__create_if_neccessary(self)
+        parent_unique_pynode_id_str = self.get_unique_pynode_id_str(self)
         
         # Get a list of the objects in the scene that use this pynode.
         obj_list, matslot_list = self.get_all_objs_using_pynode(parent_unique_pynode_id_str)
@@ -3300,11 +5346,12 @@ class CutAwaySetupNode(Node):
     #       - The user has just selected the "solidify' option on the pynode. This new material will become the material referenced by the solidfy modifier
     # or    - The user wants to add child shader nodes to the selected object(s) -- but these nodes do not have any materials yet.
     # Input params: material color
+    #               obj = the object to add the material to (None => bpy.context.object)
     #               inner_mesh_bool = true  => material name = current shader's material name + '_cutAwayShader_solidifier_material'
     #               inner_mesh_bool = false => material name = current shader's material name + '_cutAwayShader_material'
     # Returns:      The cutaway_pynode of the new material.
     #
-    def add_default_child_material_to_obj(self, mat_color, inner_mesh_bool = False):
+    def add_default_child_material_to_obj(self, mat_color, inner_mesh_bool = False, obj = None):
         # 2b) create the new node based material. This will be applied to the "inner mesh" as a child cutaway node
         mat_name = "cutaway_shader_material"
         
@@ -3318,7 +5365,7 @@ class CutAwaySetupNode(Node):
         # add the new INNER cutaway mesh shaders 
         bsdf_diffuseGreen = node_tree.nodes.new('ShaderNodeBsdfDiffuse')                                # - a default green inner sahder
         cutaway_py_node = node_tree.nodes.new('CutAwayShaderNodeType')                                  # - a the py_cutaway node  
-        self.get_unique_pynode_id_str__create_if_neccessary(cutaway_py_node)                            # create a new unique id for the new  cutaway_py_node
+        self.assign_unique_pynode_id_str(cutaway_py_node)                                               # create a new unique id for the new  cutaway_py_node
         osl_node_name =  cutaway_py_node.osl_nodename_str             
         osl_node = node_tree.nodes[osl_node_name]                                                       # - an OSL cutaway node
         
@@ -3333,10 +5380,11 @@ class CutAwaySetupNode(Node):
         self.auto_align_nodes(node_tree)
         cutaway_py_node.location[0] -= 125 #125
     
-        #3) add the new material to the  object
-        obj = bpy.context.object
-        bpy.ops.object.material_slot_add()
-        obj.material_slots[obj.material_slots.__len__() - 1].material = material
+        #3) add the new material to the  object (bpy.context.object if no obj is given).
+        # Appending to the object data's materials adds the slot without an operator call (no context checks, undo push or redraw)
+        if (obj == None):
+            obj = bpy.context.object
+        obj.data.materials.append(material)
         return cutaway_py_node
     
     '''
@@ -3438,10 +5486,10 @@ class CutAwaySetupNode(Node):
     # Set the mode to rectangular or circular
     def set_child_rect_circular_settings(self, rect_circ_int, image_path_name_str):
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["DrawMode_circular0_rectangular1"].default_value = rect_circ_int
-        oslNode.inputs["cutAwayImg"].default_value = image_path_name_str
-        self.rectangular_circular_int = rect_circ_int
-        self.cutaway_image_path_and_name_str = image_path_name_str
+        cas_set_osl_input_if_changed(oslNode, "DrawMode_circular0_rectangular1", rect_circ_int)
+        cas_set_osl_input_if_changed(oslNode, "cutAwayImg", image_path_name_str)
+        cas_set_if_changed(self, 'rectangular_circular_int', rect_circ_int)
+        cas_set_if_changed(self, 'cutaway_image_path_and_name_str', image_path_name_str)
         
     
 
@@ -3457,7 +5505,7 @@ class CutAwaySetupNode(Node):
         #print("******************************************call test2")
         # set the offset origin for the parent's osl node
         parent_oslNode = self.id_data.nodes[self.osl_nodename_str]
-        parent_oslNode.inputs["OriginOffset"].default_value = origin_offset_vec
+        cas_set_osl_input_if_changed(parent_oslNode, "OriginOffset", origin_offset_vec)
         # set the offset origin for the child nodes
         self.carry_out_action_on_this_parents_child_nodes_b(action_str = 'COPY_NEW_ORIGIN_TO_CHILD', param1 = origin_offset_vec)
         
@@ -3533,15 +5581,13 @@ class CutAwaySetupNode(Node):
     # We  are a child node if this routine is being run.
     def unlink_child(self):
         
-        unique_pynode_id_str = self.get_unique_pynode_id_str__create_if_neccessary(self)
+        unique_pynode_id_str = self.get_unique_pynode_id_str(self)
         
         # let the parent node know that we are bugging out
         parent_node = self.get_parent_pynode()  
         if (parent_node != None):
-            key_name = 'pnuid'+unique_pynode_id_str
-            if key_name in parent_node.keys():
-                # remove the reference the parent has to this child node
-                del parent_node[key_name]
+            # remove the reference the parent has to this child node
+            parent_node.remove_child_unique_id_str(unique_pynode_id_str)
 
         # Do all the usual setups for the new parent node 
         self.node_is_parent = True                                              # no longer a child
@@ -3549,7 +5595,14 @@ class CutAwaySetupNode(Node):
         
         # Let the OSL shader know that this is an outer (parent) mesh. This will allow a rim to be drawn if needed
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["InnerMesh0_OuterMesh1"].default_value = 1               # 1 = outer (parent) mesh
+        cas_set_osl_input_if_changed(oslNode, "InnerMesh0_OuterMesh1", 1)               # 1 = outer (parent) mesh
+        
+        # Child nodes made from a child template have no setup node output sockets (see cas_fast_child_init_state_dict)
+        if (len(self.outputs) == 0):
+            self.add_setup_node_sockets_and_links(oslNode)
+        
+        # We are no longer driven by our old parent
+        self.remove_keyed_value_drivers_from_osl_node(oslNode)
         
 
     def vec_to_str(self, vec):
@@ -3558,6 +5611,10 @@ class CutAwaySetupNode(Node):
         retstr += "{0:.4f}".format(vec[2])
         return retstr
     
+    # <tag_str><E v="x,y,z" />...</tag_str> for the co-ordinates of a loop
+    def loop_xml_str(self, tag_str, co_list):
+        return '<' + tag_str + '>' + ''.join(['<E' + self.vector_attribute(' v', co) + ' />' for co in co_list]) + '</' + tag_str + '>'
+    
     def vector_attribute(self, attr_name_str, vec):
         ret_str = attr_name_str + '="' + self.vec_to_str(vec) + '"'
         return ret_str 
@@ -3566,46 +5623,6 @@ class CutAwaySetupNode(Node):
         ret_str = attr_name_str + '="' +  "{0:.4f}".format(thefloat) + '"'
         return ret_str
     
-    # Return the vertices of an edge loop in transversal order.
-    # Note depending on the loop design, the return list may be ordered as clockwise, or anti clockwise.
-    # There is no specific check as to which direction the return list will be.
-    # The first vertex in the list will also be the last vertex. (this suits our purpose for this shader helper).
-    def sort_edge_verts(self, bm, bm_edges):
-        vertlist = [];
-        firstedge = True;
-        still_looping = True;
-        
-        if hasattr(bm.verts, "ensure_lookup_table"): 
-            bm.edges.ensure_lookup_table()
-            
-        current_vert = bm_edges[0].verts[0]
-        last_vert = current_vert
-        vertlist.append(current_vert)
-        
-        while(still_looping):
-            # get a list of edges connected to this vert
-            edges = current_vert.link_edges
-            
-            # get the next vert in the loop
-            for edge in edges:
-                if ((edge.verts[0].co != current_vert.co) and (edge.verts[0].co != last_vert.co)):
-                    last_vert = current_vert
-                    current_vert = edge.verts[0]
-                    break
-                elif ((edge.verts[1].co != current_vert.co) and (edge.verts[1].co != last_vert.co)):
-                    last_vert = current_vert
-                    current_vert = edge.verts[1]
-                    break
-            # add the new vert to the list        
-            vertlist.append(current_vert)
-            
-            # have we looped all the way around?
-            if (current_vert == vertlist[0]):
-                still_looping = False
-         
-        return vertlist
-                
-
     # Send all the edge segments that make up the cutaway plane to the OSL shader.
     # Method:
     # Iterate through all the edges in the mesh, find their local co-ordinate center points.
@@ -3615,65 +5632,31 @@ class CutAwaySetupNode(Node):
     #   - the x and y components l lengths f the edge. (perhaps could end the Len and let OSL deal with this
     # just do a test with the standard 4 edge plane for starters
     # todo: this look like it can crash if the py_node is a child node and the screen area space selects all layers on the child node - but the screen space of the parent node still has layers deselected
-    def update_rim_segment_data(self, cutaway_obj):
-        # we need to be in object mode to do this work
-        bpy.ops.object.mode_set(mode='OBJECT')
-                    
-        # the cursor bpy ops only work from the 3d view context. So, switch to this.
-        #original_areatype = bpy.context.area.type
-        bpy.context.area.type = "VIEW_3D"
-        
-        # Save the layers the the cutaway_obj is visible on (so we can restore these later)
-        saved_obj_layer_settings_list = self.save_obj_layer_settings(cutaway_obj)
-        
-        # Make all layers enabled - so we can find the cut away plane (if it was on a disabled layer)
-        cutaway_obj.layers = [True] * 20 
-        
-
-        # deselect all objects in the scene
-        bpy.ops.object.select_all(action='DESELECT')
-        
-        # Set the cutaway plane as the selected, active object
-        cutaway_obj.select = True
-        bpy.context.scene.objects.active = cutaway_obj
-
-        # we need to be in edit mode to do this work
-        bpy.ops.object.mode_set(mode='EDIT')
-        
-        # crank up bmesh :-)
-        bm = bmesh.from_edit_mesh(cutaway_obj.data) 
-        if hasattr(bm.verts, "ensure_lookup_table"): 
-            bm.verts.ensure_lookup_table()
-
-        # calculate the center origin of the plane in local co-ordinates.
-        x_axis = mathutils.Vector((1.0, 0.0, 0.0))
-        y_axis = mathutils.Vector((0.0, 1.0, 0.0))
-        z_axis = mathutils.Vector((0.0, 0.0, 1.0))
-        
-        rim_vert_data_str = '<R>'
-
-        vert_list = self.sort_edge_verts(bm, bm.edges)
-        for vert in vert_list:
-            rim_vert_data_str += '<E'
-            rim_vert_data_str +=  self.vector_attribute(' v', vert.co)
-            rim_vert_data_str += ' />'
-        rim_vert_data_str += '</R>'
-        
-        bm.free()
-        
-      
-        # put back in object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
+    def update_rim_segment_data(self, cutaway_obj, outline_array_tuple = None):
+        # The outline is read straight from the mesh data (see cas_read_mesh_outline_arrays and cas_find_outline_loops)
+        # The OSL shader reads the largest outer loop from <R>. Any other outer loops (<O>) and the holes (<H>) follow it, 
+        # each in its own element (so "//R//E" still only finds the edges of the largest outer loop).
+        # The XML is cached by a hash of the mesh arrays - an unchanged plane only costs reading the arrays and hashing them.
+        if (outline_array_tuple == None):
+            outline_array_tuple = cas_read_mesh_outline_arrays(cutaway_obj, bpy.context.scene)
+        rim_outline_hash_str = cas_outline_arrays_hash_str(outline_array_tuple)
+        rim_vert_data_str = cas_outline_xml_cache_dict.get(rim_outline_hash_str)
+        if (rim_vert_data_str == None):
+            outer_loop_list, hole_loop_list = cas_find_outline_loops(*outline_array_tuple)
+            rim_vert_data_str_list = [self.loop_xml_str('R', outer_loop_list[0] if len(outer_loop_list) > 0 else [])]
+            for loop in outer_loop_list[1:]:
+                rim_vert_data_str_list.append(self.loop_xml_str('O', loop))
+            for loop in hole_loop_list:
+                rim_vert_data_str_list.append(self.loop_xml_str('H', loop))
+            rim_vert_data_str = ''.join(rim_vert_data_str_list)
+            
+            if (len(cas_outline_xml_cache_dict) >= cas_outline_xml_cache_size_int):
+                cas_outline_xml_cache_dict.clear()
+            cas_outline_xml_cache_dict[rim_outline_hash_str] = rim_vert_data_str
         
         oslNode = self.id_data.nodes[self.osl_nodename_str]
-        oslNode.inputs["RimSegmentXMLData"].default_value = rim_vert_data_str
-        
-        #obj_layer_array
-        self.restore_obj_layer_settings(cutaway_obj, saved_obj_layer_settings_list)
-        #bpy.context.object.layers = array.fromlist(saved_obj_layer_settings_list)
-        
-        # restore the users layer enabled settings
-        #bpy.context.scene.layers = saved_layer_settings_list
+        cas_set_osl_input_if_changed(oslNode, "RimSegmentXMLData", rim_vert_data_str)
+        cas_set_if_changed(self, 'rim_outline_hash_str', rim_outline_hash_str)
         
         # The returned data can also be used by the child nodes (if any) - so they don't have to re-calculate this info
         return rim_vert_data_str 
@@ -3732,10 +5715,10 @@ class CutAwaySetupNode(Node):
             #print("We have been copied.")
          
             # save the old pynode id and create a new uniqie if for this pynode.
-            old_pynode_id = self.get_unique_pynode_id_str__create_if_neccessary(self)
-            self['unique_pynode_id_str'] = '0'
-            new_pynode_id = self.get_unique_pynode_id_str__create_if_neccessary(self)
+            old_pynode_id = self.get_unique_pynode_id_str(self)
+            new_pynode_id = self.assign_unique_pynode_id_str(self, force_assignment_bool = True)
             print(old_pynode_id, new_pynode_id)
+            cas_register_pynode(self)
             
             # if this pynode is a child node - then find the parent pynode -- and add ourselves to its child list.
             if (self.node_is_parent == False):
@@ -3747,50 +5730,35 @@ class CutAwaySetupNode(Node):
             else:
                 #print("WE ARE A PARENT")
                 # we are potentially a parent node with  child nodes in our list
-                has_children_test = False
-                for keystr in  self.keys():
-                    if keystr.find("pnuid") > -1:
-                        # there is at least one child node attached to this parent. No need to keep searching
-                        has_children_test = True
-                        break
+                has_children_test = len(self.get_child_unique_id_str_list()) > 0
                     
                 # If this newly duplicated parent node has children, we must make the original pynod parent a child of us
                 # (we cant have two master nodes dictating the child node settings)    
                 if (has_children_test == True):
                     # Find the original parent node and make it a child of us.
                     print("DUPLICATED - HAS CHILDREN")
-                    exit= False
-                    for mat in bpy.data.materials:                                              # for loop A
-                        if mat.use_nodes:
-                            for old_parent_node in mat.node_tree.nodes:                         # for loop B
-                                #if old_parent_node.name.find("Cutaway Shader") != -1:
-                                if "Cutaway Shader" in old_parent_node.name:
-                                    if old_pynode_id == self.get_unique_pynode_id_str__create_if_neccessary(old_parent_node):
-                                        # we have found our (old) parent). make the old parent a child node
-                                        old_parent_node.make_a_child_node(new_pynode_id)
-                                        
-                                        old_parent_node.this_childs_parent_pynode_unique_id_str = new_pynode_id
-                                        
-                                        # Set the OSL node to the inner mesh setting
-                                        #oslNode = old_parent_node.id_data.nodes[old_parent_node.osl_nodename_str]
-                                        #oslNode.inputs["InnerMesh0_OuterMesh1"].default_value = 0
-                                        
-                                        # add the new child node to our list of child nodes (since we are now the parent)
-                                        self.append_child_unique_pynode_id_to_parents_master_child_dict(old_parent_node)
-                                        
-                                        # erase the old parents child list - as it no longer needs it.
-                                        for child_key_str in old_parent_node.keys():            # for loop C
-                                            # not all keys belong to the 'parent's node unique id' (pnuid) so check that pnuid is in the key name
-                                            if child_key_str.find("pnuid") > -1:
-                                                # extract the child node unique id str from the dict
-                                                del old_parent_node[child_key_str]
-                                                
-                                        exit = True
-                                        break                                                   # exit for loop B. no need to check more nodes in the tree
-                                    
-                                    # DSW::::   up to here: All children must be updated with their new parent. Add this to the large automated list thingy
-                        if (exit):                                                              # exit for loop A. no need to check more materials in the file
-                            break;
+                    mat, old_parent_node = cas_find_pynode_by_unique_id(old_pynode_id)
+                    if (old_parent_node != None):
+                        # we have found our (old) parent). make the old parent a child node
+                        old_parent_node.make_a_child_node(new_pynode_id)
+                        
+                        old_parent_node.this_childs_parent_pynode_unique_id_str = new_pynode_id
+                        
+                        # Set the OSL node to the inner mesh setting
+                        #oslNode = old_parent_node.id_data.nodes[old_parent_node.osl_nodename_str]
+                        #oslNode.inputs["InnerMesh0_OuterMesh1"].default_value = 0
+                        
+                        # add the new child node to our list of child nodes (since we are now the parent)
+                        self.append_child_unique_pynode_id_to_parents_master_child_dict(old_parent_node)
+                        
+                        # erase the old parents child list - as it no longer needs it.
+                        old_parent_node.migrate_child_id_props_to_collection()
+                        old_parent_node.child_unique_id_collection.clear()
+                        
+                        # the old parent's child template is no longer needed (we'll make our own)
+                        cas_remove_child_template_material(old_pynode_id)
+                                
+                        # DSW::::   up to here: All children must be updated with their new parent. Add this to the large automated list thingy
                                         
 
     def update(self):
@@ -3799,6 +5767,9 @@ class CutAwaySetupNode(Node):
         
     def free(self):
         #print("Removing node ", self, ", Goodbye!")
+        # A removed parent's child template is removed too (see cas_remove_pending_child_template_materials)
+        if (self.node_is_parent and self.get('unique_pynode_id_str', '0') != '0'):
+            cas_child_template_removal_id_set.add(self['unique_pynode_id_str'])
         return
         
             
@@ -3817,12 +5788,9 @@ class CutAwaySetupNode(Node):
         row = layout.row(align=True)                                  
         row.label("Node ID:" + id_str)  
         
-        wmid_int= "no sc counter"
-        #wm = bpy.data.window_managers[0]
-        if "pynode_unique_id_counter_int" in bpy.context.scene.keys():
-            wmid_int = bpy.context.scene['pynode_unique_id_counter_int'] 
+        # Display the OSL input/child property write counts (see cas_set_if_changed)
         row = layout.row(align=True)                                  
-        row.label("Counter:" + str(wmid_int)) 
+        row.label("Writes:" + str(cas_write_stats_dict['applied']) + " Elided:" + str(cas_write_stats_dict['elided'])) 
         
         #global cut_away_shader_global_pynode_list
         #row = layout.row(align=True)                                  
@@ -3875,6 +5843,13 @@ class CutAwaySetupNode(Node):
             row = layout.row(align=True)
             row.enabled =  self.fillRim_bool_prop  and is_parent
             row.prop(self, "rimeffectmix_float", "Rim Fill Effect Mix", slider = True)    
+            
+            # Deferred Child Sync check box and interval
+            row = layout.row(align=True)
+            row.prop(self, "deferred_child_sync_bool_prop", "Deferred Child Sync")
+            sub_row = row.row(align=True)
+            sub_row.enabled = self.deferred_child_sync_bool_prop
+            sub_row.prop(self, "deferred_child_sync_interval_float_prop", "Interval")
  
             layout.separator()
             
@@ -4041,13 +6016,8 @@ class CutAwaySetupNode(Node):
 
             #layout.separator()
             
-            #has_childnodes = self.get_items_in_child_list_str() > 0;
+            #has_childnodes = len(self.child_unique_id_collection) > 0
             has_childnodes = True
-            for keystr in self.keys():
-                #print (keystr)
-                if  keystr.find("puid") != -1:
-                    has_childnodes = True
-                    break
                     
            
             # Child Node Options  Title
@@ -4062,6 +6032,11 @@ class CutAwaySetupNode(Node):
             row.operator(   "cas_btn.add_child_nodes_to_selected", 
                             "Add Child Cutaway Shader to Selected Objs", 
                              icon = "MATERIAL").setupnode_namestr_asts = self.py_nodename_str 
+            
+            # Share Child Materials check box
+            row = layout.row(align=False)             
+            row.enabled = is_parent 
+            row.prop(self, "share_child_materials_bool_prop", "Share Child Materials")
                              
             # Remove Selected Children Button
             row = layout.row(align=False)                                                   
@@ -4070,6 +6045,12 @@ class CutAwaySetupNode(Node):
                             "Remove Child Shader from Selcted Objects", 
                              icon = "MATERIAL").setupnode_namestr_rsfs = self.py_nodename_str 
                              
+            # Check Parent/Child Links Button
+            row = layout.row(align=False)                                                   
+            row.operator(   "cas_btn.reconcile_parent_child_links", 
+                            "Check Parent/Child Links", 
+                             icon = "LINKED").setupnode_namestr_rpcl = self.py_nodename_str 
+                             
             layout.separator()
               
             # Object Selection for this Shader  Title
@@ -4138,6 +6119,40 @@ class CutAwaySetupNode(Node):
                                                                                                #      cannot share the same name as any other operators properties. This suffix
                                                                                                #      scheme is an easy way of providing a 'unique' name.  
                                                                                                
+            # Drive child nodes with drivers (instead of the frame change callbacks)
+            drivers_checked_bool = bpy.context.scene.get('global_drive_child_nodes_with_drivers_bool', False)
+            if (drivers_checked_bool):
+                drivers_tick_icon = 'CHECKBOX_HLT'
+            else:
+                drivers_tick_icon = 'CHECKBOX_DEHLT'
+            row = layout.row(align=True) 
+            row.operator( 
+                "cas_btn.drive_child_nodes_with_drivers", icon = drivers_tick_icon,            # Drive child nodes with drivers
+                text = "Use Drivers").setupnode_namestr_dcnwd = self.py_nodename_str
+            
+            # Freeze for Render / Unfreeze
+            row = layout.row(align=True) 
+            if bpy.context.scene.get('global_frozen_for_render_bool', False):
+                row.operator( 
+                    "cas_btn.freeze_keyed_values_for_render", icon = 'FREEZE',                 # Unfreeze
+                    text = "Unfreeze").setupnode_namestr_fkvfr = self.py_nodename_str
+            else:
+                row.operator( 
+                    "cas_btn.freeze_keyed_values_for_render",                                  # Freeze for Render
+                    text = "Freeze for Render").setupnode_namestr_fkvfr = self.py_nodename_str
+            
+            # Bake Key Frames / Clear Bake
+            row = layout.row(align=True) 
+            row.operator( 
+                "cas_btn.bake_keyed_values",                                                    # Bake Key Frames
+                text = "Bake Key Frames").setupnode_namestr_bkv = self.py_nodename_str
+            row.operator( 
+                "cas_btn.clear_baked_keyed_values",                                             # Clear Bake
+                text = "Clear Bake").setupnode_namestr_cbkv = self.py_nodename_str
+            if 'cas_baked_keyed_values' in self.keys():
+                row = layout.row(align=True) 
+                row.label("Baked from frame " + str(self['cas_baked_start_frame_int']))
+                                                                                               
             layout.separator()                                                                                   
             
             # Delete All Cutaway Shader Nodes
@@ -4286,6 +6301,12 @@ def register():
     bpy.utils.register_class(cas_btn_refresh_cutaway_plane) 
     bpy.utils.register_class(cas_btn_auto_refresh_child_nodes_after_frame_change)
     bpy.utils.register_class(cas_btn_manual_refresh_child_nodes_after_frame_change)
+    bpy.utils.register_class(cas_btn_drive_child_nodes_with_drivers)
+    bpy.utils.register_class(casDeferredChildSyncTimer)
+    bpy.utils.register_class(casBtnBakeKeyedValues)
+    bpy.utils.register_class(cas_btn_freeze_keyed_values_for_render)
+    bpy.utils.register_class(casBtnReconcileParentChildLinks)
+    bpy.utils.register_class(casBtnClearBakedKeyedValues)
     bpy.utils.register_class(casBtnOpenImageDialog) 
     bpy.utils.register_class(casBtnAddChildNodesToSelected)   
     bpy.utils.register_class(casBtnRemoveChildNodesFromSelected)
@@ -4303,18 +6324,68 @@ def register():
     bpy.utils.register_class(casBtnPlaneOriginReset)
     bpy.utils.register_class(casBtnUnlinkchildNode)
     bpy.utils.register_class(casWarningDialogOperator)
+    bpy.utils.register_class(CasChildUniqueIdPropertyGroup)
     bpy.utils.register_class(CutAwaySetupNode)
 
     try:
         nodeitems_utils.register_node_categories("CUSTOM_NODES", node_categories)               # Allows us to re-run the script when developing, without causing a re-registering error
     except:
         pass
+
+    # *** load_post ***
+    # Remove any old callbacks (e.g. if the script is re-run) before adding ours.
+    callback_delete_list = []
+    for callback in bpy.app.handlers.load_post:
+        if (callback.__name__ == cas_load_post_callback.__name__):
+            callback_delete_list.append(callback)
+    for callback in callback_delete_list:
+        bpy.app.handlers.load_post.remove(callback)
+    bpy.app.handlers.load_post.append(cas_load_post_callback)
+    
+    # *** scene_update_post *** (keeps the object index up to date)
+    callback_delete_list = []
+    for callback in bpy.app.handlers.scene_update_post:
+        if (callback.__name__ == cas_scene_update_post_callback.__name__):
+            callback_delete_list.append(callback)
+    for callback in callback_delete_list:
+        bpy.app.handlers.scene_update_post.remove(callback)
+    bpy.app.handlers.scene_update_post.append(cas_scene_update_post_callback)
+    
+    # *** render_init, render_complete, render_cancel *** (lazy child sync: stale child nodes are brought up to date before rendering)
+    # (the outline watcher's frame_change_post callback is only installed while there are animated cutaway planes - the first scene update decides)
+    cas_outline_watch_state_dict['registration_checked_bool'] = False
+    for handler_list, callback in ((bpy.app.handlers.render_init, cas_render_init_callback_sync_stale_child_nodes),
+                                   (bpy.app.handlers.render_complete, cas_render_end_callback_resume_lazy_child_sync),
+                                   (bpy.app.handlers.render_cancel, cas_render_end_callback_resume_lazy_child_sync)):
+        callback_delete_list = []
+        for old_callback in handler_list:
+            if (old_callback.__name__ == callback.__name__):
+                callback_delete_list.append(old_callback)
+        for old_callback in callback_delete_list:
+            handler_list.remove(old_callback)
+        handler_list.append(callback)
     
+    # The frame change callbacks. bpy.data can't be checked for key frames while registering, so start with them installed. 
+    # cas_load_post_callback (and the scene update check of edited actions) remove them again if there are no key framed parents, or 'drivers' mode is on.
+    cas_add_keyed_value_frame_handlers()
+
     print("CutAwayShader running")
     
 def unregister():
+    cas_remove_keyed_value_frame_handlers()
+    if cas_load_post_callback in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(cas_load_post_callback)
+    if cas_scene_update_post_callback in bpy.app.handlers.scene_update_post:
+        bpy.app.handlers.scene_update_post.remove(cas_scene_update_post_callback)
+    for handler_list, callback in ((bpy.app.handlers.render_init, cas_render_init_callback_sync_stale_child_nodes),
+                                   (bpy.app.handlers.render_complete, cas_render_end_callback_resume_lazy_child_sync),
+                                   (bpy.app.handlers.render_cancel, cas_render_end_callback_resume_lazy_child_sync),
+                                   (bpy.app.handlers.frame_change_post, cas_frame_change_post_callback_check_cutaway_plane_outlines)):
+        if callback in handler_list:
+            handler_list.remove(callback)
     nodeitems_utils.unregister_node_categories("CUSTOM_NODES")
     bpy.utils.unregister_class(CutAwaySetupNode)
+    bpy.utils.unregister_class(CasChildUniqueIdPropertyGroup)
     bpy.utils.unregister_class(casWarningDialogOperator)
     bpy.utils.unregister_class(casBtnUnlinkchildNode)
     bpy.utils.unregister_class(casBtnPlaneOriginReset)
@@ -4332,6 +6403,12 @@ def unregister():
     bpy.utils.unregister_class(casBtnRemoveChildNodesFromSelected)
     bpy.utils.unregister_class(casBtnAddChildNodesToSelected)
     bpy.utils.unregister_class(casBtnOpenImageDialog) 
+    bpy.utils.unregister_class(casBtnReconcileParentChildLinks)
+    bpy.utils.unregister_class(cas_btn_freeze_keyed_values_for_render)
+    bpy.utils.unregister_class(casBtnClearBakedKeyedValues)
+    bpy.utils.unregister_class(casBtnBakeKeyedValues)
+    bpy.utils.unregister_class(casDeferredChildSyncTimer)
+    bpy.utils.unregister_class(cas_btn_drive_child_nodes_with_drivers)
     bpy.utils.unregister_class(cas_btn_manual_refresh_child_nodes_after_frame_change)
     bpy.utils.unregister_class(cas_btn_auto_refresh_child_nodes_after_frame_change)
     bpy.utils.unregister_class(cas_btn_refresh_cutaway_plane)  